@@ -0,0 +1,90 @@
+"""
+Created by Epic at 10/17/26
+
+Runs the benchmarks and writes the results as JSON so runs can be compared over time.
+Run with ``python -m benchmarks [names] [--output results.json] [--compare previous.json]``.
+"""
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from importlib import import_module
+from platform import platform, python_implementation, python_version
+from subprocess import run as run_process, DEVNULL
+from sys import stderr, stdout
+
+from ujson import dumps, load
+
+from speedcord.values import version
+
+BENCHMARKS = ("gateway", "dispatch", "rest", "context", "etf")
+# Slow or noisy, only run when asked for by name
+OPT_IN_BENCHMARKS = ("loadtest",)
+
+
+def get_commit():
+    try:
+        process = run_process(["git", "rev-parse", "HEAD"], capture_output=True, text=True, stdin=DEVNULL)
+    except OSError:
+        return None
+    return process.stdout.strip() or None
+
+
+def flatten(results, prefix=""):
+    """
+    Flattens nested results into ``name.key`` pairs.
+    """
+    values = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[prefix + key] = value
+    return values
+
+
+def compare(previous, current):
+    previous_values = flatten(previous["results"])
+    for name, value in flatten(current["results"]).items():
+        previous_value = previous_values.get(name)
+        if not previous_value:
+            continue
+        change = (value - previous_value) / previous_value * 100
+        print(f"{name}: {previous_value:.4g} -> {value:.4g} ({change:+.1f}%)", file=stderr)
+
+
+def main():
+    parser = ArgumentParser(prog="python -m benchmarks", description="Runs the speedcord benchmarks offline.")
+    parser.add_argument("names", nargs="*", help="Benchmarks to run, out of "
+                                                 f"{', '.join(BENCHMARKS + OPT_IN_BENCHMARKS)}. Runs all of them "
+                                                 f"except {', '.join(OPT_IN_BENCHMARKS)} by default.")
+    parser.add_argument("--output", "-o", help="File to write the JSON results to instead of stdout.")
+    parser.add_argument("--compare", "-c", help="Results of a previous run to print the changes against.")
+    arguments = parser.parse_args()
+    for name in arguments.names:
+        if name not in BENCHMARKS and name not in OPT_IN_BENCHMARKS:
+            parser.error(f"Unknown benchmark {name}!")
+
+    results = {}
+    for name in arguments.names or BENCHMARKS:
+        print(f"Running {name}...", file=stderr)
+        results[name] = import_module(f"benchmarks.{name}").run()
+    document = {
+        "version": version,
+        "commit": get_commit(),
+        "python": f"{python_implementation()} {python_version()}",
+        "platform": platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": results
+    }
+
+    if arguments.output is None:
+        stdout.write(dumps(document, indent=2) + "\n")
+    else:
+        with open(arguments.output, "w") as f:
+            f.write(dumps(document, indent=2) + "\n")
+    if arguments.compare is not None:
+        with open(arguments.compare) as f:
+            compare(load(f), document)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Created by Epic at 10/17/26
+
+Compares constructing the lazy MessageContext with the old setattr based context.
+Run with ``python -m benchmarks.context``.
+"""
+from timeit import repeat
+from tracemalloc import start, stop, get_traced_memory
+
+from speedcord.ext.typing.context import MessageContext
+from .payloads import message_create, stringify_snowflakes
+
+
+class LegacyContext:
+    """
+    The context before fields were read lazily.
+    """
+    def __init__(self, client, data):
+        self.client = client
+        self._data = data
+        for field, field_data in self._data.items():
+            setattr(self, field, field_data)
+
+
+def memory_per_context(context_class, payloads):
+    start()
+    contexts = [context_class(None, payload) for payload in payloads]
+    used = get_traced_memory()[0]
+    stop()
+    del contexts
+    return used / len(payloads)
+
+
+def run(number=100000):
+    payload = stringify_snowflakes(message_create())["d"]
+    payloads = [dict(payload) for _ in range(10000)]
+    results = {}
+    for name, context_class in (("legacy", LegacyContext), ("lazy", MessageContext)):
+        construct = min(repeat(lambda: context_class(None, payload), number=number, repeat=5)) / number
+        context = context_class(None, payload)
+        read = min(repeat(lambda: (context.content, context.channel_id), number=number, repeat=5)) / number
+        results[name] = {
+            "construct_ns": construct * 1e9,
+            "read_two_fields_ns": read * 1e9,
+            "bytes_per_context": memory_per_context(context_class, payloads)
+        }
+    return results
+
+
+if __name__ == '__main__':
+    for context_name, result in run().items():
+        print(f"{context_name}: construct {result['construct_ns']:.0f}ns, "
+              f"read content + channel_id {result['read_two_fields_ns']:.0f}ns, "
+              f"{result['bytes_per_context']:.0f} bytes per context")
@@ -0,0 +1,76 @@
+"""
+Created by Epic at 10/17/26
+
+Measures dispatching an event to several handlers, including running coroutine handlers to completion.
+Run with ``python -m benchmarks.dispatch``.
+"""
+from asyncio import new_event_loop, sleep
+from time import perf_counter
+
+from speedcord.dispatcher import OpcodeDispatcher, EventDispatcher
+from .payloads import message_create, stringify_snowflakes
+
+
+calls = [0]
+
+
+def plain_handler(data, shard):
+    calls[0] += 1
+
+
+async def coroutine_handler(data, shard):
+    calls[0] += 1
+
+
+def measure(loop, dispatch, number, handler_count, repeat=5):
+    async def dispatch_all():
+        calls[0] = 0
+        started_at = perf_counter()
+        for _ in range(number):
+            dispatch()
+        # Let the tasks created for coroutine handlers finish
+        while calls[0] < number * handler_count:
+            await sleep(0)
+        return perf_counter() - started_at
+
+    return min(loop.run_until_complete(dispatch_all()) for _ in range(repeat)) / number
+
+
+def run(number=10000):
+    payload = stringify_snowflakes(message_create())
+    data = payload["d"]
+    loop = new_event_loop()
+    results = {}
+
+    try:
+        opcode_dispatcher = OpcodeDispatcher(loop)
+        opcode_dispatcher.register(0, plain_handler)
+        results["opcode"] = {"dispatch_ns": measure(loop, lambda: opcode_dispatcher.dispatch(0, payload, None),
+                                                    number, 1) * 1e9}
+
+        for handler_count in (1, 3, 10):
+            for name, handler, options in (("plain", plain_handler, {}),
+                                           ("coroutine", coroutine_handler, {}),
+                                           ("coroutine_eager", coroutine_handler, {"eager": True}),
+                                           ("coroutine_ordered", coroutine_handler, {"ordered_by": "guild_id"})):
+                dispatcher = EventDispatcher(loop, **options)
+                for _ in range(handler_count):
+                    dispatcher.register("MESSAGE_CREATE", handler)
+                results[f"{name}_x{handler_count}"] = {
+                    "dispatch_ns": measure(loop, lambda: dispatcher.dispatch("MESSAGE_CREATE", data, None),
+                                           number, handler_count) * 1e9
+                }
+
+        dispatcher = EventDispatcher(loop)
+        dispatcher.register("MESSAGE_CREATE", coroutine_handler, concurrency=4, max_queue=number)
+        results["coroutine_pool"] = {
+            "dispatch_ns": measure(loop, lambda: dispatcher.dispatch("MESSAGE_CREATE", data, None), number, 1) * 1e9
+        }
+    finally:
+        loop.close()
+    return results
+
+
+if __name__ == '__main__':
+    for name, result in run().items():
+        print(f"{name}: {result['dispatch_ns']:.0f}ns per event")
@@ -0,0 +1,37 @@
+"""
+Created by Epic at 10/17/26
+
+Compares decoding gateway payloads with the pure python ETF decoder against ujson.
+Run with ``python -m benchmarks.etf``.
+"""
+from timeit import repeat
+
+from ujson import dumps as json_dumps, loads as json_loads
+
+from speedcord import etf
+from .payloads import message_create, guild_create, stringify_snowflakes
+
+
+def run(number=200):
+    results = {}
+    for name, payload in (("MESSAGE_CREATE", message_create()), ("GUILD_CREATE", guild_create())):
+        json_data = json_dumps(stringify_snowflakes(payload))
+        etf_data = etf.dumps(payload)
+        assert etf.loads(etf_data) == json_loads(json_data), "ETF decoded to a different shape than JSON"
+
+        json_time = min(repeat(lambda: json_loads(json_data), number=number, repeat=5)) / number
+        etf_time = min(repeat(lambda: etf.loads(etf_data), number=number, repeat=5)) / number
+        results[name] = {
+            "json_bytes": len(json_data.encode()),
+            "etf_bytes": len(etf_data),
+            "json_decode_us": json_time * 1e6,
+            "etf_decode_us": etf_time * 1e6
+        }
+    return results
+
+
+if __name__ == '__main__':
+    for event_name, result in run().items():
+        print(f"{event_name}: "
+              f"json {result['json_bytes']} bytes {result['json_decode_us']:.1f}us, "
+              f"etf {result['etf_bytes']} bytes {result['etf_decode_us']:.1f}us")
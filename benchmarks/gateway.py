@@ -0,0 +1,112 @@
+"""
+Created by Epic at 10/17/26
+
+Measures how fast DefaultShard.read_loop turns gateway frames into dispatched events.
+Run with ``python -m benchmarks.gateway``.
+"""
+from asyncio import new_event_loop
+from logging import getLogger
+from time import perf_counter
+from types import SimpleNamespace
+from zlib import compressobj, decompressobj, Z_SYNC_FLUSH
+
+from aiohttp import WSMessage, WSMsgType
+from ujson import dumps as json_dumps, loads as json_loads
+
+from speedcord import etf
+from speedcord.dispatcher import OpcodeDispatcher, EventDispatcher
+from speedcord.shard import DefaultShard
+from .payloads import message_create, typing_start, stringify_snowflakes
+
+
+class FakeWebSocket:
+    """
+    Replays frames to read_loop.
+    """
+    close_code = 1000
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self):
+        for frame in self.frames:
+            yield frame
+
+
+def create_shard(loop, encoding, compress):
+    client = SimpleNamespace(encoding=encoding, metrics=None, tracer=None,
+                             opcode_dispatcher=OpcodeDispatcher(loop), event_dispatcher=EventDispatcher(loop),
+                             is_listening=lambda event_name: event_name == "MESSAGE_CREATE")
+    client.opcode_dispatcher.register(0, lambda data, shard: None)
+    # The constructor creates events for the loop, only the state read_loop uses is set up
+    shard = DefaultShard.__new__(DefaultShard)
+    shard.id = 0
+    shard.client = client
+    shard.loop = loop
+    shard.logger = getLogger("speedcord.shard.0")
+    shard.active = True
+    shard.last_event_id = None
+    shard.decoder = etf.loads if encoding == "etf" else json_loads
+    shard.inflator = decompressobj() if compress else None
+    shard.inflate_buffer = bytearray()
+    shard.compressed_bytes = 0
+    shard.decompressed_bytes = 0
+    shard.skipped_events = 0
+
+    async def on_disconnect(close_code):
+        pass
+    shard.on_disconnect = on_disconnect
+    return shard
+
+
+def create_frames(payloads, encoding, compress):
+    compressor = compressobj()
+    frames = []
+    for payload in payloads:
+        if encoding == "etf":
+            data = etf.dumps(payload)
+        else:
+            data = json_dumps(stringify_snowflakes(payload))
+        if compress:
+            if isinstance(data, str):
+                data = data.encode()
+            frames.append(WSMessage(WSMsgType.BINARY, compressor.compress(data) + compressor.flush(Z_SYNC_FLUSH),
+                                    None))
+        else:
+            frames.append(WSMessage(WSMsgType.TEXT if isinstance(data, str) else WSMsgType.BINARY, data, None))
+    return frames
+
+
+def run(number=2000):
+    # Nine messages for every typing event, which nothing listens to and gets skipped before decoding
+    payloads = [typing_start(i) if i % 10 == 0 else message_create(i) for i in range(number)]
+    loop = new_event_loop()
+    results = {}
+    try:
+        for encoding, compress in (("json", False), ("json", True), ("etf", False), ("etf", True)):
+            frames = create_frames(payloads, encoding, compress)
+            timings = []
+            for _ in range(5):
+                shard = create_shard(loop, encoding, compress)
+                shard.ws = FakeWebSocket(frames)
+                started_at = perf_counter()
+                loop.run_until_complete(shard.read_loop())
+                timings.append(perf_counter() - started_at)
+            best = min(timings)
+            results[f"{encoding}{'+zlib-stream' if compress else ''}"] = {
+                "frame_us": best / number * 1e6,
+                "frames_per_second": number / best,
+                "skipped_events": shard.skipped_events
+            }
+    finally:
+        loop.close()
+    return results
+
+
+if __name__ == '__main__':
+    for name, result in run().items():
+        print(f"{name}: {result['frame_us']:.1f}us per frame, {result['frames_per_second']:.0f} frames/s, "
+              f"{result['skipped_events']} skipped")
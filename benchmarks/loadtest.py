@@ -0,0 +1,86 @@
+"""
+Created by Epic at 10/17/26
+
+Connects a client to a local FakeDiscord and measures events and requests per second end to end.
+Run with ``python -m benchmarks.loadtest --shards 1000``.
+"""
+from argparse import ArgumentParser
+from asyncio import new_event_loop, set_event_loop, gather, sleep, all_tasks
+from time import perf_counter
+
+from ujson import dumps
+
+from speedcord import Client
+from speedcord.http import Route
+from speedcord.testing import FakeDiscord
+
+
+async def load_test(shards, event_rate, duration, channels, encoding, compress):
+    async with FakeDiscord(token="token", shards=shards, max_concurrency=shards, event_rate=event_rate,
+                           global_ratelimit=None) as fake:
+        client = Client(512, "token", baseuri=fake.baseuri, encoding=encoding, compress=compress)
+        events = [0]
+
+        @client.listen("MESSAGE_CREATE")
+        def on_message(data, shard):
+            events[0] += 1
+
+        await client.connect()
+        await gather(*[shard.is_ready.wait() for shard in client.shards])
+        startup_time = client.startup_time
+
+        # Events while requests are being sent, like a busy bot
+        requests = [0]
+        events[0] = 0
+        started_at = perf_counter()
+        stop_at = started_at + duration
+
+        async def send_requests(channel_id):
+            route = Route("POST", "/channels/{channel_id}/messages", channel_id=channel_id)
+            while perf_counter() < stop_at:
+                await client.http.request(route, json={"content": "Hello world"})
+                requests[0] += 1
+
+        await gather(*[send_requests(channel_id) for channel_id in range(channels)])
+        await sleep(max(stop_at - perf_counter(), 0))
+        elapsed = perf_counter() - started_at
+
+        result = {
+            "shards": shards,
+            "startup_seconds": startup_time,
+            "events_per_second": events[0] / elapsed,
+            "requests_per_second": requests[0] / elapsed,
+            "ratelimited_requests": fake.ratelimited_requests
+        }
+        await client.close()
+        return result
+
+
+def run(shards=16, event_rate=100, duration=3, channels=10, encoding="json", compress=None):
+    loop = new_event_loop()
+    # The client uses the current event loop
+    set_event_loop(loop)
+    try:
+        return loop.run_until_complete(load_test(shards, event_rate, duration, channels, encoding, compress))
+    finally:
+        # Heartbeat loops sleep until their next heartbeat
+        tasks = all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(gather(*tasks, return_exceptions=True))
+        loop.close()
+        set_event_loop(None)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog="python -m benchmarks.loadtest",
+                            description="Load tests a client against a local fake Discord.")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--event-rate", type=float, default=100, help="Events per second sent to every shard.")
+    parser.add_argument("--duration", type=float, default=3, help="Seconds to measure for.")
+    parser.add_argument("--channels", type=int, default=10, help="Channels to send messages to concurrently.")
+    parser.add_argument("--encoding", choices=("json", "etf"), default="json")
+    parser.add_argument("--compress", choices=("zlib-stream",))
+    arguments = parser.parse_args()
+    print(dumps(run(arguments.shards, arguments.event_rate, arguments.duration, arguments.channels,
+                    arguments.encoding, arguments.compress), indent=2))
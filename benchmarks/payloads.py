@@ -0,0 +1,156 @@
+"""
+Created by Epic at 10/17/26
+
+Synthetic but realistic gateway payloads used by the benchmarks.
+"""
+from random import Random
+
+random = Random(1337)
+
+
+def snowflake():
+    return random.randint(175928847299117063, 905928847299117063)
+
+
+def user():
+    return {
+        "id": snowflake(),
+        "username": "speedcord-user",
+        "discriminator": "1337",
+        "avatar": "a_d5efa99b3eeaa7dd43acca82f5692432",
+        "public_flags": 64,
+        "bot": False
+    }
+
+
+def member(include_user=True):
+    data = {
+        "roles": [snowflake() for _ in range(3)],
+        "nick": None,
+        "joined_at": "2020-09-01T12:00:00.000000+00:00",
+        "premium_since": None,
+        "deaf": False,
+        "mute": False,
+        "pending": False
+    }
+    if include_user:
+        data["user"] = user()
+    return data
+
+
+def message_create(sequence=1):
+    """
+    A MESSAGE_CREATE dispatch with snowflakes as integers, like the ETF encoding sends them.
+    """
+    guild_id = snowflake()
+    return {
+        "t": "MESSAGE_CREATE",
+        "s": sequence,
+        "op": 0,
+        "d": {
+            "type": 0,
+            "tts": False,
+            "timestamp": "2020-09-01T12:00:00.000000+00:00",
+            "referenced_message": None,
+            "pinned": False,
+            "nonce": str(snowflake()),
+            "mentions": [user() for _ in range(2)],
+            "mention_roles": [],
+            "mention_everyone": False,
+            "member": member(include_user=False),
+            "id": snowflake(),
+            "flags": 0,
+            "embeds": [{
+                "type": "rich",
+                "title": "Speedcord",
+                "description": "A simple lightweight Discord library " * 4,
+                "fields": [{"name": f"Field {i}", "value": "Value", "inline": True} for i in range(4)]
+            }],
+            "edited_timestamp": None,
+            "content": "!test hello world, this is a realistic length message",
+            "channel_id": snowflake(),
+            "author": user(),
+            "attachments": [],
+            "guild_id": guild_id
+        }
+    }
+
+
+def typing_start(sequence=1):
+    """
+    A TYPING_START dispatch, one of the events bots often don't listen to.
+    """
+    return {
+        "t": "TYPING_START",
+        "s": sequence,
+        "op": 0,
+        "d": {
+            "user_id": snowflake(),
+            "timestamp": 1598961600,
+            "member": member(),
+            "channel_id": snowflake(),
+            "guild_id": snowflake()
+        }
+    }
+
+
+def guild_create(member_count=250, channel_count=50, role_count=30):
+    """
+    A GUILD_CREATE dispatch for a medium sized guild.
+    """
+    guild_id = snowflake()
+    return {
+        "t": "GUILD_CREATE",
+        "s": 1,
+        "op": 0,
+        "d": {
+            "id": guild_id,
+            "name": "Speedcord support",
+            "icon": "a_d5efa99b3eeaa7dd43acca82f5692432",
+            "owner_id": snowflake(),
+            "region": "europe",
+            "member_count": member_count,
+            "large": member_count > 250,
+            "unavailable": False,
+            "roles": [{
+                "id": snowflake(),
+                "name": f"Role {i}",
+                "color": 3447003,
+                "hoist": False,
+                "position": i,
+                "permissions": "104324673",
+                "managed": False,
+                "mentionable": True
+            } for i in range(role_count)],
+            "channels": [{
+                "id": snowflake(),
+                "type": 0,
+                "name": f"channel-{i}",
+                "position": i,
+                "parent_id": None,
+                "topic": None,
+                "nsfw": False,
+                "last_message_id": snowflake(),
+                "rate_limit_per_user": 0,
+                "permission_overwrites": [
+                    {"id": snowflake(), "type": 0, "allow": "0", "deny": "1024"}
+                ]
+            } for i in range(channel_count)],
+            "members": [member() for _ in range(member_count)],
+            "presences": [],
+            "voice_states": []
+        }
+    }
+
+
+def stringify_snowflakes(data):
+    """
+    Converts integer snowflakes to strings, matching what the JSON encoding sends.
+    """
+    if isinstance(data, dict):
+        return {key: stringify_snowflakes(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [stringify_snowflakes(value) for value in data]
+    if isinstance(data, int) and not isinstance(data, bool) and data > 2147483647:
+        return str(data)
+    return data
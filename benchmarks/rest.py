@@ -0,0 +1,81 @@
+"""
+Created by Epic at 10/17/26
+
+Measures the per request work HttpClient does before sending a request: building the Route, working out its
+rate-limit bucket, merging headers and triggering a TimesPer limiter.
+Run with ``python -m benchmarks.rest``.
+"""
+from asyncio import new_event_loop
+from time import perf_counter
+from timeit import repeat
+
+from speedcord.http import HttpClient, Route
+from speedcord.ratelimiter import TimesPer
+from .payloads import snowflake
+
+
+def create_http():
+    # The constructor opens a session, only the state used here is set up
+    http = HttpClient.__new__(HttpClient)
+    http.bucket_hashes = {}
+    http.default_headers = {
+        "X-RateLimit-Precision": "millisecond",
+        "Authorization": "Bot " + "a" * 59,
+        "User-Agent": "DiscordBot (https://github.com/tag-epic/speedcord 0.3.128) Python/3"
+    }
+    return http
+
+
+def best(function, number):
+    return min(repeat(function, number=number, repeat=5)) / number * 1e9
+
+
+def trigger_times_per(loop, number):
+    # Never runs out, only the bookkeeping is measured
+    limiter = TimesPer(number * 10, 60)
+
+    async def trigger_all():
+        started_at = perf_counter()
+        for _ in range(number):
+            await limiter.trigger()
+        return perf_counter() - started_at
+
+    return min(loop.run_until_complete(trigger_all()) for _ in range(5)) / number * 1e9
+
+
+def run(number=100000):
+    channel_id = str(snowflake())
+    message_id = str(snowflake())
+    template = "/channels/{channel_id}/messages/{message_id}"
+    route = Route("PATCH", template, channel_id=channel_id, message_id=message_id)
+    http = create_http()
+    known_http = create_http()
+    known_http.bucket_hashes[route.endpoint] = "80c17d2f203122d936070c88c8d10f33"
+    results = {
+        "route": {
+            "construct_ns": best(lambda: Route("PATCH", template, channel_id=channel_id, message_id=message_id),
+                                 number),
+            "endpoint_ns": best(lambda: route.endpoint, number),
+            "bucket_ns": best(lambda: route.bucket, number)
+        },
+        "get_bucket": {
+            "unknown_hash_ns": best(lambda: http.get_bucket(route), number),
+            "known_hash_ns": best(lambda: known_http.get_bucket(route), number)
+        },
+        "merge_headers": {
+            "no_headers_ns": best(lambda: http.merge_headers({"json": {}}), number),
+            "headers_ns": best(lambda: http.merge_headers({"headers": {"Content-Type": "application/json"}}), number),
+            "reason_ns": best(lambda: http.merge_headers({"reason": "Spamming in #general"}), number)
+        }
+    }
+    loop = new_event_loop()
+    try:
+        results["times_per"] = {"trigger_ns": trigger_times_per(loop, number)}
+    finally:
+        loop.close()
+    return results
+
+
+if __name__ == '__main__':
+    for group, result in run().items():
+        print(f"{group}: " + ", ".join(f"{name} {value:.0f}" for name, value in result.items()))
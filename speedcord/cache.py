@@ -0,0 +1,208 @@
+"""
+Created by Epic at 10/17/26
+"""
+from collections import OrderedDict
+from logging import getLogger
+from time import monotonic
+
+__all__ = ("ResponseCache",)
+
+# Event name: paths that are outdated after the event. Formatted with the event data.
+INVALIDATIONS = {
+    "CHANNEL_CREATE": ("/guilds/{guild_id}/channels",),
+    "CHANNEL_UPDATE": ("/channels/{id}", "/guilds/{guild_id}/channels"),
+    "CHANNEL_DELETE": ("/channels/{id}", "/guilds/{guild_id}/channels"),
+    "CHANNEL_PINS_UPDATE": ("/channels/{channel_id}/pins",),
+    "GUILD_UPDATE": ("/guilds/{id}",),
+    "GUILD_DELETE": ("/guilds/{id}",),
+    "GUILD_BAN_ADD": ("/guilds/{guild_id}/bans", "/guilds/{guild_id}/bans/{user[id]}"),
+    "GUILD_BAN_REMOVE": ("/guilds/{guild_id}/bans", "/guilds/{guild_id}/bans/{user[id]}"),
+    "GUILD_EMOJIS_UPDATE": ("/guilds/{guild_id}/emojis",),
+    "GUILD_MEMBER_ADD": ("/guilds/{guild_id}/members",),
+    "GUILD_MEMBER_UPDATE": ("/guilds/{guild_id}/members", "/guilds/{guild_id}/members/{user[id]}"),
+    "GUILD_MEMBER_REMOVE": ("/guilds/{guild_id}/members", "/guilds/{guild_id}/members/{user[id]}"),
+    "GUILD_ROLE_CREATE": ("/guilds/{guild_id}", "/guilds/{guild_id}/roles"),
+    "GUILD_ROLE_UPDATE": ("/guilds/{guild_id}", "/guilds/{guild_id}/roles"),
+    "GUILD_ROLE_DELETE": ("/guilds/{guild_id}", "/guilds/{guild_id}/roles"),
+    "USER_UPDATE": ("/users/@me",),
+    "WEBHOOKS_UPDATE": ("/channels/{channel_id}/webhooks",)
+}
+# Invalidations of message responses. Message events are frequent and need the message intents, so these are opt-in.
+MESSAGE_INVALIDATIONS = {
+    "MESSAGE_CREATE": ("/channels/{channel_id}/messages",),
+    "MESSAGE_UPDATE": ("/channels/{channel_id}/messages", "/channels/{channel_id}/messages/{id}"),
+    "MESSAGE_DELETE": ("/channels/{channel_id}/messages", "/channels/{channel_id}/messages/{id}"),
+    "MESSAGE_DELETE_BULK": ("/channels/{channel_id}/messages",),
+    "MESSAGE_REACTION_ADD": ("/channels/{channel_id}/messages", "/channels/{channel_id}/messages/{message_id}"),
+    "MESSAGE_REACTION_REMOVE": ("/channels/{channel_id}/messages", "/channels/{channel_id}/messages/{message_id}"),
+    "MESSAGE_REACTION_REMOVE_ALL": ("/channels/{channel_id}/messages",
+                                    "/channels/{channel_id}/messages/{message_id}"),
+    "MESSAGE_REACTION_REMOVE_EMOJI": ("/channels/{channel_id}/messages",
+                                      "/channels/{channel_id}/messages/{message_id}")
+}
+
+
+class ResponseCache:
+    """
+    A size bounded cache for GET responses, kept up to date with gateway events.
+    The invalidators listen to every event in :data:`INVALIDATIONS`, so shards can't skip decoding those events.
+    Message responses are only invalidated with ``invalidate_messages``, otherwise they are cached until they expire.
+
+    Parameters
+    ----------
+    max_size: int
+        How many responses to keep before evicting the least recently used ones.
+    ttl: float
+        Seconds a response is cached for.
+    invalidate_messages: bool
+        Also listen to the events in :data:`MESSAGE_INVALIDATIONS`. Every message and reaction event is then decoded,
+        and with ``auto_intents`` the client requests the message and reaction intents.
+    """
+    def __init__(self, max_size=1000, ttl=60, *, invalidate_messages=False):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.invalidate_messages = invalidate_messages
+        self.logger = getLogger("speedcord.cache")
+
+        self.responses = OrderedDict()  # key: (path, response, expires at)
+        self.paths = {}  # path: set of keys
+        # Responses of requests started before their path was invalidated are outdated
+        self.generation = 0  # Increased by every invalidation
+        self.invalidated = OrderedDict()  # path: generation it was last invalidated at
+        self.forgotten_generation = 0  # Newest generation removed from invalidated
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.responses)
+
+    @property
+    def hit_ratio(self):
+        """
+        The share of lookups that were served from the cache, or None if nothing has been looked up yet.
+        """
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return None
+        return self.hits / lookups
+
+    def get(self, key):
+        """
+        Gets a cached response.
+
+        Parameters
+        ----------
+        key: Hashable
+            The request key.
+
+        Returns
+        -------
+        Optional[ClientResponse]
+            The cached response, or None if it isn't cached or has expired.
+        """
+        entry = self.responses.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        path, response, expires_at = entry
+        if monotonic() >= expires_at:
+            self.remove(key)
+            self.misses += 1
+            return None
+        self.responses.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def set(self, key, path, response, generation=None):
+        """
+        Caches a response. The response body has to be read already.
+        Responses of requests that were sent before their path was invalidated are not cached.
+
+        Parameters
+        ----------
+        key: Hashable
+            The request key.
+        path: str
+            The path of the request, used for invalidating it.
+        response: ClientResponse
+            The response to cache.
+        generation: Optional[int]
+            :attr:`generation` when the request was sent. None to always cache the response.
+        """
+        if generation is not None and generation < self.invalidated.get(path, self.forgotten_generation):
+            self.logger.debug(f"Not caching {path}, it was invalidated while the request was sent")
+            return
+        self.remove(key)
+        self.responses[key] = (path, response, monotonic() + self.ttl)
+        self.paths.setdefault(path, set()).add(key)
+        while len(self.responses) > self.max_size:
+            self.remove(next(iter(self.responses)))
+            self.evictions += 1
+
+    def remove(self, key):
+        entry = self.responses.pop(key, None)
+        if entry is None:
+            return
+        keys = self.paths[entry[0]]
+        keys.discard(key)
+        if not keys:
+            del self.paths[entry[0]]
+
+    def invalidate(self, path):
+        """
+        Removes all cached responses for a path.
+
+        Parameters
+        ----------
+        path: str
+            The path to invalidate.
+        """
+        self.generation += 1
+        self.invalidated[path] = self.generation
+        self.invalidated.move_to_end(path)
+        if len(self.invalidated) > self.max_size:
+            # Requests started before the forgotten invalidation aren't cached, in case they are outdated
+            _, self.forgotten_generation = self.invalidated.popitem(last=False)
+        keys = self.paths.get(path)
+        if keys is None:
+            return
+        for key in list(keys):
+            self.remove(key)
+        self.invalidations += 1
+        self.logger.debug(f"Invalidated {path}")
+
+    def clear(self):
+        self.responses.clear()
+        self.paths.clear()
+        self.generation += 1
+        self.invalidated.clear()
+        self.forgotten_generation = self.generation
+
+    def create_invalidator(self, paths):
+        def invalidator(data, shard):
+            for path in paths:
+                try:
+                    self.invalidate(path.format(**data))
+                except (KeyError, TypeError):
+                    # The event doesn't contain the data the path needs
+                    continue
+        return invalidator
+
+    def register(self, event_dispatcher):
+        """
+        Listens to the gateway events that outdate cached responses.
+
+        Parameters
+        ----------
+        event_dispatcher: EventDispatcher
+            The dispatcher of the client.
+        """
+        for event_name, paths in INVALIDATIONS.items():
+            event_dispatcher.register(event_name, self.create_invalidator(paths))
+        if self.invalidate_messages:
+            for event_name, paths in MESSAGE_INVALIDATIONS.items():
+                event_dispatcher.register(event_name, self.create_invalidator(paths))
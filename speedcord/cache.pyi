@@ -0,0 +1,57 @@
+from typing import Dict, Tuple, Set, Hashable, Optional, Callable, Any, OrderedDict
+from logging import Logger
+
+from aiohttp import ClientResponse
+
+from .dispatcher import EventDispatcher
+from .shard import DefaultShard
+
+INVALIDATIONS: Dict[str, Tuple[str, ...]]
+MESSAGE_INVALIDATIONS: Dict[str, Tuple[str, ...]]
+
+
+class ResponseCache:
+    max_size: int
+    ttl: float
+    invalidate_messages: bool
+    logger: Logger
+    responses: Dict[Hashable, Tuple[str, ClientResponse, float]]
+    paths: Dict[str, Set[Hashable]]
+    generation: int
+    invalidated: OrderedDict[str, int]
+    forgotten_generation: int
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+    def __init__(self, max_size: int = 1000, ttl: float = 60, *, invalidate_messages: bool = False):
+        ...
+
+    def __len__(self) -> int:
+        ...
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        ...
+
+    def get(self, key: Hashable) -> Optional[ClientResponse]:
+        ...
+
+    def set(self, key: Hashable, path: str, response: ClientResponse, generation: Optional[int] = None):
+        ...
+
+    def remove(self, key: Hashable):
+        ...
+
+    def invalidate(self, path: str):
+        ...
+
+    def clear(self):
+        ...
+
+    def create_invalidator(self, paths: Tuple[str, ...]) -> Callable[[Dict[str, Any], DefaultShard], None]:
+        ...
+
+    def register(self, event_dispatcher: EventDispatcher):
+        ...
@@ -1,21 +1,49 @@
 """
 Created by Epic at 9/1/20
 """
-from asyncio import Event, get_event_loop, Lock, sleep
+from asyncio import Event, get_event_loop, Lock, sleep, gather
+from itertools import zip_longest
 from logging import getLogger
-from time import time
+from time import perf_counter
 
 from .exceptions import Unauthorized, ConnectionsExceeded, InvalidToken, InvalidShardCount
 from .http import HttpClient, Route
 from .dispatcher import OpcodeDispatcher, EventDispatcher
+from .intents import Intents, EVENT_INTENTS, compute_intents, unsatisfiable_events
+from .filters import compile_filters, UNFILTERED_EVENTS
 from .shard import DefaultShard
 from .ratelimiter import TimesPer
 
 __all__ = ("Client",)
 
 
+def get_identify_waves(shard_ids, max_concurrency):
+    """
+    Groups shards into waves that can IDENTIFY at the same time.
+
+    Parameters
+    ----------
+    shard_ids: Iterable[int]
+        The shard IDs to group.
+    max_concurrency: int
+        How many identify buckets the bot has.
+
+    Returns
+    -------
+    List[List[int]]
+        The waves to start, each containing at most one shard per identify bucket.
+    """
+    buckets = {}
+    for shard_id in shard_ids:
+        buckets.setdefault(shard_id % max_concurrency, []).append(shard_id)
+    return [[shard_id for shard_id in wave if shard_id is not None] for wave in zip_longest(*buckets.values())]
+
+
 class Client:
-    def __init__(self, intents, token=None, *, shard_count=None, shard_ids=None):
+    def __init__(self, intents, token=None, *, shard_count=None, shard_ids=None, compress=None,
+                 encoding="json", response_cache=None, state_cache=None, eager_dispatch=False,
+                 ordered_dispatch=None, auto_intents=False, metrics=None, tracer=None, monitor=None,
+                 baseuri="https://discord.com/api/v8"):
         """
         The client used to interact with the discord API.
 
@@ -30,39 +58,98 @@ class Client:
         shard_ids: Optional[List[int]]
             A list of shard IDs to spawn. ``shard_count`` must be set for this
             to work.
+        compress: Optional[str]
+            Transport compression to use for the gateway. Only ``"zlib-stream"`` is supported.
+        encoding: str
+            The gateway encoding. Either ``"json"`` or ``"etf"``. ETF payloads are slightly smaller, but they are
+            decoded in pure Python, which takes around ten times the CPU time of JSON. Only use it if bandwidth
+            matters more than CPU time.
+        response_cache: Optional[ResponseCache]
+            Cache for REST GET responses. It is kept up to date with gateway events, so the events in
+            :data:`speedcord.cache.INVALIDATIONS` are always decoded even if no listener uses them. Message events are
+            only decoded for the cache if it invalidates messages.
+        state_cache: Optional[StateCache]
+            Cache for guilds, channels, roles and members received over the gateway.
+        eager_dispatch: bool
+            Run event handlers until they first suspend before creating a task for them. Handlers that finish without
+            suspending never get a task. See :class:`EventDispatcher` for the caveats.
+        ordered_dispatch: Optional[Union[str, Callable[[str, Any], Optional[Hashable]]]]
+            Handle events for the same guild (``"guild_id"``) or channel (``"channel_id"``) in order while other
+            guilds or channels are handled concurrently. See :class:`EventDispatcher`.
+        auto_intents: bool
+            Only request the intents needed by the registered listeners and caches. ``intents`` is the most that will
+            be requested. Events that are only used with :meth:`wait_for` need a listener to be counted.
+        metrics: Optional[Metrics]
+            Registry to record metrics in. Its server is started when the client connects if it has a port set.
+        tracer: Optional[Tracer]
+            Traces events from the moment a shard receives them through their handlers and the requests they send.
+        monitor: Optional[LoopMonitor]
+            Measures event loop lag while connected and reports the listeners blocking the loop.
+        baseuri: str
+            The URL of the Discord API, for example of a :class:`speedcord.testing.FakeDiscord` server.
 
         Raises
         ------
         TypeError
-            ``shard_ids`` was set without ``shard_count``.
+            ``shard_ids`` was set without ``shard_count`` or an unsupported ``compress``, ``encoding`` or
+            ``ordered_dispatch`` value was passed.
         """
         # Configurable stuff
         self.intents = int(intents)
+        self.requested_intents = self.intents
         self.token = token
         self.shard_count = shard_count
         self.shard_ids = shard_ids
+        self.compress = compress
+        self.encoding = encoding
+        self.response_cache = response_cache
+        self.state_cache = state_cache
+        self.eager_dispatch = eager_dispatch
+        self.ordered_dispatch = ordered_dispatch
+        self.auto_intents = auto_intents
+        self.metrics = metrics
+        self.tracer = tracer
+        self.monitor = monitor
+        self.baseuri = baseuri
 
         # Things used by the lib, usually doesn't need to get changed but can if you want to.
         self.shards = []
         self.loop = get_event_loop()
         self.logger = getLogger("speedcord")
         self.http = None
-        self.opcode_dispatcher = OpcodeDispatcher(self.loop)
-        self.event_dispatcher = EventDispatcher(self.loop)
+        self.opcode_dispatcher = OpcodeDispatcher(self.loop, eager=eager_dispatch)
+        self.event_dispatcher = EventDispatcher(self.loop, eager=eager_dispatch, ordered_by=ordered_dispatch,
+                                                metrics=metrics, tracer=tracer, monitor=monitor)
         self.connected = Event()
-        self.exit_event = Event(loop=self.loop)
+        self.exit_event = Event()
         self.remaining_connections = None
-        self.connection_lock = Lock(loop=self.loop)
+        self.connection_lock = Lock()
         self.fatal_exception = None
         self.connect_ratelimiter = None
         self.current_shard_count = shard_count if shard_count else None
+        self.startup_time = None
+        self.identify_coordinator = None  # Shares IDENTIFY limits with other processes, see speedcord.cluster
+        self.gateway = None  # /gateway/bot response shared by a cluster, used instead of requesting it
+        self.filters = []  # (filter, event names or None for all events)
+        self.compiled_filters = {}  # Event name: combined filter for that event, compiled on first use
 
         # Default event handlers
         self.opcode_dispatcher.register(0, self.handle_dispatch)
+        if self.response_cache is not None:
+            self.response_cache.register(self.event_dispatcher)
+        if self.state_cache is not None:
+            # Registered before any listener, so listeners see the cache updated with their event
+            self.state_cache.register(self.event_dispatcher)
+        if self.metrics is not None:
+            self.metrics.collect_client(self)
 
         # Check types
         if shard_count is None and shard_ids is not None:
             raise TypeError("You have to set shard_count if you use shard_ids")
+        if compress not in (None, "zlib-stream"):
+            raise TypeError("Unsupported gateway compression! Only zlib-stream is supported.")
+        if encoding not in ("json", "etf"):
+            raise TypeError("Unsupported gateway encoding! Use json or etf.")
 
     def run(self):
         """
@@ -91,13 +178,16 @@ class Client:
         Unauthorized
             Authentication failed.
         """
-        route = Route("GET", "/gateway/bot")
-        try:
-            r = await self.http.request(route)
-        except Unauthorized:
-            await self.close()
-            raise
-        data = await r.json()
+        if self.gateway is not None:
+            data = self.gateway
+        else:
+            route = Route("GET", "/gateway/bot")
+            try:
+                r = await self.http.request(route)
+            except Unauthorized:
+                await self.close()
+                raise
+            data = await r.json()
 
         shards = data["shards"]
         remaining_connections = data["session_start_limit"]["remaining"]
@@ -105,7 +195,8 @@ class Client:
         max_concurrency = data["session_start_limit"]["max_concurrency"]
         gateway_url = data["url"]
 
-        if remaining_connections == 0:
+        if remaining_connections == 0 and self.identify_coordinator is None:
+            # The coordinator waits for the limit to reset instead
             raise ConnectionsExceeded
         self.remaining_connections = remaining_connections
         self.logger.debug(f"{remaining_connections} gateway connections left!")
@@ -123,7 +214,14 @@ class Client:
         if self.token is None:
             raise InvalidToken
         if self.http is None:
-            self.http = HttpClient(self.token, loop=self.loop)
+            self.http = HttpClient(self.token, baseuri=self.baseuri, loop=self.loop, cache=self.response_cache,
+                                   metrics=self.metrics, tracer=self.tracer)
+        if self.metrics is not None and self.metrics.port is not None:
+            await self.metrics.start_server()
+        if self.auto_intents:
+            self.intents = self.minimize_intents()
+        if self.monitor is not None:
+            self.monitor.start(self.loop)
         await self.spawn_shards(self.shards, shard_ids=self.shard_ids)
         self.connected.set()
         self.logger.info("All shards connected!")
@@ -139,22 +237,58 @@ class Client:
         """
         if self.token is None:
             raise InvalidToken
-        self.http = HttpClient(self.token, loop=self.loop)
+        self.http = HttpClient(self.token, baseuri=self.baseuri, loop=self.loop, cache=self.response_cache,
+                               metrics=self.metrics, tracer=self.tracer)
 
         await self.connect()
 
         await self.exit_event.wait()
         await self.close()
 
+    def minimize_intents(self):
+        """
+        Works out the intents needed by the registered listeners and caches. Logs the intents that are left out and
+        warns about listeners that won't receive events with the requested intents.
+
+        Returns
+        -------
+        int
+            The requested intents without the ones nothing listens to.
+        """
+        if len(self.opcode_dispatcher.event_handlers.get(0, ())) > 1:
+            self.logger.info("Not minimizing intents as something listens to raw dispatches.")
+            return self.requested_intents
+        event_names = list(self.event_dispatcher.event_handlers)
+        intents = int(compute_intents(event_names)) & self.requested_intents
+        avoided = self.requested_intents & ~intents
+        if avoided:
+            avoided_intents = [intent.name for intent in Intents if intent & avoided]
+            avoided_events = [event_name for event_name, event_intents in EVENT_INTENTS.items()
+                              if event_intents & self.requested_intents and not event_intents & intents]
+            self.logger.info(f"Not requesting intents {', '.join(avoided_intents)} as nothing listens to their events. "
+                             f"Skipped events: {', '.join(avoided_events) or 'none'}")
+        for event_name in unsatisfiable_events(event_names, intents):
+            needed = [intent.name for intent in Intents if intent & EVENT_INTENTS[event_name]]
+            self.logger.warning(f"Nothing will be dispatched to listeners of {event_name}. It needs one of the intents "
+                                f"{', '.join(needed)}.")
+        return intents
+
     async def close(self):
         """
         Closes the HTTP client and disconnects all shards.
         """
         self.connected.clear()
         self.exit_event.set()
-        await self.http.close()
+        # Shards use the HTTP client's session for their websockets
         for shard in self.shards:
             await shard.close()
+        await self.http.close()
+        if self.metrics is not None:
+            await self.metrics.close()
+        if self.tracer is not None:
+            self.tracer.close()
+        if self.monitor is not None:
+            self.monitor.stop()
 
     async def fatal(self, exception):
         """
@@ -165,14 +299,30 @@ class Client:
         await self.close()
 
     async def spawn_shards(self, shard_list, *, activate_automatically=True, shard_ids=None):
+        """
+        Connects shards in waves. Each wave contains at most one shard per identify bucket
+        (``shard_id % max_concurrency``) and waves are started 5 seconds apart.
+        A ``STARTUP_PROGRESS`` event is dispatched after every wave.
+
+        Parameters
+        ----------
+        shard_list: List[DefaultShard]
+            List the connected shards will be added to.
+        activate_automatically: bool
+            If the shards should dispatch events as soon as they are connected.
+        shard_ids: Optional[List[int]]
+            The shard IDs to spawn. Defaults to all shards.
+        """
+        started_at = perf_counter()
         try:
             gateway_url, shard_count, connections_left, \
-            connections_reset_after, max_concurrency = await self.get_gateway()
+                connections_reset_after, max_concurrency = await self.get_gateway()
         except Unauthorized as e:
             await self.fatal(e)
             return
         if self.connect_ratelimiter is None:
-            self.connect_ratelimiter = TimesPer(max_concurrency, 5)
+            # One wave per 5 seconds
+            self.connect_ratelimiter = TimesPer(1, 5)
         if self.current_shard_count is None:
             self.current_shard_count = self.shard_count or shard_count
         if shard_count > self.current_shard_count:
@@ -181,35 +331,59 @@ class Client:
             self.current_shard_count = shard_count
         if shard_ids is None:
             shard_ids = range(self.current_shard_count)
+        waves = get_identify_waves(shard_ids, max_concurrency)
+        connected_shards = 0
         async with self.connection_lock:
-            for shard_id in shard_ids:
-                connections_left -= 1
-                if connections_left <= 1:
-                    sleep_time = (connections_reset_after / 1000) - time()
-                    if sleep_time > 0:
+            for wave_id, wave in enumerate(waves):
+                if self.identify_coordinator is None:
+                    if len(wave) > connections_left:
                         self.logger.warning("You have used up all your gateway IDENTIFYs. Sleeping until it resets.")
-                        await sleep(connections_reset_after - time())
-                    try:
-                        gateway_url, shard_count, connections_left, \
-                        connections_reset_after, max_concurrency = await self.get_gateway()
-                    except Unauthorized as e:
-                        await self.fatal(e)
-                        return
-                await self.connect_ratelimiter.trigger()
-                self.logger.info(f"Launching shard {shard_id}")
-                shard = DefaultShard(shard_id, self, loop=self.loop)
-                if not activate_automatically:
-                    shard.active = False
-                else:
-                    shard.active = True
-                self.logger.debug("Connecting shard")
-                await shard.connect(gateway_url)
-                self.logger.debug("Connected shard!")
-                shard_list.append(shard)
-            self.logger.debug("All shards connected")
-            self.remaining_connections = connections_left
-
-    def listen(self, event):
+                        await sleep(connections_reset_after / 1000)
+                        try:
+                            gateway_url, shard_count, connections_left, \
+                                connections_reset_after, max_concurrency = await self.get_gateway()
+                        except Unauthorized as e:
+                            await self.fatal(e)
+                            return
+                    connections_left -= len(wave)
+                    await self.connect_ratelimiter.trigger()
+                self.logger.info(f"Launching shards {', '.join(str(shard_id) for shard_id in wave)}")
+                shards = [DefaultShard(shard_id, self, loop=self.loop) for shard_id in wave]
+                for shard in shards:
+                    shard.active = activate_automatically
+                await gather(*[shard.connect(gateway_url) for shard in shards])
+                shard_list.extend(shards)
+                connected_shards += len(shards)
+                self.logger.debug(f"Connected wave {wave_id + 1}/{len(waves)}")
+                self.event_dispatcher.dispatch("STARTUP_PROGRESS", {
+                    "wave": wave_id + 1,
+                    "waves": len(waves),
+                    "shard_ids": wave,
+                    "connected_shards": connected_shards,
+                    "total_shards": len(shard_ids)
+                }, None)
+            self.startup_time = perf_counter() - started_at
+            self.logger.debug(f"All shards connected in {self.startup_time:.2f}s")
+            if self.identify_coordinator is None:
+                self.remaining_connections = connections_left
+
+    @property
+    def compression_ratio(self):
+        """
+        The combined gateway compression ratio of all shards.
+
+        Returns
+        -------
+        Optional[float]
+            How many times smaller the received data was compared to the decompressed payloads. ``None`` if
+            compression is disabled or nothing has been received yet.
+        """
+        compressed_bytes = sum(shard.compressed_bytes for shard in self.shards)
+        if compressed_bytes == 0:
+            return None
+        return sum(shard.decompressed_bytes for shard in self.shards) / compressed_bytes
+
+    def listen(self, event, **options):
         """
         Listen to an event or opcode.
 
@@ -217,6 +391,9 @@ class Client:
         ----------
         event: Union[int, str]
             An opcode or event name to listen to.
+        **options: Any
+            Options for :meth:`EventDispatcher.register` such as ``concurrency``, ``max_queue`` and ``overflow``.
+            Only supported for event names.
 
         Raises
         ------
@@ -225,19 +402,93 @@ class Client:
         """
 
         def get_func(func):
-            if isinstance(event, int):
+            if isinstance(event, int) and not options:
                 self.opcode_dispatcher.register(event, func)
             elif isinstance(event, str):
-                self.event_dispatcher.register(event, func)
+                self.event_dispatcher.register(event, func, **options)
             else:
                 raise TypeError("Invalid event type!")
 
         return get_func
 
+    def add_filter(self, event_filter, *, events=None):
+        """
+        Adds a filter that runs before events are dispatched. Events it drops don't reach listeners, caches or
+        :meth:`wait_for`. READY and RESUMED are never filtered as the shards need them to connect.
+        See :mod:`speedcord.filters` for built in filters.
+
+        Parameters
+        ----------
+        event_filter: Callable[[str, Dict[str, Any]], bool]
+            Called with the event name and data, returns a falsy value to drop the event.
+        events: Optional[Iterable[str]]
+            The events the filter applies to. Defaults to all events.
+
+        Returns
+        -------
+        Callable[[str, Dict[str, Any]], bool]
+            The filter.
+        """
+        events = frozenset(event_name.upper() for event_name in events) if events is not None else None
+        self.filters.append((event_filter, events))
+        self.compiled_filters.clear()
+        return event_filter
+
+    def compile_filters(self, event_name):
+        if event_name in UNFILTERED_EVENTS:
+            filters = []
+        else:
+            filters = [event_filter for event_filter, events in self.filters
+                       if events is None or event_name in events]
+        event_filter = self.compiled_filters[event_name] = compile_filters(filters)
+        return event_filter
+
+    async def wait_for(self, event, *, key=None, check=None, timeout=None):
+        """
+        Waits for the next event matching a key and check.
+
+        Parameters
+        ----------
+        event: str
+            The event name to wait for.
+        key: Optional[Dict[str, Union[int, str]]]
+            Fields the event has to match, for example ``{"channel_id": 1, "user_id": 2}``.
+            Waiters are indexed by these fields, so prefer them over ``check``.
+        check: Optional[Callable[[Dict[str, Any]], bool]]
+            Called with the event data of events matching the key.
+        timeout: Optional[float]
+            Seconds to wait before raising :class:`asyncio.TimeoutError`.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The data of the event.
+        """
+        return await self.event_dispatcher.wait_for(event, key=key, check=check, timeout=timeout)
+
+    def is_listening(self, event_name):
+        """
+        Checks if anything will handle an event. Used by shards to skip decoding events nobody listens to.
+
+        Parameters
+        ----------
+        event_name: str
+            The name of the event.
+
+        Returns
+        -------
+        bool
+            If the event has to be decoded and dispatched.
+        """
+        if len(self.opcode_dispatcher.event_handlers.get(0, [])) > 1:
+            # Someone listens to raw dispatches
+            return True
+        return self.event_dispatcher.has_handlers(event_name)
+
     # Handle events
-    async def handle_dispatch(self, data, shard):
+    def handle_dispatch(self, data, shard):
         """
-        Dispatches a event to the event handler.
+        Dispatches a event to the event handler. Called inline by the :class:`OpcodeDispatcher`.
 
         Parameters
         ----------
@@ -246,4 +497,12 @@ class Client:
         shard: DefaultShard
             Shard the event was received on.
         """
-        self.event_dispatcher.dispatch(data["t"], data["d"], shard)
+        event_name = data["t"]
+        if self.filters:
+            try:
+                event_filter = self.compiled_filters[event_name]
+            except KeyError:
+                event_filter = self.compile_filters(event_name)
+            if event_filter is not None and not event_filter(event_name, data["d"]):
+                return
+        self.event_dispatcher.dispatch(event_name, data["d"], shard)
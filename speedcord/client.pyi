@@ -1,4 +1,4 @@
-from typing import List, Optional, Union, Tuple, Callable, Any
+from typing import List, Optional, Union, Tuple, Callable, Any, Iterable, Hashable, Dict, FrozenSet
 from asyncio import AbstractEventLoop, Event, Lock
 from logging import Logger
 
@@ -6,6 +6,17 @@ from .shard import DefaultShard
 from .http import HttpClient
 from .dispatcher import EventDispatcher, OpcodeDispatcher
 from .ratelimiter import TimesPer
+from .cluster import CoordinatorClient
+from .cache import ResponseCache
+from .state import StateCache
+from .filters import EventFilter
+from .metrics import Metrics
+from .tracing import Tracer
+from .monitor import LoopMonitor
+
+
+def get_identify_waves(shard_ids: Iterable[int], max_concurrency: int) -> List[List[int]]:
+    ...
 
 
 class Client:
@@ -13,6 +24,10 @@ class Client:
     token: str
     shard_count: int
     shard_ids: List[int]
+    compress: Optional[str]
+    encoding: str
+    response_cache: Optional[ResponseCache]
+    state_cache: Optional[StateCache]
 
     shards: List[DefaultShard]
     loop: AbstractEventLoop
@@ -27,9 +42,28 @@ class Client:
     fatal_exception: Optional[Exception]
     connect_ratelimiter: Optional[TimesPer]
     current_shard_count: Optional[int]
+    startup_time: Optional[float]
+    identify_coordinator: Optional[CoordinatorClient]
+    gateway: Optional[Dict[str, Any]]
+    eager_dispatch: bool
+    filters: List[Tuple[EventFilter, Optional[FrozenSet[str]]]]
+    compiled_filters: Dict[str, Optional[EventFilter]]
+    auto_intents: bool
+    metrics: Optional[Metrics]
+    tracer: Optional[Tracer]
+    monitor: Optional[LoopMonitor]
+    baseuri: str
+    requested_intents: int
+    ordered_dispatch: Optional[Union[str, Callable[[str, Any], Optional[Hashable]]]]
 
     def __init__(self, intents: int, token: Optional[str] = None, *, shard_count: Optional[int] = None,
-                 shard_ids: Optional[List[int]] = None):
+                 shard_ids: Optional[List[int]] = None, compress: Optional[str] = None,
+                 encoding: str = "json", response_cache: Optional[ResponseCache] = None,
+                 state_cache: Optional[StateCache] = None, eager_dispatch: bool = False,
+                 ordered_dispatch: Optional[Union[str, Callable[[str, Any], Optional[Hashable]]]] = None,
+                 auto_intents: bool = False, metrics: Optional[Metrics] = None,
+                 tracer: Optional[Tracer] = None, monitor: Optional[LoopMonitor] = None,
+                 baseuri: str = "https://discord.com/api/v8"):
         ...
 
     def run(self):
@@ -44,17 +78,38 @@ class Client:
     async def start(self):
         ...
 
+    def minimize_intents(self) -> int:
+        ...
+
     async def close(self):
         ...
 
     async def fatal(self, exception: Optional[Exception]):
         ...
 
-    async def spawn_shards(self, shard_list: list, *, activate_automatically: bool = True, shard_ids: Optional[List] = None):
+    async def spawn_shards(self, shard_list: List[DefaultShard], *, activate_automatically: bool = True, shard_ids: Optional[List] = None):
+        ...
+
+    @property
+    def compression_ratio(self) -> Optional[float]:
+        ...
+
+    def listen(self, event: Union[str, int], **options: Any) -> Callable[[Callable[[dict, DefaultShard], Any]], Any]:
+        ...
+
+    def add_filter(self, event_filter: EventFilter, *, events: Optional[Iterable[str]] = None) -> EventFilter:
+        ...
+
+    def compile_filters(self, event_name: str) -> Optional[EventFilter]:
+        ...
+
+    async def wait_for(self, event: str, *, key: Optional[Dict[str, Union[int, str]]] = None,
+                       check: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                       timeout: Optional[float] = None) -> Dict[str, Any]:
         ...
 
-    def listen(self, event: Union[str, int]) -> Callable[[Callable[[dict, DefaultShard], Any]], Any]:
+    def is_listening(self, event_name: str) -> bool:
         ...
 
-    async def handle_dispatch(self, data: dict, shard: DefaultShard):
+    def handle_dispatch(self, data: dict, shard: DefaultShard):
         ...
@@ -0,0 +1,332 @@
+"""
+Created by Epic at 10/17/26
+
+Runs shards over multiple processes while sharing the IDENTIFY limits between them.
+"""
+from asyncio import Lock, sleep, start_unix_server, open_unix_connection, get_event_loop, gather
+from logging import getLogger
+from multiprocessing import get_context
+from os import getpid, remove
+from os.path import join, exists
+from tempfile import gettempdir
+from time import time
+
+from ujson import loads, dumps
+
+from .client import Client
+from .exceptions import InvalidToken
+from .http import HttpClient, Route
+
+__all__ = ("IdentifyCoordinator", "CoordinatorClient", "Cluster")
+
+logger = getLogger("speedcord.cluster")
+
+
+class IdentifyCoordinator:
+    """
+    Hands out IDENTIFY slots to shards in all processes of a cluster.
+    Only one shard per identify bucket (``shard_id % max_concurrency``) may identify every ``identify_interval``
+    seconds and no more than ``remaining_connections`` shards may identify before the session start limit resets.
+    A slot is held from :meth:`acquire` until :meth:`release`, so the interval starts once the IDENTIFY is sent.
+
+    Parameters
+    ----------
+    max_concurrency: int
+        How many identify buckets the bot has.
+    remaining_connections: int
+        How many IDENTIFYs are left before the session start limit resets.
+    reset_after: int
+        Milliseconds until the session start limit resets.
+    refresh: Optional[Callable[[], Awaitable[Tuple[int, int]]]]
+        Coroutine function returning the new remaining connections and reset after once the limit has reset.
+    identify_interval: float
+        Seconds between IDENTIFYs in the same bucket.
+    """
+    def __init__(self, max_concurrency, remaining_connections, reset_after, *, refresh=None, identify_interval=5):
+        self.max_concurrency = max_concurrency
+        self.remaining_connections = remaining_connections
+        self.reset_at = time() + reset_after / 1000
+        self.refresh = refresh
+        self.identify_interval = identify_interval
+
+        self.bucket_locks = {}
+        self.bucket_available_at = {}
+        self.connections_lock = Lock()
+        self.server = None
+
+    async def acquire(self, shard_id):
+        """
+        Waits until a shard is allowed to IDENTIFY. Other shards in its bucket wait until :meth:`release` is
+        called.
+
+        Parameters
+        ----------
+        shard_id: int
+            The shard that wants to IDENTIFY.
+
+        Returns
+        -------
+        int
+            How many IDENTIFYs are left after this one.
+        """
+        bucket = shard_id % self.max_concurrency
+        lock = self.bucket_locks.setdefault(bucket, Lock())
+        await lock.acquire()
+        try:
+            wait_for = self.bucket_available_at.get(bucket, 0) - time()
+            if wait_for > 0:
+                await sleep(wait_for)
+            async with self.connections_lock:
+                if self.remaining_connections <= 0:
+                    logger.warning("The cluster has used up all its gateway IDENTIFYs. Sleeping until it resets.")
+                    await sleep(max(self.reset_at - time(), 0))
+                    if self.refresh is not None:
+                        self.remaining_connections, reset_after = await self.refresh()
+                        self.reset_at = time() + reset_after / 1000
+                self.remaining_connections -= 1
+                remaining_connections = self.remaining_connections
+        except BaseException:
+            lock.release()
+            raise
+        logger.debug(f"Shard {shard_id} may identify. {remaining_connections} gateway connections left!")
+        return remaining_connections
+
+    async def release(self, shard_id):
+        """
+        Frees the slot of a shard once it has sent its IDENTIFY.
+
+        Parameters
+        ----------
+        shard_id: int
+            The shard that identified.
+        """
+        bucket = shard_id % self.max_concurrency
+        self.bucket_available_at[bucket] = time() + self.identify_interval
+        self.bucket_locks[bucket].release()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            request = loads(line)
+            if request.get("op") == "identify":
+                shard_id = request["shard_id"]
+                remaining_connections = await self.acquire(shard_id)
+                try:
+                    writer.write(dumps({"remaining": remaining_connections}).encode() + b"\n")
+                    await writer.drain()
+                    # The worker reports once the IDENTIFY is sent, or closes the connection if it failed
+                    await reader.readline()
+                finally:
+                    await self.release(shard_id)
+        finally:
+            writer.close()
+
+    async def start(self, path):
+        """
+        Starts listening for workers on a unix socket.
+
+        Parameters
+        ----------
+        path: str
+            Path of the unix socket.
+        """
+        if exists(path):
+            remove(path)
+        self.server = await start_unix_server(self.handle_connection, path)
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+class CoordinatorClient:
+    """
+    Used by a :class:`Client` in a worker process to request IDENTIFY slots from the :class:`IdentifyCoordinator`.
+
+    Parameters
+    ----------
+    path: str
+        Path of the coordinator's unix socket.
+    """
+    def __init__(self, path):
+        self.path = path
+
+        # Shard ID: connection holding its slot
+        self.writers = {}
+
+    async def acquire(self, shard_id):
+        """
+        Waits until a shard is allowed to IDENTIFY. The slot is held until :meth:`release` is called.
+
+        Parameters
+        ----------
+        shard_id: int
+            The shard that wants to IDENTIFY.
+
+        Returns
+        -------
+        int
+            How many IDENTIFYs the cluster has left.
+        """
+        reader, writer = await open_unix_connection(self.path)
+        try:
+            writer.write(dumps({"op": "identify", "shard_id": shard_id}).encode() + b"\n")
+            await writer.drain()
+            response = loads(await reader.readline())
+        except BaseException:
+            writer.close()
+            raise
+        self.writers[shard_id] = writer
+        return response["remaining"]
+
+    async def release(self, shard_id):
+        """
+        Frees the slot of a shard once it has sent its IDENTIFY.
+
+        Parameters
+        ----------
+        shard_id: int
+            The shard that identified.
+        """
+        writer = self.writers.pop(shard_id)
+        try:
+            writer.write(dumps({"op": "identified", "shard_id": shard_id}).encode() + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+def run_worker(setup, socket_path, gateway, intents, token, shard_count, shard_ids, client_options):
+    client = Client(intents, token, shard_count=shard_count, shard_ids=shard_ids, **client_options)
+    client.identify_coordinator = CoordinatorClient(socket_path)
+    client.gateway = gateway
+    if setup is not None:
+        setup(client)
+    client.run()
+
+
+class Cluster:
+    """
+    Splits shards over multiple worker processes, each running its own :class:`Client`.
+
+    Parameters
+    ----------
+    intents: int
+        The intents to use.
+    token: str
+        Discord bot token to use.
+    setup: Optional[Callable[[Client], Any]]
+        Called with the :class:`Client` of each worker before it starts. Use this to register listeners.
+        It has to be importable from the worker processes, so it should be a module level function.
+    processes: int
+        How many worker processes to start.
+    shard_count: Optional[int]
+        How many shards the cluster should use. Defaults to the count recommended by Discord.
+    shard_ids: Optional[List[int]]
+        The shard IDs this cluster should run. ``shard_count`` must be set for this to work.
+    socket_path: Optional[str]
+        Path of the unix socket used for coordinating IDENTIFYs.
+    **client_options: Any
+        Keyword arguments passed to every :class:`Client`.
+
+    Raises
+    ------
+    TypeError
+        ``shard_ids`` was set without ``shard_count``.
+    """
+    def __init__(self, intents, token, setup=None, *, processes, shard_count=None, shard_ids=None, socket_path=None,
+                 **client_options):
+        self.intents = int(intents)
+        self.token = token
+        self.setup = setup
+        self.processes = processes
+        self.shard_count = shard_count
+        self.shard_ids = shard_ids
+        self.socket_path = socket_path or join(gettempdir(), f"speedcord-{getpid()}.sock")
+        self.client_options = client_options
+
+        self.loop = get_event_loop()
+        self.http = None
+        self.coordinator = None
+        self.workers = []
+
+        if shard_count is None and shard_ids is not None:
+            raise TypeError("You have to set shard_count if you use shard_ids")
+
+    def run(self):
+        """
+        Starts the cluster and blocks until all workers exit.
+        """
+        try:
+            self.loop.run_until_complete(self.start())
+        except KeyboardInterrupt:
+            self.loop.run_until_complete(self.close())
+
+    async def get_session_start_limit(self):
+        route = Route("GET", "/gateway/bot")
+        r = await self.http.request(route)
+        return await r.json()
+
+    async def refresh(self):
+        data = await self.get_session_start_limit()
+        return data["session_start_limit"]["remaining"], data["session_start_limit"]["reset_after"]
+
+    def split_shards(self, shard_ids):
+        """
+        Splits shards into one chunk per worker.
+
+        Parameters
+        ----------
+        shard_ids: List[int]
+            The shard IDs to split.
+
+        Returns
+        -------
+        List[List[int]]
+            The shards for each worker.
+        """
+        processes = min(self.processes, len(shard_ids))
+        return [list(shard_ids[worker_id::processes]) for worker_id in range(processes)]
+
+    async def start(self):
+        if self.token is None:
+            raise InvalidToken
+        self.http = HttpClient(self.token, loop=self.loop)
+        data = await self.get_session_start_limit()
+        session_start_limit = data["session_start_limit"]
+        shard_count = self.shard_count or data["shards"]
+        shard_ids = list(self.shard_ids if self.shard_ids is not None else range(shard_count))
+
+        self.coordinator = IdentifyCoordinator(session_start_limit["max_concurrency"],
+                                               session_start_limit["remaining"],
+                                               session_start_limit["reset_after"], refresh=self.refresh)
+        await self.coordinator.start(self.socket_path)
+
+        context = get_context("spawn")
+        for worker_shard_ids in self.split_shards(shard_ids):
+            logger.info(f"Starting worker with shards {', '.join(str(shard_id) for shard_id in worker_shard_ids)}")
+            # The workers use the gateway info fetched here instead of each requesting it
+            worker = context.Process(target=run_worker, args=(self.setup, self.socket_path, data, self.intents,
+                                                              self.token, shard_count, worker_shard_ids,
+                                                              self.client_options))
+            worker.start()
+            self.workers.append(worker)
+        await gather(*[self.loop.run_in_executor(None, worker.join) for worker in self.workers])
+        await self.close()
+
+    async def close(self):
+        """
+        Stops all workers and the coordinator.
+        """
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.terminate()
+        if self.coordinator is not None:
+            await self.coordinator.close()
+        if self.http is not None:
+            await self.http.close()
+        if exists(self.socket_path):
+            remove(self.socket_path)
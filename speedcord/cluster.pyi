@@ -0,0 +1,94 @@
+from typing import Optional, Callable, Awaitable, Tuple, Dict, List, Any
+from asyncio import AbstractEventLoop, Lock, AbstractServer, StreamReader, StreamWriter
+from multiprocessing.process import BaseProcess
+
+from .client import Client
+from .http import HttpClient
+
+
+class IdentifyCoordinator:
+    max_concurrency: int
+    remaining_connections: int
+    reset_at: float
+    refresh: Optional[Callable[[], Awaitable[Tuple[int, int]]]]
+    identify_interval: float
+    bucket_locks: Dict[int, Lock]
+    bucket_available_at: Dict[int, float]
+    connections_lock: Lock
+    server: Optional[AbstractServer]
+
+    def __init__(self, max_concurrency: int, remaining_connections: int, reset_after: int, *,
+                 refresh: Optional[Callable[[], Awaitable[Tuple[int, int]]]] = None, identify_interval: float = 5):
+        ...
+
+    async def acquire(self, shard_id: int) -> int:
+        ...
+
+    async def release(self, shard_id: int):
+        ...
+
+    async def handle_connection(self, reader: StreamReader, writer: StreamWriter):
+        ...
+
+    async def start(self, path: str):
+        ...
+
+    async def close(self):
+        ...
+
+
+class CoordinatorClient:
+    path: str
+    writers: Dict[int, StreamWriter]
+
+    def __init__(self, path: str):
+        ...
+
+    async def acquire(self, shard_id: int) -> int:
+        ...
+
+    async def release(self, shard_id: int):
+        ...
+
+
+def run_worker(setup: Optional[Callable[[Client], Any]], socket_path: str, gateway: Dict[str, Any], intents: int,
+               token: str, shard_count: int, shard_ids: List[int], client_options: Dict[str, Any]):
+    ...
+
+
+class Cluster:
+    intents: int
+    token: str
+    setup: Optional[Callable[[Client], Any]]
+    processes: int
+    shard_count: Optional[int]
+    shard_ids: Optional[List[int]]
+    socket_path: str
+    client_options: Dict[str, Any]
+    loop: AbstractEventLoop
+    http: Optional[HttpClient]
+    coordinator: Optional[IdentifyCoordinator]
+    workers: List[BaseProcess]
+
+    def __init__(self, intents: int, token: str, setup: Optional[Callable[[Client], Any]] = None, *, processes: int,
+                 shard_count: Optional[int] = None, shard_ids: Optional[List[int]] = None,
+                 socket_path: Optional[str] = None, **client_options: Any):
+        ...
+
+    def run(self):
+        ...
+
+    async def get_session_start_limit(self) -> Dict[str, Any]:
+        ...
+
+    async def refresh(self) -> Tuple[int, int]:
+        ...
+
+    def split_shards(self, shard_ids: List[int]) -> List[List[int]]:
+        ...
+
+    async def start(self):
+        ...
+
+    async def close(self):
+        ...
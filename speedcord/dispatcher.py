@@ -2,10 +2,279 @@
 Created by Epic at 9/1/20
 """
 
-from asyncio import AbstractEventLoop
+from asyncio import AbstractEventLoop, Event, ensure_future, wait_for
+from collections import deque
+from contextvars import copy_context
+from inspect import iscoroutinefunction, isawaitable
 import logging
 
-__all__ = ("OpcodeDispatcher", "EventDispatcher")
+from .tracing import current_span
+
+__all__ = ("OpcodeDispatcher", "EventDispatcher", "HandlerPool")
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+
+def get_guild_id(event_name, data):
+    """
+    Gets the guild an event belongs to, or None for events outside of guilds.
+    """
+    guild_id = data.get("guild_id")
+    if guild_id is None and event_name.startswith("GUILD_"):
+        # GUILD_CREATE, GUILD_UPDATE and GUILD_DELETE are the guild itself
+        guild_id = data.get("id")
+    return guild_id
+
+
+def get_user(data):
+    """
+    Gets the user that caused an event.
+    """
+    # Messages have an author, interactions a user or member
+    user = data.get("author") or data.get("user") or (data.get("member") or {}).get("user")
+    return user if isinstance(user, dict) else None
+
+
+def guild_key(event_name, data):
+    """
+    Orders events by guild, falling back to the channel for events outside of guilds.
+    """
+    if not isinstance(data, dict):
+        return None
+    guild_id = get_guild_id(event_name, data)
+    if guild_id is not None:
+        return guild_id
+    return channel_key(event_name, data)
+
+
+def channel_key(event_name, data):
+    """
+    Orders events by channel.
+    """
+    if not isinstance(data, dict):
+        return None
+    channel_id = data.get("channel_id")
+    if channel_id is None and event_name.startswith("CHANNEL_"):
+        channel_id = data.get("id")
+    return channel_id
+
+
+ORDER_KEYS = {
+    "guild_id": guild_key,
+    "channel_id": channel_key
+}
+
+
+def get_key_value(data, field):
+    """
+    Gets a field used for indexing waiters from event data. Values are strings, like snowflakes in payloads.
+    """
+    value = data.get(field)
+    if value is None:
+        if field == "user_id":
+            user = get_user(data)
+            value = None if user is None else user.get("id")
+        elif field == "message_id":
+            # MESSAGE_UPDATE and MESSAGE_DELETE are the message itself
+            value = data.get("id")
+    return None if value is None else str(value)
+
+
+class EagerStart:
+    """
+    Awaitable continuing a coroutine that already ran until its first suspension outside of a task.
+    Every step runs in the context the first step ran in, so context variables the coroutine sets stay with it.
+    """
+    __slots__ = ("coro", "yielded", "context")
+
+    def __init__(self, coro, yielded, context):
+        self.coro = coro
+        self.yielded = yielded
+        self.context = context
+
+    def __await__(self):
+        coro = self.coro
+        yielded = self.yielded
+        run = self.context.run
+        while True:
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as error:
+                try:
+                    yielded = run(coro.throw, error)
+                except StopIteration as stop:
+                    return stop.value
+            else:
+                try:
+                    yielded = run(coro.send, value)
+                except StopIteration as stop:
+                    return stop.value
+
+
+async def continue_eagerly(started):
+    return await started
+
+
+def prepare_handler(func, metrics=None, event_name=None, tracer=None, monitor=None):
+    # Checked once at registration instead of on every event
+    is_coroutine = iscoroutinefunction(func)
+    if monitor is not None:
+        monitor.add_handler(func, event_name)
+    if metrics is not None:
+        func = metrics.time_handler(func, event_name, is_coroutine)
+    if tracer is not None:
+        func = tracer.trace_handler(func, event_name, is_coroutine)
+    return func, is_coroutine
+
+
+def run_handlers(loop, handlers, eager, args, kwargs):
+    """
+    Runs prepared handlers. Coroutine handlers get a task, or run until their first suspension before getting one
+    if ``eager`` is set. Plain functions are called inline.
+    """
+    for func, is_coroutine in handlers:
+        try:
+            if is_coroutine:
+                if not eager:
+                    loop.create_task(func(*args, **kwargs))
+                    continue
+                coro = func(*args, **kwargs)
+                # Like a task, the coroutine gets its own context instead of changing the dispatcher's
+                context = copy_context()
+                try:
+                    yielded = context.run(coro.send, None)
+                except StopIteration:
+                    # Finished without awaiting anything, no task needed
+                    continue
+                loop.create_task(continue_eagerly(EagerStart(coro, yielded, context)))
+            else:
+                result = func(*args, **kwargs)
+                if isawaitable(result):
+                    # Callable objects and wrappers returning coroutines
+                    ensure_future(result, loop=loop)
+        except Exception as error:
+            # Handlers raising shouldn't stop the other handlers or the shard reading events
+            loop.call_exception_handler({
+                "message": f"Exception in handler {func!r}",
+                "exception": error
+            })
+
+
+class HandlerPool:
+    """
+    Runs handlers for queued events with a limited amount of workers. Workers are started when events are queued
+    and exit once the queue is empty.
+
+    Parameters
+    ----------
+    dispatcher: EventDispatcher
+        The dispatcher the pool belongs to.
+    event_name: str
+        The event the pool handles.
+    name: str
+        Name of the pool, used in logs and metrics.
+    concurrency: int
+        How many events can be handled at the same time.
+    max_queue: int
+        How many events can wait for a worker.
+    overflow: str
+        What to do with events once the queue is full. ``"block"`` stops the shards from reading events until there
+        is room, ``"drop_oldest"`` drops the event that has been waiting the longest and ``"drop_newest"`` drops the
+        new event. Blocked shards keep sending heartbeats and don't reconnect over the heartbeat ACKs they can't read,
+        but Discord may close connections that stay blocked for long, so keep handlers of blocking pools fast.
+
+    Raises
+    ------
+    TypeError
+        Invalid concurrency, max_queue or overflow was passed.
+    """
+    def __init__(self, dispatcher, event_name, name, *, concurrency, max_queue=1000, overflow="block"):
+        if concurrency < 1 or max_queue < 1:
+            raise TypeError("concurrency and max_queue have to be at least 1!")
+        if overflow not in OVERFLOW_POLICIES:
+            raise TypeError(f"Unknown overflow policy! Use one of {', '.join(OVERFLOW_POLICIES)}.")
+        self.dispatcher = dispatcher
+        self.event_name = event_name
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.handlers = ()
+        self.queue = deque()
+        self.workers = 0
+        self.not_full = Event()
+        self.not_full.set()
+
+        # Statistics
+        self.max_depth = 0
+        self.processed = 0
+        self.dropped = 0
+
+    def add_handler(self, func):
+        dispatcher = self.dispatcher
+        self.handlers += (prepare_handler(func, dispatcher.metrics, self.event_name, dispatcher.tracer,
+                                          dispatcher.monitor),)
+
+    def put(self, *args, **kwargs):
+        """
+        Queues an event for the handlers of the pool. This is registered as a plain handler on the dispatcher.
+        """
+        queue = self.queue
+        if len(queue) >= self.max_queue:
+            if self.overflow == "drop_newest":
+                self.dropped += 1
+                return
+            if self.overflow == "drop_oldest":
+                queue.popleft()
+                self.dropped += 1
+            elif self.not_full.is_set():
+                # Block: the event is still queued but the shards stop reading until there is room
+                self.not_full.clear()
+                self.dispatcher.full_pools.add(self)
+                self.dispatcher.logger.warning(f"Handler queue {self.name} is full, pausing the shards.")
+        # Workers outlive the event that started them, so the span of the event is passed along with it
+        span = current_span.get() if self.dispatcher.tracer is not None else None
+        queue.append((args, kwargs, span))
+        if len(queue) > self.max_depth:
+            self.max_depth = len(queue)
+        if self.workers < self.concurrency:
+            self.workers += 1
+            self.dispatcher.loop.create_task(self.work())
+
+    async def work(self):
+        queue = self.queue
+        tracing = self.dispatcher.tracer is not None
+        try:
+            while queue:
+                args, kwargs, span = queue.popleft()
+                if tracing:
+                    current_span.set(span)
+                if not self.not_full.is_set() and len(queue) < self.max_queue:
+                    self.not_full.set()
+                    self.dispatcher.full_pools.discard(self)
+                for func, is_coroutine in self.handlers:
+                    try:
+                        result = func(*args, **kwargs)
+                        if is_coroutine or isawaitable(result):
+                            await result
+                    except Exception as error:
+                        self.dispatcher.loop.call_exception_handler({
+                            "message": f"Exception in handler {func!r}",
+                            "exception": error
+                        })
+                self.processed += 1
+        finally:
+            self.workers -= 1
+
+    @property
+    def depth(self):
+        """
+        How many events are waiting for a worker.
+        """
+        return len(self.queue)
 
 
 class OpcodeDispatcher:
@@ -16,13 +285,20 @@ class OpcodeDispatcher:
     ----------
     loop: AbstractEventLoop
         An AbstractEventLoop used to create callbacks.
+    eager: bool
+        Run coroutine handlers until their first ``await`` that suspends before creating a task for them.
+        Handlers that finish without suspending never get a task. Until that point the handler runs inside the
+        dispatching task, so :func:`asyncio.current_task` and ``asyncio.timeout`` refer to the shard's task.
     """
-    def __init__(self, loop: AbstractEventLoop):
+    def __init__(self, loop: AbstractEventLoop, *, eager=False):
         self.logger = logging.getLogger("speedcord.dispatcher")
         self.loop = loop
+        self.eager = eager
 
-        # A dict of the opcode int and a list of coroutines to execute once a event is sent
+        # A dict of the opcode int and a tuple of handlers to execute once a event is sent
         self.event_handlers = {}
+        # The same handlers prepared for dispatching
+        self.prepared_handlers = {}
 
     def dispatch(self, opcode, *args, **kwargs):
         """
@@ -33,9 +309,11 @@ class OpcodeDispatcher:
         opcode: int
             The opcode of the event sent by Discord API.
         """
-        self.logger.debug("Dispatching event with opcode: " + str(opcode))
-        for event in self.event_handlers.get(opcode, []):
-            self.loop.create_task(event(*args, **kwargs))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Dispatching event with opcode: {opcode}")
+        handlers = self.prepared_handlers.get(opcode)
+        if handlers is not None:
+            run_handlers(self.loop, handlers, self.eager, args, kwargs)
 
     def register(self, opcode, func):
         """
@@ -46,11 +324,11 @@ class OpcodeDispatcher:
         opcode: int
             The opcode from Discord to listen to.
         func: Callable[[DefaultShard], Any]
-            The function that will be called when the event is dispatched.
+            The function that will be called when the event is dispatched. Plain functions are called inline and
+            should return quickly.
         """
-        event_handlers = self.event_handlers.get(opcode, [])
-        event_handlers.append(func)
-        self.event_handlers[opcode] = event_handlers
+        self.event_handlers[opcode] = self.event_handlers.get(opcode, ()) + (func,)
+        self.prepared_handlers[opcode] = self.prepared_handlers.get(opcode, ()) + (prepare_handler(func),)
 
 
 class EventDispatcher:
@@ -60,13 +338,59 @@ class EventDispatcher:
     ----------
     loop: AbstractEventLoop
         An AbstractEventLoop used to create callbacks.
+    eager: bool
+        Run coroutine handlers until their first ``await`` that suspends before creating a task for them.
+        Handlers that finish without suspending never get a task. Until that point the handler runs inside the
+        dispatching task, so :func:`asyncio.current_task` and ``asyncio.timeout`` refer to the shard's task.
+        Ignored for events that are dispatched in order.
+    ordered_by: Optional[Union[str, Callable[[str, Any], Optional[Hashable]]]]
+        Handle events with the same key in the order they were received, one event at a time, while events with
+        different keys are handled concurrently. ``"guild_id"`` orders by guild (and by channel outside of guilds),
+        ``"channel_id"`` orders by channel. A function is called with the event name and data and returns the key.
+        Events without a key are dispatched unordered.
+    metrics: Optional[Metrics]
+        Records how long handlers registered after this take.
+    tracer: Optional[Tracer]
+        Wraps handlers registered after this in a span that is a child of the span of the event.
+    monitor: Optional[LoopMonitor]
+        Attributes event loop stalls to handlers registered after this.
+
+    Raises
+    ------
+    TypeError
+        An unsupported ``ordered_by`` was passed.
     """
-    def __init__(self, loop: AbstractEventLoop):
+    def __init__(self, loop: AbstractEventLoop, *, eager=False, ordered_by=None, metrics=None, tracer=None,
+                 monitor=None):
         self.logger = logging.getLogger("speedcord.dispatcher")
         self.loop = loop
+        self.eager = eager
+        self.metrics = metrics
+        self.tracer = tracer
+        self.monitor = monitor
+
+        if ordered_by is None or callable(ordered_by):
+            self.order_key = ordered_by
+        elif ordered_by in ORDER_KEYS:
+            self.order_key = ORDER_KEYS[ordered_by]
+        else:
+            raise TypeError("Unsupported ordering! Use guild_id, channel_id or a function.")
+        # Order key: events waiting to be handled after the one currently being handled
+        self.ordered_queues = {}
+        self.max_ordered_queues = 0
 
-        # A dict of the event name and a list of coroutines to execute once a event is sent
+        # A dict of the event name and a tuple of handlers to execute once a event is sent
         self.event_handlers = {}
+        # The same handlers prepared for dispatching
+        self.prepared_handlers = {}
+        # Event name: {key fields: {key values: list of (future, check)}}
+        self.waiters = {}
+        # A dict of the event name and the pools handling it
+        self.pools = {}
+        # Event name: pool running all handlers of that event
+        self.event_pools = {}
+        # Pools with the block overflow policy that are full
+        self.full_pools = set()
 
     def dispatch(self, event_name, *args, **kwargs):
         """
@@ -81,11 +405,55 @@ class EventDispatcher:
         **kwargs: Any
             Keyword-only arguments to call the event function with.
         """
-        self.logger.debug("Dispatching event with name: " + str(event_name))
-        for event in self.event_handlers.get(event_name, []):
-            self.loop.create_task(event(*args, **kwargs))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Dispatching event with name: {event_name}")
+        event_waiters = self.waiters.get(event_name)
+        if event_waiters is not None and args:
+            self.resolve_waiters(event_waiters, args[0])
+        handlers = self.prepared_handlers.get(event_name)
+        if handlers is None:
+            return
+        if self.order_key is not None and args:
+            key = self.order_key(event_name, args[0])
+            if key is not None:
+                self.dispatch_ordered(key, handlers, args, kwargs)
+                return
+        run_handlers(self.loop, handlers, self.eager, args, kwargs)
 
-    def register(self, event_name, func):
+    def dispatch_ordered(self, key, handlers, args, kwargs):
+        span = current_span.get() if self.tracer is not None else None
+        queue = self.ordered_queues.get(key)
+        if queue is not None:
+            # A worker is already handling events for this key
+            queue.append((handlers, args, kwargs, span))
+            return
+        queue = self.ordered_queues[key] = deque(((handlers, args, kwargs, span),))
+        if len(self.ordered_queues) > self.max_ordered_queues:
+            self.max_ordered_queues = len(self.ordered_queues)
+        self.loop.create_task(self.work_ordered(key, queue))
+
+    async def work_ordered(self, key, queue):
+        tracing = self.tracer is not None
+        try:
+            while queue:
+                handlers, args, kwargs, span = queue.popleft()
+                if tracing:
+                    current_span.set(span)
+                for func, is_coroutine in handlers:
+                    try:
+                        result = func(*args, **kwargs)
+                        if is_coroutine or isawaitable(result):
+                            await result
+                    except Exception as error:
+                        self.loop.call_exception_handler({
+                            "message": f"Exception in handler {func!r}",
+                            "exception": error
+                        })
+        finally:
+            # Reclaim the queue, the next event for this key starts a new worker
+            del self.ordered_queues[key]
+
+    def register(self, event_name, func, *, concurrency=None, max_queue=1000, overflow="block"):
         """
         Register a handler for a specific event. This handler will be called whenever an event matching the
         registered event_name is dispatched.
@@ -94,9 +462,162 @@ class EventDispatcher:
         event_name: str
             The event name from Discord to listen to.
         func: Callable[[DefaultShard], Any]
-            The function that will be called when the event is dispatched.
+            The function that will be called when the event is dispatched. Plain functions are called inline and
+            should return quickly.
+        concurrency: Optional[int]
+            How many events this handler may handle at the same time. Unlimited by default.
+            See :class:`HandlerPool` for ``max_queue`` and ``overflow``.
+        max_queue: int
+            How many events can wait for the handler when ``concurrency`` is set.
+        overflow: str
+            What to do with events once the queue is full when ``concurrency`` is set.
+        """
+        event_name = event_name.upper()
+        self.event_handlers[event_name] = self.event_handlers.get(event_name, ()) + (func,)
+        event_pool = self.event_pools.get(event_name)
+        if event_pool is not None:
+            # Every handler of this event runs in the event's pool
+            event_pool.add_handler(func)
+            return
+        if concurrency is not None:
+            pool = self.create_pool(event_name, getattr(func, "__name__", repr(func)), concurrency, max_queue,
+                                    overflow)
+            pool.add_handler(func)
+            prepared = prepare_handler(pool.put)
+        else:
+            prepared = prepare_handler(func, self.metrics, event_name, self.tracer, self.monitor)
+        self.prepared_handlers[event_name] = self.prepared_handlers.get(event_name, ()) + (prepared,)
+
+    def create_pool(self, event_name, name, concurrency, max_queue, overflow):
+        pool = HandlerPool(self, event_name, f"{event_name}:{name}", concurrency=concurrency, max_queue=max_queue,
+                           overflow=overflow)
+        self.pools[event_name] = self.pools.get(event_name, ()) + (pool,)
+        return pool
+
+    def limit(self, event_name, concurrency, *, max_queue=1000, overflow="block"):
+        """
+        Limits how many events of a type are handled at the same time. All handlers of the event, including ones
+        registered later, run one after another for each event in the event's pool.
+
+        Parameters
+        ----------
+        event_name: str
+            The event name from Discord.
+        concurrency: int
+            How many events can be handled at the same time.
+        max_queue: int
+            How many events can wait for a worker.
+        overflow: str
+            What to do with events once the queue is full. See :class:`HandlerPool`.
+
+        Raises
+        ------
+        TypeError
+            The event already has a limit or an invalid option was passed.
         """
         event_name = event_name.upper()
-        event_handlers = self.event_handlers.get(event_name, [])
-        event_handlers.append(func)
-        self.event_handlers[event_name] = event_handlers
+        if event_name in self.event_pools:
+            raise TypeError(f"{event_name} already has a concurrency limit!")
+        pool = self.create_pool(event_name, "*", concurrency, max_queue, overflow)
+        for func, is_coroutine in self.prepared_handlers.get(event_name, ()):
+            pool.handlers += ((func, is_coroutine),)
+        self.event_pools[event_name] = pool
+        self.prepared_handlers[event_name] = (prepare_handler(pool.put),)
+
+    async def wait_for_capacity(self):
+        """
+        Waits until no pool with the ``"block"`` overflow policy is full. Shards call this after dispatching.
+        """
+        while self.full_pools:
+            await next(iter(self.full_pools)).not_full.wait()
+
+    def queue_depths(self):
+        """
+        How many events are waiting in the pools of each event type.
+
+        Returns
+        -------
+        Dict[str, int]
+            The event name and the amount of queued events.
+        """
+        return {event_name: sum(pool.depth for pool in pools) for event_name, pools in self.pools.items()}
+
+    def has_handlers(self, event_name):
+        """
+        Checks if any handlers or waiters are registered for an event.
+
+        Parameters
+        ----------
+        event_name: str
+            The event name from Discord.
+        """
+        return event_name in self.prepared_handlers or event_name in self.waiters
+
+    def resolve_waiters(self, event_waiters, data):
+        if not isinstance(data, dict):
+            return
+        for fields, index in event_waiters.items():
+            values = tuple(get_key_value(data, field) for field in fields)
+            waiters = index.get(values)
+            if waiters is None:
+                continue
+            for future, check in waiters:
+                if future.done():
+                    # Resolved or timed out, removed once the waiting task resumes
+                    continue
+                if check is not None:
+                    try:
+                        if not check(data):
+                            continue
+                    except Exception as error:
+                        future.set_exception(error)
+                        continue
+                future.set_result(data)
+
+    async def wait_for(self, event_name, *, key=None, check=None, timeout=None):
+        """
+        Waits for the next event matching a key and check.
+        Waiters are indexed by their key, so dispatching an event only looks at waiters with a matching key.
+
+        Parameters
+        ----------
+        event_name: str
+            The event name from Discord.
+        key: Optional[Dict[str, Union[int, str]]]
+            Fields the event has to match, for example ``{"channel_id": 1, "user_id": 2}``. ``user_id`` matches the
+            author of messages and the user of interactions and ``message_id`` matches the ID of
+            ``MESSAGE_UPDATE`` and ``MESSAGE_DELETE``.
+        check: Optional[Callable[[Dict[str, Any]], bool]]
+            Called with the event data of events matching the key. Exceptions it raises are raised here.
+        timeout: Optional[float]
+            Seconds to wait before giving up.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The data of the event.
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            No matching event was received within ``timeout`` seconds.
+        """
+        event_name = event_name.upper()
+        key = key or {}
+        fields = tuple(sorted(key))
+        values = tuple(str(key[field]) for field in fields)
+        waiter = (self.loop.create_future(), check)
+
+        index = self.waiters.setdefault(event_name, {}).setdefault(fields, {})
+        index.setdefault(values, []).append(waiter)
+        try:
+            return await wait_for(waiter[0], timeout)
+        finally:
+            waiters = index[values]
+            waiters.remove(waiter)
+            if not waiters:
+                del index[values]
+                if not index:
+                    del self.waiters[event_name][fields]
+                    if not self.waiters[event_name]:
+                        del self.waiters[event_name]
@@ -1,17 +1,114 @@
-from typing import Callable, Dict, Any
-from asyncio import AbstractEventLoop
+from typing import Callable, Dict, Any, Tuple, Coroutine, Generator, Awaitable, Optional, Set, Deque, Union, \
+    Hashable, List
+from asyncio import AbstractEventLoop, Event, Future
+from contextvars import Context
 from logging import Logger
 
 from .shard import DefaultShard
+from .metrics import Metrics
+from .tracing import Span, Tracer
+from .monitor import LoopMonitor
+
+Handler = Callable[..., Any]
+PreparedHandler = Tuple[Handler, bool]
+Waiter = Tuple[Future, Optional[Callable[[Dict[str, Any]], bool]]]
+OrderKey = Callable[[str, Any], Optional[Hashable]]
+QueuedEvent = Tuple[Tuple[Any, ...], Dict[str, Any], Optional[Span]]
+OrderedEvent = Tuple[Tuple[PreparedHandler, ...], Tuple[Any, ...], Dict[str, Any], Optional[Span]]
+
+ORDER_KEYS: Dict[str, OrderKey]
+
+
+def get_key_value(data: Dict[str, Any], field: str) -> Optional[str]:
+    ...
+
+
+def get_guild_id(event_name: str, data: Dict[str, Any]) -> Optional[Union[str, int]]:
+    ...
+
+
+def get_user(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    ...
+
+
+def guild_key(event_name: str, data: Any) -> Optional[Hashable]:
+    ...
+
+
+def channel_key(event_name: str, data: Any) -> Optional[Hashable]:
+    ...
+
+
+class EagerStart:
+    coro: Coroutine
+    yielded: Any
+    context: Context
+
+    def __init__(self, coro: Coroutine, yielded: Any, context: Context):
+        ...
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        ...
+
+
+async def continue_eagerly(started: Awaitable) -> Any:
+    ...
+
+
+def prepare_handler(func: Handler, metrics: Optional[Metrics] = None, event_name: Optional[str] = None,
+                    tracer: Optional[Tracer] = None, monitor: Optional[LoopMonitor] = None) -> PreparedHandler:
+    ...
+
+
+def run_handlers(loop: AbstractEventLoop, handlers: Tuple[PreparedHandler, ...], eager: bool, args: Tuple[Any, ...],
+                 kwargs: Dict[str, Any]):
+    ...
+
+
+class HandlerPool:
+    dispatcher: EventDispatcher
+    event_name: str
+    name: str
+    concurrency: int
+    max_queue: int
+    overflow: str
+    handlers: Tuple[PreparedHandler, ...]
+    queue: Deque[QueuedEvent]
+    workers: int
+    not_full: Event
+
+    max_depth: int
+    processed: int
+    dropped: int
+
+    def __init__(self, dispatcher: EventDispatcher, event_name: str, name: str, *, concurrency: int,
+                 max_queue: int = 1000, overflow: str = "block"):
+        ...
+
+    def add_handler(self, func: Handler):
+        ...
+
+    def put(self, *args: Any, **kwargs: Any):
+        ...
+
+    async def work(self):
+        ...
+
+    @property
+    def depth(self) -> int:
+        ...
 
 
 class OpcodeDispatcher:
     logger: Logger
     loop: AbstractEventLoop
 
-    event_handlers: Dict[int, Callable[[dict, DefaultShard], Any]]
+    eager: bool
 
-    def __init__(self, loop: AbstractEventLoop):
+    event_handlers: Dict[int, Tuple[Handler, ...]]
+    prepared_handlers: Dict[int, Tuple[PreparedHandler, ...]]
+
+    def __init__(self, loop: AbstractEventLoop, *, eager: bool = False):
         ...
 
     def dispatch(self, opcode: int, *args: Any, **kwargs: Any):
@@ -25,13 +122,62 @@ class EventDispatcher:
     logger: Logger
     loop: AbstractEventLoop
 
-    event_handlers: Dict[str, Callable[[dict, DefaultShard], Any]]
+    eager: bool
+
+    metrics: Optional[Metrics]
+    tracer: Optional[Tracer]
+    monitor: Optional[LoopMonitor]
+    order_key: Optional[OrderKey]
+    ordered_queues: Dict[Hashable, Deque[OrderedEvent]]
+    max_ordered_queues: int
 
-    def __init__(self, loop: AbstractEventLoop):
+    event_handlers: Dict[str, Tuple[Handler, ...]]
+    prepared_handlers: Dict[str, Tuple[PreparedHandler, ...]]
+    waiters: Dict[str, Dict[Tuple[str, ...], Dict[Tuple[str, ...], List[Waiter]]]]
+    pools: Dict[str, Tuple[HandlerPool, ...]]
+    event_pools: Dict[str, HandlerPool]
+    full_pools: Set[HandlerPool]
+
+    def __init__(self, loop: AbstractEventLoop, *, eager: bool = False,
+                 ordered_by: Optional[Union[str, OrderKey]] = None, metrics: Optional[Metrics] = None,
+                 tracer: Optional[Tracer] = None, monitor: Optional[LoopMonitor] = None):
         ...
 
     def dispatch(self, event_name: str, *args: Any, **kwargs: Any):
         ...
 
-    def register(self, event_name: str, func: Callable[[dict, DefaultShard], Any]):
+    def dispatch_ordered(self, key: Hashable, handlers: Tuple[PreparedHandler, ...], args: Tuple[Any, ...],
+                         kwargs: Dict[str, Any]):
+        ...
+
+    async def work_ordered(self, key: Hashable, queue: Deque[OrderedEvent]):
+        ...
+
+    def register(self, event_name: str, func: Callable[[dict, DefaultShard], Any], *,
+                 concurrency: Optional[int] = None, max_queue: int = 1000, overflow: str = "block"):
+        ...
+
+    def create_pool(self, event_name: str, name: str, concurrency: int, max_queue: int,
+                    overflow: str) -> HandlerPool:
+        ...
+
+    def limit(self, event_name: str, concurrency: int, *, max_queue: int = 1000, overflow: str = "block"):
+        ...
+
+    async def wait_for_capacity(self):
+        ...
+
+    def queue_depths(self) -> Dict[str, int]:
+        ...
+
+    def has_handlers(self, event_name: str) -> bool:
+        ...
+
+    def resolve_waiters(self, event_waiters: Dict[Tuple[str, ...], Dict[Tuple[str, ...], List[Waiter]]],
+                        data: Any):
+        ...
+
+    async def wait_for(self, event_name: str, *, key: Optional[Dict[str, Union[int, str]]] = None,
+                       check: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                       timeout: Optional[float] = None) -> Dict[str, Any]:
         ...
@@ -0,0 +1,316 @@
+"""
+Created by Epic at 10/17/26
+
+Pure python encoder and decoder for Erlang's External Term Format, used by the gateway when encoding is set to etf.
+https://discord.com/developers/docs/topics/gateway#etfjson
+
+Decoding is around ten times slower than the JSON decoder. ETF only saves bandwidth, it costs CPU time.
+"""
+from struct import Struct
+from zlib import decompress
+
+__all__ = ("loads", "dumps")
+
+FORMAT_VERSION = 131
+
+NEW_FLOAT_EXT = 70
+COMPRESSED = 80
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+MAP_EXT = 116
+SMALL_ATOM_EXT = 115
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+
+ATOMS = {
+    "nil": None,
+    "true": True,
+    "false": False
+}
+
+# Integers above this can't be represented exactly by JSON parsers, Discord sends them as strings over JSON
+MAX_SAFE_INTEGER = 2 ** 53 - 1
+
+uint16 = Struct(">H")
+uint32 = Struct(">I")
+int32 = Struct(">i")
+float64 = Struct(">d")
+
+
+class Decoder:
+    def __init__(self, data, big_ints_as_str):
+        self.data = data
+        self.position = 0
+        self.big_ints_as_str = big_ints_as_str
+
+    def decode(self):
+        tag = self.data[self.position]
+        self.position += 1
+        try:
+            handler = self.handlers[tag]
+        except KeyError:
+            raise ValueError(f"Unknown ETF tag {tag} at position {self.position - 1}") from None
+        return handler(self)
+
+    def read(self, size):
+        start = self.position
+        self.position += size
+        if self.position > len(self.data):
+            raise ValueError("Unexpected end of ETF data")
+        return self.data[start:self.position]
+
+    def read_text(self, size):
+        return str(self.read(size), "utf-8")
+
+    def decode_small_integer(self):
+        value = self.data[self.position]
+        self.position += 1
+        return value
+
+    def decode_integer(self):
+        value = int32.unpack_from(self.data, self.position)[0]
+        self.position += 4
+        return value
+
+    def decode_new_float(self):
+        value = float64.unpack_from(self.data, self.position)[0]
+        self.position += 8
+        return value
+
+    def decode_float(self):
+        return float(bytes(self.read(31)).rstrip(b"\x00"))
+
+    def atom(self, size):
+        name = self.read_text(size)
+        return ATOMS.get(name, name)
+
+    def decode_atom(self):
+        size = uint16.unpack_from(self.data, self.position)[0]
+        self.position += 2
+        return self.atom(size)
+
+    def decode_small_atom(self):
+        size = self.data[self.position]
+        self.position += 1
+        return self.atom(size)
+
+    def decode_small_tuple(self):
+        arity = self.data[self.position]
+        self.position += 1
+        return [self.decode() for _ in range(arity)]
+
+    def decode_large_tuple(self):
+        arity = uint32.unpack_from(self.data, self.position)[0]
+        self.position += 4
+        return [self.decode() for _ in range(arity)]
+
+    def decode_nil(self):
+        return []
+
+    def decode_string(self):
+        # Erlang sends lists of small integers as strings, such as the shard in READY
+        size = uint16.unpack_from(self.data, self.position)[0]
+        self.position += 2
+        return list(self.read(size))
+
+    def decode_list(self):
+        size = uint32.unpack_from(self.data, self.position)[0]
+        self.position += 4
+        values = [self.decode() for _ in range(size)]
+        tail = self.decode()
+        if tail != []:
+            values.append(tail)
+        return values
+
+    def decode_binary(self):
+        size = uint32.unpack_from(self.data, self.position)[0]
+        self.position += 4
+        return self.read_text(size)
+
+    def big(self, size):
+        sign = self.data[self.position]
+        self.position += 1
+        value = int.from_bytes(self.read(size), "little")
+        if sign:
+            value = -value
+        if self.big_ints_as_str and abs(value) > MAX_SAFE_INTEGER:
+            # Snowflakes are sent as big integers over ETF but as strings over JSON
+            return str(value)
+        return value
+
+    def decode_small_big(self):
+        size = self.data[self.position]
+        self.position += 1
+        return self.big(size)
+
+    def decode_large_big(self):
+        size = uint32.unpack_from(self.data, self.position)[0]
+        self.position += 4
+        return self.big(size)
+
+    def decode_map(self):
+        arity = uint32.unpack_from(self.data, self.position)[0]
+        self.position += 4
+        decode = self.decode
+        result = {}
+        for _ in range(arity):
+            key = decode()
+            result[key] = decode()
+        return result
+
+
+Decoder.handlers = {
+    NEW_FLOAT_EXT: Decoder.decode_new_float,
+    SMALL_INTEGER_EXT: Decoder.decode_small_integer,
+    INTEGER_EXT: Decoder.decode_integer,
+    FLOAT_EXT: Decoder.decode_float,
+    ATOM_EXT: Decoder.decode_atom,
+    SMALL_ATOM_EXT: Decoder.decode_small_atom,
+    ATOM_UTF8_EXT: Decoder.decode_atom,
+    SMALL_ATOM_UTF8_EXT: Decoder.decode_small_atom,
+    SMALL_TUPLE_EXT: Decoder.decode_small_tuple,
+    LARGE_TUPLE_EXT: Decoder.decode_large_tuple,
+    NIL_EXT: Decoder.decode_nil,
+    STRING_EXT: Decoder.decode_string,
+    LIST_EXT: Decoder.decode_list,
+    BINARY_EXT: Decoder.decode_binary,
+    SMALL_BIG_EXT: Decoder.decode_small_big,
+    LARGE_BIG_EXT: Decoder.decode_large_big,
+    MAP_EXT: Decoder.decode_map
+}
+
+
+def loads(data, *, big_ints_as_str=True):
+    """
+    Decodes an ETF payload.
+
+    Parameters
+    ----------
+    data: Union[bytes, bytearray, memoryview]
+        The encoded payload.
+    big_ints_as_str: bool
+        Return integers above ``2 ** 53 - 1`` as strings. This makes snowflakes match the JSON encoding while
+        smaller integers such as timestamps stay integers.
+
+    Returns
+    -------
+    Any
+        The decoded term. Maps become dicts, lists, strings and tuples become lists, binaries become strings and the
+        atoms ``nil``, ``true`` and ``false`` become ``None``, ``True`` and ``False``.
+
+    Raises
+    ------
+    ValueError
+        The payload is not valid ETF.
+    """
+    data = memoryview(data)
+    if len(data) == 0 or data[0] != FORMAT_VERSION:
+        raise ValueError("Invalid ETF version")
+    if len(data) > 1 and data[1] == COMPRESSED:
+        data = memoryview(b"\x83" + decompress(data[6:]))
+    decoder = Decoder(data, big_ints_as_str)
+    decoder.position = 1
+    return decoder.decode()
+
+
+def encode(value, buffer):
+    if value is None:
+        buffer += b"\x73\x03nil"
+    elif value is True:
+        buffer += b"\x73\x04true"
+    elif value is False:
+        buffer += b"\x73\x05false"
+    elif isinstance(value, int):
+        if 0 <= value <= 255:
+            buffer.append(SMALL_INTEGER_EXT)
+            buffer.append(value)
+        elif -2147483648 <= value <= 2147483647:
+            buffer.append(INTEGER_EXT)
+            buffer += int32.pack(value)
+        else:
+            magnitude = abs(value)
+            digits = magnitude.to_bytes((magnitude.bit_length() + 7) // 8, "little")
+            if len(digits) > 255:
+                raise ValueError("Integer is too large to encode")
+            buffer.append(SMALL_BIG_EXT)
+            buffer.append(len(digits))
+            buffer.append(int(value < 0))
+            buffer += digits
+    elif isinstance(value, float):
+        buffer.append(NEW_FLOAT_EXT)
+        buffer += float64.pack(value)
+    elif isinstance(value, str):
+        encoded = value.encode("utf-8")
+        buffer.append(BINARY_EXT)
+        buffer += uint32.pack(len(encoded))
+        buffer += encoded
+    elif isinstance(value, (bytes, bytearray)):
+        buffer.append(BINARY_EXT)
+        buffer += uint32.pack(len(value))
+        buffer += value
+    elif isinstance(value, dict):
+        buffer.append(MAP_EXT)
+        buffer += uint32.pack(len(value))
+        for key, item in value.items():
+            encoded = key.encode("utf-8") if isinstance(key, str) else None
+            if encoded is not None and len(encoded) < 256 and key not in ATOMS:
+                # Discord sends keys as atoms as they are smaller than binaries
+                buffer.append(SMALL_ATOM_UTF8_EXT)
+                buffer.append(len(encoded))
+                buffer += encoded
+            else:
+                encode(key, buffer)
+            encode(item, buffer)
+    elif isinstance(value, (list, tuple)):
+        # Tuples are sent as lists to match the JSON encoding
+        if not value:
+            buffer.append(NIL_EXT)
+            return
+        if len(value) <= 65535 and all(type(item) is int and 0 <= item <= 255 for item in value):
+            # Erlang encodes lists of small integers as strings
+            buffer.append(STRING_EXT)
+            buffer += uint16.pack(len(value))
+            buffer += bytes(value)
+            return
+        buffer.append(LIST_EXT)
+        buffer += uint32.pack(len(value))
+        for item in value:
+            encode(item, buffer)
+        buffer.append(NIL_EXT)
+    else:
+        raise TypeError(f"Object of type {type(value).__name__} is not ETF serializable")
+
+
+def dumps(value):
+    """
+    Encodes a value to ETF.
+
+    Parameters
+    ----------
+    value: Any
+        The value to encode. Strings are encoded as binaries, dict keys as atoms and tuples as lists.
+
+    Returns
+    -------
+    bytes
+        The encoded payload.
+
+    Raises
+    ------
+    TypeError
+        The value contains a type that can't be encoded.
+    """
+    buffer = bytearray()
+    buffer.append(FORMAT_VERSION)
+    encode(value, buffer)
+    return bytes(buffer)
@@ -0,0 +1,9 @@
+from typing import Any, Union
+
+
+def loads(data: Union[bytes, bytearray, memoryview], *, big_ints_as_str: bool = True) -> Any:
+    ...
+
+
+def dumps(value: Any) -> bytes:
+    ...
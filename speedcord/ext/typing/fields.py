@@ -0,0 +1,105 @@
+"""
+Created by Epic at 9/24/20
+"""
+__all__ = ("Field", "SnowflakeField", "SnowflakeListField", "ContextField", "BaseContext")
+
+
+class Field:
+    """
+    Reads a field from the payload when it is accessed.
+    """
+    def __init__(self, key=None):
+        self.key = key
+
+    def __set_name__(self, owner, name):
+        if self.key is None:
+            self.key = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance._data.get(self.key)
+
+
+class SnowflakeField(Field):
+    """
+    Reads a snowflake from the payload and parses it into an int when it is accessed.
+    """
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = instance._data.get(self.key)
+        if value is None:
+            return None
+        return int(value)
+
+
+class SnowflakeListField(Field):
+    """
+    Reads a list of snowflakes from the payload and parses them into ints when it is accessed.
+    """
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = instance._data.get(self.key)
+        if value is None:
+            return None
+        return [int(snowflake) for snowflake in value]
+
+
+class ContextField(Field):
+    """
+    Converts a nested object (or a list of them when ``many`` is set) into a context on first access.
+    """
+    def __init__(self, context_class, *, many=False, key=None):
+        super().__init__(key)
+        self.context_class = context_class
+        self.many = many
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        converted = instance._converted
+        if converted is None:
+            converted = instance._converted = {}
+        try:
+            return converted[self.key]
+        except KeyError:
+            pass
+        value = instance._data.get(self.key)
+        if value is not None:
+            if self.many:
+                value = [self.context_class(instance.client, item) for item in value]
+            else:
+                value = self.context_class(instance.client, value)
+        converted[self.key] = value
+        return value
+
+
+class BaseContext:
+    __slots__ = ("client", "_data", "_converted")
+
+    def __init__(self, client, data):
+        """
+        Basic context, use one of the subclasses for typing.
+        Fields are read from the payload when they are accessed, nested objects are converted on first access.
+
+        Parameters
+        ----------
+        client: Client
+            :class:`Client` to use.
+        data: Dict[str, Any]
+            Data sent by Discord gateway.
+        """
+        self.client = client
+        self._data = data
+        self._converted = None
+
+    def __getattr__(self, name):
+        # Fields Discord added that the context doesn't know about yet
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}") from None
@@ -0,0 +1,50 @@
+from speedcord import Client
+from typing import Dict, Any, Optional, List, Type, TypeVar, Generic, overload
+
+T = TypeVar("T")
+
+
+class Field(Generic[T]):
+    key: Optional[str]
+
+    def __init__(self, key: Optional[str] = None):
+        ...
+
+    def __set_name__(self, owner: type, name: str):
+        ...
+
+    @overload
+    def __get__(self, instance: None, owner: type) -> 'Field[T]':
+        ...
+
+    @overload
+    def __get__(self, instance: 'BaseContext', owner: type) -> T:
+        ...
+
+
+class SnowflakeField(Field[Optional[int]]):
+    ...
+
+
+class SnowflakeListField(Field[Optional[List[int]]]):
+    ...
+
+
+class ContextField(Field[T]):
+    context_class: Type['BaseContext']
+    many: bool
+
+    def __init__(self, context_class: Type['BaseContext'], *, many: bool = False, key: Optional[str] = None):
+        ...
+
+
+class BaseContext:
+    client: Client
+    _data: Dict[str, Any]
+    _converted: Optional[Dict[str, Any]]
+
+    def __init__(self, client: Client, data: Dict[str, Any]):
+        ...
+
+    def __getattr__(self, name: str) -> Any:
+        ...
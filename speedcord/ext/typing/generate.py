@@ -0,0 +1,184 @@
+"""
+Created by Epic at 10/17/26
+
+Generates the context classes in generated.py and generated.pyi from schema.json.
+Run ``python -m speedcord.ext.typing.generate`` after editing the schema.
+
+Field types in the schema are ``snowflake``, ``str``, ``int``, ``float``, ``bool``, ``object``, ``any`` or the name
+of another object in the schema. ``[]`` makes the field a list and ``?`` marks it as optional.
+"""
+from json import load
+from keyword import iskeyword
+from os.path import dirname, join
+
+__all__ = ("generate",)
+
+HEADER = '''"""
+Generated from schema.json by speedcord.ext.typing.generate. Edit the schema and regenerate instead of editing this.
+"""
+'''
+
+PRIMITIVES = {
+    "snowflake": "int",
+    "str": "str",
+    "int": "int",
+    "float": "float",
+    "bool": "bool",
+    "object": "Dict[str, Any]",
+    "any": "Any"
+}
+
+
+def parse_type(type_name):
+    """
+    Splits a schema type into its base type and whether it is a list and optional.
+    """
+    optional = type_name.endswith("?")
+    type_name = type_name.rstrip("?")
+    many = type_name.endswith("[]")
+    if many:
+        type_name = type_name[:-2]
+    return type_name, many, optional
+
+
+def context_name(object_name):
+    return f"{object_name}Context"
+
+
+def attribute_name(key):
+    # Payload keys that are python keywords get a trailing underscore
+    return f"{key}_" if iskeyword(key) else key
+
+
+def create_field(key, type_name, objects, *, explicit_key=False):
+    base, many, optional = parse_type(type_name)
+    key_argument = f'key="{key}"' if explicit_key or attribute_name(key) != key else None
+    if base in objects:
+        arguments = [context_name(base)]
+        if many:
+            arguments.append("many=True")
+        if key_argument is not None:
+            arguments.append(key_argument)
+        return f"ContextField({', '.join(arguments)})"
+    if base not in PRIMITIVES:
+        raise ValueError(f"Unknown type {type_name!r} for field {key!r}")
+    if base == "snowflake":
+        field_class = "SnowflakeListField" if many else "SnowflakeField"
+    else:
+        field_class = "Field"
+    return f"{field_class}({key_argument or ''})"
+
+
+def annotation(type_name, objects):
+    base, many, optional = parse_type(type_name)
+    annotated = context_name(base) if base in objects else PRIMITIVES[base]
+    if many:
+        annotated = f"List[{annotated}]"
+    if optional and base != "any":
+        annotated = f"Optional[{annotated}]"
+    return annotated
+
+
+def generate_module(schema):
+    objects = schema["objects"]
+    mixins = sorted({mixin for definition in objects.values() for mixin in definition.get("mixins", ())})
+    names = [context_name(object_name) for object_name in objects]
+
+    lines = [HEADER + "from .fields import BaseContext, Field, SnowflakeField, SnowflakeListField, ContextField"]
+    if mixins:
+        lines.append(f"from .mixins import {', '.join(mixins)}")
+    lines.append("")
+    lines.append("__all__ = (")
+    lines.append(",\n".join(f'    "{name}"' for name in names + ["EVENT_CONTEXTS", "ROUTE_CONTEXTS"]))
+    lines.append(")")
+
+    defined = set()
+    deferred = []  # Fields referencing contexts that aren't defined yet
+    for object_name, definition in objects.items():
+        bases = definition.get("mixins", []) + ["BaseContext"]
+        lines.append("")
+        lines.append("")
+        lines.append(f"class {context_name(object_name)}({', '.join(bases)}):")
+        lines.append('    """')
+        lines.append(f"    {definition.get('description', object_name)}")
+        lines.append('    """')
+        lines.append("    __slots__ = ()")
+        lines.append("")
+        for key, type_name in definition["fields"].items():
+            base = parse_type(type_name)[0]
+            if base in objects and base not in defined:
+                # Assigned after the class, so __set_name__ won't set the key
+                deferred.append((object_name, key, create_field(key, type_name, objects, explicit_key=True)))
+                continue
+            lines.append(f"    {attribute_name(key)} = {create_field(key, type_name, objects)}")
+        defined.add(object_name)
+
+    if deferred:
+        lines.append("")
+        lines.append("")
+        lines.append("# Fields referencing contexts defined after them")
+        for object_name, key, field in deferred:
+            lines.append(f"{context_name(object_name)}.{attribute_name(key)} = {field}")
+
+    lines.append("")
+    lines.append("# Event name: context of the event data")
+    lines.append("EVENT_CONTEXTS = {")
+    lines.append(",\n".join(f'    "{event_name}": {context_name(object_name)}'
+                            for event_name, object_name in schema["events"].items()))
+    lines.append("}")
+    lines.append("")
+    lines.append("# Endpoint: context of the response and whether the response is a list of them")
+    lines.append("ROUTE_CONTEXTS = {")
+    route_lines = []
+    for endpoint, type_name in schema["routes"].items():
+        base, many, optional = parse_type(type_name)
+        route_lines.append(f'    "{endpoint}": ({context_name(base)}, {many})')
+    lines.append(",\n".join(route_lines))
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_stub(schema):
+    objects = schema["objects"]
+    mixins = sorted({mixin for definition in objects.values() for mixin in definition.get("mixins", ())})
+
+    lines = ["from typing import Dict, Any, Optional, List, Tuple, Type", "", "from .fields import BaseContext"]
+    if mixins:
+        lines.append(f"from .mixins import {', '.join(mixins)}")
+    for object_name, definition in objects.items():
+        bases = definition.get("mixins", []) + ["BaseContext"]
+        lines.append("")
+        lines.append("")
+        lines.append(f"class {context_name(object_name)}({', '.join(bases)}):")
+        for key, type_name in definition["fields"].items():
+            lines.append(f"    {attribute_name(key)}: {annotation(type_name, objects)}")
+    lines.append("")
+    lines.append("")
+    lines.append("EVENT_CONTEXTS: Dict[str, Type[BaseContext]]")
+    lines.append("ROUTE_CONTEXTS: Dict[str, Tuple[Type[BaseContext], bool]]")
+    return "\n".join(lines) + "\n"
+
+
+def generate(schema_path=None, output_directory=None):
+    """
+    Generates generated.py and generated.pyi from a schema.
+
+    Parameters
+    ----------
+    schema_path: Optional[str]
+        Path of the schema. Defaults to the schema.json shipped with speedcord.
+    output_directory: Optional[str]
+        Directory to write the modules to. Defaults to the directory of this module.
+    """
+    directory = dirname(__file__)
+    with open(schema_path or join(directory, "schema.json")) as f:
+        schema = load(f)
+    output_directory = output_directory or directory
+    with open(join(output_directory, "generated.py"), "w") as f:
+        f.write(generate_module(schema))
+    with open(join(output_directory, "generated.pyi"), "w") as f:
+        f.write(generate_stub(schema))
+
+
+if __name__ == "__main__":
+    generate()
@@ -0,0 +1,839 @@
+"""
+Generated from schema.json by speedcord.ext.typing.generate. Edit the schema and regenerate instead of editing this.
+"""
+from .fields import BaseContext, Field, SnowflakeField, SnowflakeListField, ContextField
+from .mixins import MessageMixin
+
+__all__ = (
+    "UserContext",
+    "MemberContext",
+    "RoleContext",
+    "EmojiContext",
+    "PermissionOverwriteContext",
+    "ChannelContext",
+    "VoiceStateContext",
+    "ActivityContext",
+    "PresenceContext",
+    "GuildContext",
+    "UnavailableGuildContext",
+    "AttachmentContext",
+    "EmbedContext",
+    "ReactionContext",
+    "MessageReferenceContext",
+    "MessageContext",
+    "InviteContext",
+    "WebhookContext",
+    "BanContext",
+    "GatewayBotContext",
+    "ApplicationCommandContext",
+    "InteractionContext",
+    "ReadyContext",
+    "ChannelPinsUpdateContext",
+    "GuildBanContext",
+    "GuildEmojisUpdateContext",
+    "GuildIntegrationsUpdateContext",
+    "GuildMemberAddContext",
+    "GuildMemberRemoveContext",
+    "GuildMemberUpdateContext",
+    "GuildMembersChunkContext",
+    "GuildRoleUpdateContext",
+    "GuildRoleDeleteContext",
+    "InviteCreateContext",
+    "InviteDeleteContext",
+    "MessageUpdateContext",
+    "MessageDeleteContext",
+    "MessageDeleteBulkContext",
+    "MessageReactionAddContext",
+    "MessageReactionRemoveContext",
+    "MessageReactionRemoveAllContext",
+    "MessageReactionRemoveEmojiContext",
+    "TypingStartContext",
+    "VoiceServerUpdateContext",
+    "WebhooksUpdateContext",
+    "EVENT_CONTEXTS",
+    "ROUTE_CONTEXTS"
+)
+
+
+class UserContext(BaseContext):
+    """
+    User context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    username = Field()
+    discriminator = Field()
+    avatar = Field()
+    bot = Field()
+    system = Field()
+    mfa_enabled = Field()
+    locale = Field()
+    verified = Field()
+    email = Field()
+    flags = Field()
+    premium_type = Field()
+    public_flags = Field()
+
+
+class MemberContext(BaseContext):
+    """
+    Guild member context
+    """
+    __slots__ = ()
+
+    user = ContextField(UserContext)
+    nick = Field()
+    roles = SnowflakeListField()
+    joined_at = Field()
+    premium_since = Field()
+    deaf = Field()
+    mute = Field()
+    pending = Field()
+    permissions = Field()
+
+
+class RoleContext(BaseContext):
+    """
+    Role context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    name = Field()
+    color = Field()
+    hoist = Field()
+    position = Field()
+    permissions = Field()
+    managed = Field()
+    mentionable = Field()
+    tags = Field()
+
+
+class EmojiContext(BaseContext):
+    """
+    Emoji context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    name = Field()
+    roles = SnowflakeListField()
+    user = ContextField(UserContext)
+    require_colons = Field()
+    managed = Field()
+    animated = Field()
+    available = Field()
+
+
+class PermissionOverwriteContext(BaseContext):
+    """
+    Channel permission overwrite context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    type = Field()
+    allow = Field()
+    deny = Field()
+
+
+class ChannelContext(BaseContext):
+    """
+    Channel context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    type = Field()
+    guild_id = SnowflakeField()
+    position = Field()
+    permission_overwrites = ContextField(PermissionOverwriteContext, many=True)
+    name = Field()
+    topic = Field()
+    nsfw = Field()
+    last_message_id = SnowflakeField()
+    bitrate = Field()
+    user_limit = Field()
+    rate_limit_per_user = Field()
+    recipients = ContextField(UserContext, many=True)
+    icon = Field()
+    owner_id = SnowflakeField()
+    application_id = SnowflakeField()
+    parent_id = SnowflakeField()
+    last_pin_timestamp = Field()
+
+
+class VoiceStateContext(BaseContext):
+    """
+    Voice state context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    channel_id = SnowflakeField()
+    user_id = SnowflakeField()
+    member = ContextField(MemberContext)
+    session_id = Field()
+    deaf = Field()
+    mute = Field()
+    self_deaf = Field()
+    self_mute = Field()
+    self_stream = Field()
+    self_video = Field()
+    suppress = Field()
+
+
+class ActivityContext(BaseContext):
+    """
+    Activity context
+    """
+    __slots__ = ()
+
+    name = Field()
+    type = Field()
+    url = Field()
+    created_at = Field()
+    timestamps = Field()
+    application_id = SnowflakeField()
+    details = Field()
+    state = Field()
+    emoji = ContextField(EmojiContext)
+    party = Field()
+    assets = Field()
+    secrets = Field()
+    instance = Field()
+    flags = Field()
+
+
+class PresenceContext(BaseContext):
+    """
+    Presence context
+    """
+    __slots__ = ()
+
+    user = ContextField(UserContext)
+    guild_id = SnowflakeField()
+    status = Field()
+    activities = ContextField(ActivityContext, many=True)
+    client_status = Field()
+
+
+class GuildContext(BaseContext):
+    """
+    Guild context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    name = Field()
+    icon = Field()
+    splash = Field()
+    discovery_splash = Field()
+    owner = Field()
+    owner_id = SnowflakeField()
+    permissions = Field()
+    region = Field()
+    afk_channel_id = SnowflakeField()
+    afk_timeout = Field()
+    widget_enabled = Field()
+    widget_channel_id = SnowflakeField()
+    verification_level = Field()
+    default_message_notifications = Field()
+    explicit_content_filter = Field()
+    roles = ContextField(RoleContext, many=True)
+    emojis = ContextField(EmojiContext, many=True)
+    features = Field()
+    mfa_level = Field()
+    application_id = SnowflakeField()
+    system_channel_id = SnowflakeField()
+    system_channel_flags = Field()
+    rules_channel_id = SnowflakeField()
+    joined_at = Field()
+    large = Field()
+    unavailable = Field()
+    member_count = Field()
+    voice_states = ContextField(VoiceStateContext, many=True)
+    members = ContextField(MemberContext, many=True)
+    channels = ContextField(ChannelContext, many=True)
+    presences = ContextField(PresenceContext, many=True)
+    max_presences = Field()
+    max_members = Field()
+    vanity_url_code = Field()
+    description = Field()
+    banner = Field()
+    premium_tier = Field()
+    premium_subscription_count = Field()
+    preferred_locale = Field()
+    public_updates_channel_id = SnowflakeField()
+    max_video_channel_users = Field()
+    approximate_member_count = Field()
+    approximate_presence_count = Field()
+
+
+class UnavailableGuildContext(BaseContext):
+    """
+    Unavailable guild context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    unavailable = Field()
+
+
+class AttachmentContext(BaseContext):
+    """
+    Message attachment context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    filename = Field()
+    size = Field()
+    url = Field()
+    proxy_url = Field()
+    height = Field()
+    width = Field()
+
+
+class EmbedContext(BaseContext):
+    """
+    Message embed context
+    """
+    __slots__ = ()
+
+    title = Field()
+    type = Field()
+    description = Field()
+    url = Field()
+    timestamp = Field()
+    color = Field()
+    footer = Field()
+    image = Field()
+    thumbnail = Field()
+    video = Field()
+    provider = Field()
+    author = Field()
+    fields = Field()
+
+
+class ReactionContext(BaseContext):
+    """
+    Message reaction context
+    """
+    __slots__ = ()
+
+    count = Field()
+    me = Field()
+    emoji = ContextField(EmojiContext)
+
+
+class MessageReferenceContext(BaseContext):
+    """
+    Message reference context
+    """
+    __slots__ = ()
+
+    message_id = SnowflakeField()
+    channel_id = SnowflakeField()
+    guild_id = SnowflakeField()
+
+
+class MessageContext(MessageMixin, BaseContext):
+    """
+    Message context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    channel_id = SnowflakeField()
+    guild_id = SnowflakeField()
+    author = ContextField(UserContext)
+    member = ContextField(MemberContext)
+    content = Field()
+    timestamp = Field()
+    edited_timestamp = Field()
+    tts = Field()
+    mention_everyone = Field()
+    mentions = ContextField(UserContext, many=True)
+    mention_roles = SnowflakeListField()
+    mention_channels = Field()
+    attachments = ContextField(AttachmentContext, many=True)
+    embeds = ContextField(EmbedContext, many=True)
+    reactions = ContextField(ReactionContext, many=True)
+    nonce = Field()
+    pinned = Field()
+    webhook_id = SnowflakeField()
+    type = Field()
+    activity = Field()
+    application = Field()
+    message_reference = ContextField(MessageReferenceContext)
+    flags = Field()
+    stickers = Field()
+
+
+class InviteContext(BaseContext):
+    """
+    Invite context
+    """
+    __slots__ = ()
+
+    code = Field()
+    guild = ContextField(GuildContext)
+    channel = ContextField(ChannelContext)
+    inviter = ContextField(UserContext)
+    target_user = ContextField(UserContext)
+    target_user_type = Field()
+    approximate_presence_count = Field()
+    approximate_member_count = Field()
+    uses = Field()
+    max_uses = Field()
+    max_age = Field()
+    temporary = Field()
+    created_at = Field()
+
+
+class WebhookContext(BaseContext):
+    """
+    Webhook context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    type = Field()
+    guild_id = SnowflakeField()
+    channel_id = SnowflakeField()
+    user = ContextField(UserContext)
+    name = Field()
+    avatar = Field()
+    token = Field()
+    application_id = SnowflakeField()
+
+
+class BanContext(BaseContext):
+    """
+    Guild ban context
+    """
+    __slots__ = ()
+
+    reason = Field()
+    user = ContextField(UserContext)
+
+
+class GatewayBotContext(BaseContext):
+    """
+    Get gateway bot response context
+    """
+    __slots__ = ()
+
+    url = Field()
+    shards = Field()
+    session_start_limit = Field()
+
+
+class ApplicationCommandContext(BaseContext):
+    """
+    Application command context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    application_id = SnowflakeField()
+    guild_id = SnowflakeField()
+    name = Field()
+    description = Field()
+    options = Field()
+
+
+class InteractionContext(BaseContext):
+    """
+    Interaction context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    application_id = SnowflakeField()
+    type = Field()
+    data = Field()
+    guild_id = SnowflakeField()
+    channel_id = SnowflakeField()
+    member = ContextField(MemberContext)
+    user = ContextField(UserContext)
+    token = Field()
+    version = Field()
+
+
+class ReadyContext(BaseContext):
+    """
+    READY event context
+    """
+    __slots__ = ()
+
+    v = Field()
+    user = ContextField(UserContext)
+    private_channels = Field()
+    guilds = ContextField(UnavailableGuildContext, many=True)
+    session_id = Field()
+    shard = Field()
+    application = Field()
+
+
+class ChannelPinsUpdateContext(BaseContext):
+    """
+    CHANNEL_PINS_UPDATE event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    channel_id = SnowflakeField()
+    last_pin_timestamp = Field()
+
+
+class GuildBanContext(BaseContext):
+    """
+    GUILD_BAN_ADD and GUILD_BAN_REMOVE event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    user = ContextField(UserContext)
+
+
+class GuildEmojisUpdateContext(BaseContext):
+    """
+    GUILD_EMOJIS_UPDATE event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    emojis = ContextField(EmojiContext, many=True)
+
+
+class GuildIntegrationsUpdateContext(BaseContext):
+    """
+    GUILD_INTEGRATIONS_UPDATE event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+
+
+class GuildMemberAddContext(BaseContext):
+    """
+    GUILD_MEMBER_ADD event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    user = ContextField(UserContext)
+    nick = Field()
+    roles = SnowflakeListField()
+    joined_at = Field()
+    premium_since = Field()
+    deaf = Field()
+    mute = Field()
+    pending = Field()
+
+
+class GuildMemberRemoveContext(BaseContext):
+    """
+    GUILD_MEMBER_REMOVE event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    user = ContextField(UserContext)
+
+
+class GuildMemberUpdateContext(BaseContext):
+    """
+    GUILD_MEMBER_UPDATE event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    roles = SnowflakeListField()
+    user = ContextField(UserContext)
+    nick = Field()
+    joined_at = Field()
+    premium_since = Field()
+    pending = Field()
+
+
+class GuildMembersChunkContext(BaseContext):
+    """
+    GUILD_MEMBERS_CHUNK event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    members = ContextField(MemberContext, many=True)
+    chunk_index = Field()
+    chunk_count = Field()
+    not_found = SnowflakeListField()
+    presences = ContextField(PresenceContext, many=True)
+    nonce = Field()
+
+
+class GuildRoleUpdateContext(BaseContext):
+    """
+    GUILD_ROLE_CREATE and GUILD_ROLE_UPDATE event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    role = ContextField(RoleContext)
+
+
+class GuildRoleDeleteContext(BaseContext):
+    """
+    GUILD_ROLE_DELETE event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    role_id = SnowflakeField()
+
+
+class InviteCreateContext(BaseContext):
+    """
+    INVITE_CREATE event context
+    """
+    __slots__ = ()
+
+    channel_id = SnowflakeField()
+    code = Field()
+    created_at = Field()
+    guild_id = SnowflakeField()
+    inviter = ContextField(UserContext)
+    max_age = Field()
+    max_uses = Field()
+    target_user = ContextField(UserContext)
+    target_user_type = Field()
+    temporary = Field()
+    uses = Field()
+
+
+class InviteDeleteContext(BaseContext):
+    """
+    INVITE_DELETE event context
+    """
+    __slots__ = ()
+
+    channel_id = SnowflakeField()
+    guild_id = SnowflakeField()
+    code = Field()
+
+
+class MessageUpdateContext(MessageMixin, BaseContext):
+    """
+    MESSAGE_UPDATE event context. Only id and channel_id are always sent.
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    channel_id = SnowflakeField()
+    guild_id = SnowflakeField()
+    author = ContextField(UserContext)
+    member = ContextField(MemberContext)
+    content = Field()
+    timestamp = Field()
+    edited_timestamp = Field()
+    tts = Field()
+    mention_everyone = Field()
+    mentions = ContextField(UserContext, many=True)
+    mention_roles = SnowflakeListField()
+    attachments = ContextField(AttachmentContext, many=True)
+    embeds = ContextField(EmbedContext, many=True)
+    pinned = Field()
+    flags = Field()
+
+
+class MessageDeleteContext(BaseContext):
+    """
+    MESSAGE_DELETE event context
+    """
+    __slots__ = ()
+
+    id = SnowflakeField()
+    channel_id = SnowflakeField()
+    guild_id = SnowflakeField()
+
+
+class MessageDeleteBulkContext(BaseContext):
+    """
+    MESSAGE_DELETE_BULK event context
+    """
+    __slots__ = ()
+
+    ids = SnowflakeListField()
+    channel_id = SnowflakeField()
+    guild_id = SnowflakeField()
+
+
+class MessageReactionAddContext(BaseContext):
+    """
+    MESSAGE_REACTION_ADD event context
+    """
+    __slots__ = ()
+
+    user_id = SnowflakeField()
+    channel_id = SnowflakeField()
+    message_id = SnowflakeField()
+    guild_id = SnowflakeField()
+    member = ContextField(MemberContext)
+    emoji = ContextField(EmojiContext)
+
+
+class MessageReactionRemoveContext(BaseContext):
+    """
+    MESSAGE_REACTION_REMOVE event context
+    """
+    __slots__ = ()
+
+    user_id = SnowflakeField()
+    channel_id = SnowflakeField()
+    message_id = SnowflakeField()
+    guild_id = SnowflakeField()
+    emoji = ContextField(EmojiContext)
+
+
+class MessageReactionRemoveAllContext(BaseContext):
+    """
+    MESSAGE_REACTION_REMOVE_ALL event context
+    """
+    __slots__ = ()
+
+    channel_id = SnowflakeField()
+    message_id = SnowflakeField()
+    guild_id = SnowflakeField()
+
+
+class MessageReactionRemoveEmojiContext(BaseContext):
+    """
+    MESSAGE_REACTION_REMOVE_EMOJI event context
+    """
+    __slots__ = ()
+
+    channel_id = SnowflakeField()
+    guild_id = SnowflakeField()
+    message_id = SnowflakeField()
+    emoji = ContextField(EmojiContext)
+
+
+class TypingStartContext(BaseContext):
+    """
+    TYPING_START event context
+    """
+    __slots__ = ()
+
+    channel_id = SnowflakeField()
+    guild_id = SnowflakeField()
+    user_id = SnowflakeField()
+    timestamp = Field()
+    member = ContextField(MemberContext)
+
+
+class VoiceServerUpdateContext(BaseContext):
+    """
+    VOICE_SERVER_UPDATE event context
+    """
+    __slots__ = ()
+
+    token = Field()
+    guild_id = SnowflakeField()
+    endpoint = Field()
+
+
+class WebhooksUpdateContext(BaseContext):
+    """
+    WEBHOOKS_UPDATE event context
+    """
+    __slots__ = ()
+
+    guild_id = SnowflakeField()
+    channel_id = SnowflakeField()
+
+
+# Fields referencing contexts defined after them
+MessageContext.referenced_message = ContextField(MessageContext, key="referenced_message")
+
+# Event name: context of the event data
+EVENT_CONTEXTS = {
+    "READY": ReadyContext,
+    "CHANNEL_CREATE": ChannelContext,
+    "CHANNEL_UPDATE": ChannelContext,
+    "CHANNEL_DELETE": ChannelContext,
+    "CHANNEL_PINS_UPDATE": ChannelPinsUpdateContext,
+    "GUILD_CREATE": GuildContext,
+    "GUILD_UPDATE": GuildContext,
+    "GUILD_DELETE": UnavailableGuildContext,
+    "GUILD_BAN_ADD": GuildBanContext,
+    "GUILD_BAN_REMOVE": GuildBanContext,
+    "GUILD_EMOJIS_UPDATE": GuildEmojisUpdateContext,
+    "GUILD_INTEGRATIONS_UPDATE": GuildIntegrationsUpdateContext,
+    "GUILD_MEMBER_ADD": GuildMemberAddContext,
+    "GUILD_MEMBER_REMOVE": GuildMemberRemoveContext,
+    "GUILD_MEMBER_UPDATE": GuildMemberUpdateContext,
+    "GUILD_MEMBERS_CHUNK": GuildMembersChunkContext,
+    "GUILD_ROLE_CREATE": GuildRoleUpdateContext,
+    "GUILD_ROLE_UPDATE": GuildRoleUpdateContext,
+    "GUILD_ROLE_DELETE": GuildRoleDeleteContext,
+    "INVITE_CREATE": InviteCreateContext,
+    "INVITE_DELETE": InviteDeleteContext,
+    "MESSAGE_CREATE": MessageContext,
+    "MESSAGE_UPDATE": MessageUpdateContext,
+    "MESSAGE_DELETE": MessageDeleteContext,
+    "MESSAGE_DELETE_BULK": MessageDeleteBulkContext,
+    "MESSAGE_REACTION_ADD": MessageReactionAddContext,
+    "MESSAGE_REACTION_REMOVE": MessageReactionRemoveContext,
+    "MESSAGE_REACTION_REMOVE_ALL": MessageReactionRemoveAllContext,
+    "MESSAGE_REACTION_REMOVE_EMOJI": MessageReactionRemoveEmojiContext,
+    "PRESENCE_UPDATE": PresenceContext,
+    "TYPING_START": TypingStartContext,
+    "USER_UPDATE": UserContext,
+    "VOICE_STATE_UPDATE": VoiceStateContext,
+    "VOICE_SERVER_UPDATE": VoiceServerUpdateContext,
+    "WEBHOOKS_UPDATE": WebhooksUpdateContext,
+    "INTERACTION_CREATE": InteractionContext,
+    "APPLICATION_COMMAND_CREATE": ApplicationCommandContext,
+    "APPLICATION_COMMAND_UPDATE": ApplicationCommandContext,
+    "APPLICATION_COMMAND_DELETE": ApplicationCommandContext
+}
+
+# Endpoint: context of the response and whether the response is a list of them
+ROUTE_CONTEXTS = {
+    "GET /gateway/bot": (GatewayBotContext, False),
+    "GET /users/@me": (UserContext, False),
+    "GET /users/{user_id}": (UserContext, False),
+    "GET /users/@me/guilds": (GuildContext, True),
+    "GET /channels/{channel_id}": (ChannelContext, False),
+    "PATCH /channels/{channel_id}": (ChannelContext, False),
+    "DELETE /channels/{channel_id}": (ChannelContext, False),
+    "GET /channels/{channel_id}/messages": (MessageContext, True),
+    "GET /channels/{channel_id}/messages/{message_id}": (MessageContext, False),
+    "POST /channels/{channel_id}/messages": (MessageContext, False),
+    "PATCH /channels/{channel_id}/messages/{message_id}": (MessageContext, False),
+    "GET /channels/{channel_id}/pins": (MessageContext, True),
+    "GET /channels/{channel_id}/invites": (InviteContext, True),
+    "POST /channels/{channel_id}/invites": (InviteContext, False),
+    "GET /channels/{channel_id}/webhooks": (WebhookContext, True),
+    "POST /channels/{channel_id}/webhooks": (WebhookContext, False),
+    "GET /guilds/{guild_id}": (GuildContext, False),
+    "PATCH /guilds/{guild_id}": (GuildContext, False),
+    "GET /guilds/{guild_id}/channels": (ChannelContext, True),
+    "POST /guilds/{guild_id}/channels": (ChannelContext, False),
+    "GET /guilds/{guild_id}/members": (MemberContext, True),
+    "GET /guilds/{guild_id}/members/{user_id}": (MemberContext, False),
+    "GET /guilds/{guild_id}/bans": (BanContext, True),
+    "GET /guilds/{guild_id}/bans/{user_id}": (BanContext, False),
+    "GET /guilds/{guild_id}/roles": (RoleContext, True),
+    "POST /guilds/{guild_id}/roles": (RoleContext, False),
+    "PATCH /guilds/{guild_id}/roles/{role_id}": (RoleContext, False),
+    "GET /guilds/{guild_id}/emojis": (EmojiContext, True),
+    "GET /guilds/{guild_id}/emojis/{emoji_id}": (EmojiContext, False),
+    "GET /guilds/{guild_id}/invites": (InviteContext, True),
+    "GET /guilds/{guild_id}/webhooks": (WebhookContext, True),
+    "GET /invites/{invite_code}": (InviteContext, False),
+    "GET /webhooks/{webhook_id}": (WebhookContext, False)
+}
@@ -0,0 +1,484 @@
+from typing import Dict, Any, Optional, List, Tuple, Type
+
+from .fields import BaseContext
+from .mixins import MessageMixin
+
+
+class UserContext(BaseContext):
+    id: int
+    username: str
+    discriminator: str
+    avatar: Optional[str]
+    bot: Optional[bool]
+    system: Optional[bool]
+    mfa_enabled: Optional[bool]
+    locale: Optional[str]
+    verified: Optional[bool]
+    email: Optional[str]
+    flags: Optional[int]
+    premium_type: Optional[int]
+    public_flags: Optional[int]
+
+
+class MemberContext(BaseContext):
+    user: Optional[UserContext]
+    nick: Optional[str]
+    roles: List[int]
+    joined_at: str
+    premium_since: Optional[str]
+    deaf: bool
+    mute: bool
+    pending: Optional[bool]
+    permissions: Optional[str]
+
+
+class RoleContext(BaseContext):
+    id: int
+    name: str
+    color: int
+    hoist: bool
+    position: int
+    permissions: str
+    managed: bool
+    mentionable: bool
+    tags: Optional[Dict[str, Any]]
+
+
+class EmojiContext(BaseContext):
+    id: Optional[int]
+    name: Optional[str]
+    roles: Optional[List[int]]
+    user: Optional[UserContext]
+    require_colons: Optional[bool]
+    managed: Optional[bool]
+    animated: Optional[bool]
+    available: Optional[bool]
+
+
+class PermissionOverwriteContext(BaseContext):
+    id: int
+    type: int
+    allow: str
+    deny: str
+
+
+class ChannelContext(BaseContext):
+    id: int
+    type: int
+    guild_id: Optional[int]
+    position: Optional[int]
+    permission_overwrites: Optional[List[PermissionOverwriteContext]]
+    name: Optional[str]
+    topic: Optional[str]
+    nsfw: Optional[bool]
+    last_message_id: Optional[int]
+    bitrate: Optional[int]
+    user_limit: Optional[int]
+    rate_limit_per_user: Optional[int]
+    recipients: Optional[List[UserContext]]
+    icon: Optional[str]
+    owner_id: Optional[int]
+    application_id: Optional[int]
+    parent_id: Optional[int]
+    last_pin_timestamp: Optional[str]
+
+
+class VoiceStateContext(BaseContext):
+    guild_id: Optional[int]
+    channel_id: Optional[int]
+    user_id: int
+    member: Optional[MemberContext]
+    session_id: str
+    deaf: bool
+    mute: bool
+    self_deaf: bool
+    self_mute: bool
+    self_stream: Optional[bool]
+    self_video: bool
+    suppress: bool
+
+
+class ActivityContext(BaseContext):
+    name: str
+    type: int
+    url: Optional[str]
+    created_at: int
+    timestamps: Optional[Dict[str, Any]]
+    application_id: Optional[int]
+    details: Optional[str]
+    state: Optional[str]
+    emoji: Optional[EmojiContext]
+    party: Optional[Dict[str, Any]]
+    assets: Optional[Dict[str, Any]]
+    secrets: Optional[Dict[str, Any]]
+    instance: Optional[bool]
+    flags: Optional[int]
+
+
+class PresenceContext(BaseContext):
+    user: UserContext
+    guild_id: Optional[int]
+    status: str
+    activities: List[ActivityContext]
+    client_status: Dict[str, Any]
+
+
+class GuildContext(BaseContext):
+    id: int
+    name: str
+    icon: Optional[str]
+    splash: Optional[str]
+    discovery_splash: Optional[str]
+    owner: Optional[bool]
+    owner_id: int
+    permissions: Optional[str]
+    region: str
+    afk_channel_id: Optional[int]
+    afk_timeout: int
+    widget_enabled: Optional[bool]
+    widget_channel_id: Optional[int]
+    verification_level: int
+    default_message_notifications: int
+    explicit_content_filter: int
+    roles: List[RoleContext]
+    emojis: List[EmojiContext]
+    features: List[str]
+    mfa_level: int
+    application_id: Optional[int]
+    system_channel_id: Optional[int]
+    system_channel_flags: int
+    rules_channel_id: Optional[int]
+    joined_at: Optional[str]
+    large: Optional[bool]
+    unavailable: Optional[bool]
+    member_count: Optional[int]
+    voice_states: Optional[List[VoiceStateContext]]
+    members: Optional[List[MemberContext]]
+    channels: Optional[List[ChannelContext]]
+    presences: Optional[List[PresenceContext]]
+    max_presences: Optional[int]
+    max_members: Optional[int]
+    vanity_url_code: Optional[str]
+    description: Optional[str]
+    banner: Optional[str]
+    premium_tier: int
+    premium_subscription_count: Optional[int]
+    preferred_locale: str
+    public_updates_channel_id: Optional[int]
+    max_video_channel_users: Optional[int]
+    approximate_member_count: Optional[int]
+    approximate_presence_count: Optional[int]
+
+
+class UnavailableGuildContext(BaseContext):
+    id: int
+    unavailable: Optional[bool]
+
+
+class AttachmentContext(BaseContext):
+    id: int
+    filename: str
+    size: int
+    url: str
+    proxy_url: str
+    height: Optional[int]
+    width: Optional[int]
+
+
+class EmbedContext(BaseContext):
+    title: Optional[str]
+    type: Optional[str]
+    description: Optional[str]
+    url: Optional[str]
+    timestamp: Optional[str]
+    color: Optional[int]
+    footer: Optional[Dict[str, Any]]
+    image: Optional[Dict[str, Any]]
+    thumbnail: Optional[Dict[str, Any]]
+    video: Optional[Dict[str, Any]]
+    provider: Optional[Dict[str, Any]]
+    author: Optional[Dict[str, Any]]
+    fields: Optional[List[Dict[str, Any]]]
+
+
+class ReactionContext(BaseContext):
+    count: int
+    me: bool
+    emoji: EmojiContext
+
+
+class MessageReferenceContext(BaseContext):
+    message_id: Optional[int]
+    channel_id: Optional[int]
+    guild_id: Optional[int]
+
+
+class MessageContext(MessageMixin, BaseContext):
+    id: int
+    channel_id: int
+    guild_id: Optional[int]
+    author: UserContext
+    member: Optional[MemberContext]
+    content: str
+    timestamp: str
+    edited_timestamp: Optional[str]
+    tts: bool
+    mention_everyone: bool
+    mentions: List[UserContext]
+    mention_roles: List[int]
+    mention_channels: Optional[List[Dict[str, Any]]]
+    attachments: List[AttachmentContext]
+    embeds: List[EmbedContext]
+    reactions: Optional[List[ReactionContext]]
+    nonce: Any
+    pinned: bool
+    webhook_id: Optional[int]
+    type: int
+    activity: Optional[Dict[str, Any]]
+    application: Optional[Dict[str, Any]]
+    message_reference: Optional[MessageReferenceContext]
+    flags: Optional[int]
+    stickers: Optional[List[Dict[str, Any]]]
+    referenced_message: Optional[MessageContext]
+
+
+class InviteContext(BaseContext):
+    code: str
+    guild: Optional[GuildContext]
+    channel: Optional[ChannelContext]
+    inviter: Optional[UserContext]
+    target_user: Optional[UserContext]
+    target_user_type: Optional[int]
+    approximate_presence_count: Optional[int]
+    approximate_member_count: Optional[int]
+    uses: Optional[int]
+    max_uses: Optional[int]
+    max_age: Optional[int]
+    temporary: Optional[bool]
+    created_at: Optional[str]
+
+
+class WebhookContext(BaseContext):
+    id: int
+    type: int
+    guild_id: Optional[int]
+    channel_id: int
+    user: Optional[UserContext]
+    name: Optional[str]
+    avatar: Optional[str]
+    token: Optional[str]
+    application_id: Optional[int]
+
+
+class BanContext(BaseContext):
+    reason: Optional[str]
+    user: UserContext
+
+
+class GatewayBotContext(BaseContext):
+    url: str
+    shards: int
+    session_start_limit: Dict[str, Any]
+
+
+class ApplicationCommandContext(BaseContext):
+    id: int
+    application_id: int
+    guild_id: Optional[int]
+    name: str
+    description: str
+    options: Optional[List[Dict[str, Any]]]
+
+
+class InteractionContext(BaseContext):
+    id: int
+    application_id: Optional[int]
+    type: int
+    data: Optional[Dict[str, Any]]
+    guild_id: Optional[int]
+    channel_id: Optional[int]
+    member: Optional[MemberContext]
+    user: Optional[UserContext]
+    token: str
+    version: int
+
+
+class ReadyContext(BaseContext):
+    v: int
+    user: UserContext
+    private_channels: List[Dict[str, Any]]
+    guilds: List[UnavailableGuildContext]
+    session_id: str
+    shard: Optional[List[int]]
+    application: Dict[str, Any]
+
+
+class ChannelPinsUpdateContext(BaseContext):
+    guild_id: Optional[int]
+    channel_id: int
+    last_pin_timestamp: Optional[str]
+
+
+class GuildBanContext(BaseContext):
+    guild_id: int
+    user: UserContext
+
+
+class GuildEmojisUpdateContext(BaseContext):
+    guild_id: int
+    emojis: List[EmojiContext]
+
+
+class GuildIntegrationsUpdateContext(BaseContext):
+    guild_id: int
+
+
+class GuildMemberAddContext(BaseContext):
+    guild_id: int
+    user: UserContext
+    nick: Optional[str]
+    roles: List[int]
+    joined_at: str
+    premium_since: Optional[str]
+    deaf: bool
+    mute: bool
+    pending: Optional[bool]
+
+
+class GuildMemberRemoveContext(BaseContext):
+    guild_id: int
+    user: UserContext
+
+
+class GuildMemberUpdateContext(BaseContext):
+    guild_id: int
+    roles: List[int]
+    user: UserContext
+    nick: Optional[str]
+    joined_at: str
+    premium_since: Optional[str]
+    pending: Optional[bool]
+
+
+class GuildMembersChunkContext(BaseContext):
+    guild_id: int
+    members: List[MemberContext]
+    chunk_index: int
+    chunk_count: int
+    not_found: Optional[List[int]]
+    presences: Optional[List[PresenceContext]]
+    nonce: Optional[str]
+
+
+class GuildRoleUpdateContext(BaseContext):
+    guild_id: int
+    role: RoleContext
+
+
+class GuildRoleDeleteContext(BaseContext):
+    guild_id: int
+    role_id: int
+
+
+class InviteCreateContext(BaseContext):
+    channel_id: int
+    code: str
+    created_at: str
+    guild_id: Optional[int]
+    inviter: Optional[UserContext]
+    max_age: int
+    max_uses: int
+    target_user: Optional[UserContext]
+    target_user_type: Optional[int]
+    temporary: bool
+    uses: int
+
+
+class InviteDeleteContext(BaseContext):
+    channel_id: int
+    guild_id: Optional[int]
+    code: str
+
+
+class MessageUpdateContext(MessageMixin, BaseContext):
+    id: int
+    channel_id: int
+    guild_id: Optional[int]
+    author: Optional[UserContext]
+    member: Optional[MemberContext]
+    content: Optional[str]
+    timestamp: Optional[str]
+    edited_timestamp: Optional[str]
+    tts: Optional[bool]
+    mention_everyone: Optional[bool]
+    mentions: Optional[List[UserContext]]
+    mention_roles: Optional[List[int]]
+    attachments: Optional[List[AttachmentContext]]
+    embeds: Optional[List[EmbedContext]]
+    pinned: Optional[bool]
+    flags: Optional[int]
+
+
+class MessageDeleteContext(BaseContext):
+    id: int
+    channel_id: int
+    guild_id: Optional[int]
+
+
+class MessageDeleteBulkContext(BaseContext):
+    ids: List[int]
+    channel_id: int
+    guild_id: Optional[int]
+
+
+class MessageReactionAddContext(BaseContext):
+    user_id: int
+    channel_id: int
+    message_id: int
+    guild_id: Optional[int]
+    member: Optional[MemberContext]
+    emoji: EmojiContext
+
+
+class MessageReactionRemoveContext(BaseContext):
+    user_id: int
+    channel_id: int
+    message_id: int
+    guild_id: Optional[int]
+    emoji: EmojiContext
+
+
+class MessageReactionRemoveAllContext(BaseContext):
+    channel_id: int
+    message_id: int
+    guild_id: Optional[int]
+
+
+class MessageReactionRemoveEmojiContext(BaseContext):
+    channel_id: int
+    guild_id: Optional[int]
+    message_id: int
+    emoji: EmojiContext
+
+
+class TypingStartContext(BaseContext):
+    channel_id: int
+    guild_id: Optional[int]
+    user_id: int
+    timestamp: int
+    member: Optional[MemberContext]
+
+
+class VoiceServerUpdateContext(BaseContext):
+    token: str
+    guild_id: int
+    endpoint: Optional[str]
+
+
+class WebhooksUpdateContext(BaseContext):
+    guild_id: int
+    channel_id: int
+
+
+EVENT_CONTEXTS: Dict[str, Type[BaseContext]]
+ROUTE_CONTEXTS: Dict[str, Tuple[Type[BaseContext], bool]]
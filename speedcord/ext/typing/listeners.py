@@ -0,0 +1,133 @@
+"""
+Created by Epic at 10/17/26
+"""
+from inspect import isawaitable
+
+from speedcord.dispatcher import prepare_handler, run_handlers
+from .generated import EVENT_CONTEXTS, ROUTE_CONTEXTS
+
+__all__ = ("TypedListeners", "request_context")
+
+
+class TypedListeners:
+    """
+    Calls listeners with the generated context of an event instead of the raw event data.
+    The event data is converted once per event no matter how many typed listeners there are, and only events with
+    a typed listener are converted. The listeners are run like other handlers of the dispatcher, including
+    ordered dispatch and limited events.
+
+    Parameters
+    ----------
+    client: Client
+        The :class:`Client` to listen to.
+    contexts: Optional[Dict[str, Type[BaseContext]]]
+        Context class to use for each event name. Defaults to the generated contexts.
+    """
+    def __init__(self, client, contexts=None):
+        self.client = client
+        self.contexts = contexts if contexts is not None else EVENT_CONTEXTS
+
+        # Event name: list of prepared typed listeners
+        self.listeners = {}
+
+    def create_converter(self, event_name, context_class, listeners):
+        dispatcher = self.client.event_dispatcher
+
+        def converter(data, shard):
+            context = context_class(self.client, data)
+            args = (context, shard)
+            if event_name in dispatcher.event_pools or (dispatcher.order_key is not None and
+                                                        dispatcher.order_key(event_name, data) is not None):
+                # The dispatcher awaits the returned coroutine, so the listeners keep the order of the events
+                return self.run_in_order(listeners, args)
+            run_handlers(dispatcher.loop, listeners, dispatcher.eager, args, {})
+        return converter
+
+    async def run_in_order(self, listeners, args):
+        for func, is_coroutine in listeners:
+            try:
+                result = func(*args)
+                if is_coroutine or isawaitable(result):
+                    await result
+            except Exception as error:
+                self.client.event_dispatcher.loop.call_exception_handler({
+                    "message": f"Exception in handler {func!r}",
+                    "exception": error
+                })
+
+    def register(self, event_name, func):
+        """
+        Registers a typed listener.
+
+        Parameters
+        ----------
+        event_name: str
+            The event name from Discord to listen to.
+        func: Callable[[BaseContext, DefaultShard], Awaitable[Any]]
+            Called with the context of the event and the shard it was received on.
+
+        Raises
+        ------
+        TypeError
+            There is no context for the event.
+        """
+        event_name = event_name.upper()
+        listeners = self.listeners.get(event_name)
+        if listeners is None:
+            context_class = self.contexts.get(event_name)
+            if context_class is None:
+                raise TypeError(f"There is no typed context for {event_name}!")
+            listeners = self.listeners[event_name] = []
+            self.client.event_dispatcher.register(event_name,
+                                                  self.create_converter(event_name, context_class, listeners))
+        dispatcher = self.client.event_dispatcher
+        listeners.append(prepare_handler(func, dispatcher.metrics, event_name, dispatcher.tracer, dispatcher.monitor))
+
+    def listen(self, event_name):
+        """
+        Decorator registering a typed listener.
+
+        Parameters
+        ----------
+        event_name: str
+            The event name from Discord to listen to.
+        """
+        def get_func(func):
+            self.register(event_name, func)
+            return func
+
+        return get_func
+
+
+async def request_context(client, route, **kwargs):
+    """
+    Sends a request and converts the response to its generated context.
+
+    Parameters
+    ----------
+    client: Client
+        The :class:`Client` to send the request with.
+    route: Route
+        The route to request. Its endpoint has to be in the schema's routes.
+    **kwargs: Any
+        Arguments passed to :meth:`HttpClient.request`.
+
+    Returns
+    -------
+    Union[BaseContext, List[BaseContext]]
+        The context of the response, or a list of them if the endpoint returns a list.
+
+    Raises
+    ------
+    TypeError
+        There is no context for the endpoint.
+    """
+    try:
+        context_class, many = ROUTE_CONTEXTS[route.endpoint]
+    except KeyError:
+        raise TypeError(f"There is no typed context for {route.endpoint}!") from None
+    r = await client.http.request(route, **kwargs)
+    data = await r.json()
+    if many:
+        return [context_class(client, item) for item in data]
+    return context_class(client, data)
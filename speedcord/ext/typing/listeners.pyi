@@ -0,0 +1,34 @@
+from typing import Dict, Any, List, Type, Callable, Awaitable, Union, Tuple, Optional
+
+from speedcord import Client
+from speedcord.http import Route
+from speedcord.shard import DefaultShard
+from .fields import BaseContext
+
+Listener = Callable[[Any, DefaultShard], Awaitable[Any]]
+
+
+class TypedListeners:
+    client: Client
+    contexts: Dict[str, Type[BaseContext]]
+    listeners: Dict[str, List[Tuple[Listener, bool]]]
+
+    def __init__(self, client: Client, contexts: Dict[str, Type[BaseContext]] = None):
+        ...
+
+    def create_converter(self, event_name: str, context_class: Type[BaseContext], listeners: List[Tuple[Listener, bool]]
+                         ) -> Callable[[Dict[str, Any], DefaultShard], Optional[Awaitable[None]]]:
+        ...
+
+    async def run_in_order(self, listeners: List[Tuple[Listener, bool]], args: Tuple[Any, ...]):
+        ...
+
+    def register(self, event_name: str, func: Listener):
+        ...
+
+    def listen(self, event_name: str) -> Callable[[Listener], Listener]:
+        ...
+
+
+async def request_context(client: Client, route: Route, **kwargs: Any) -> Union[BaseContext, List[BaseContext]]:
+    ...
@@ -0,0 +1,19 @@
+"""
+Created by Epic at 10/17/26
+
+Methods added to generated contexts. Listed under ``mixins`` in schema.json.
+"""
+from speedcord.http import Route
+
+__all__ = ("MessageMixin",)
+
+
+class MessageMixin:
+    __slots__ = ()
+
+    async def send(self, **kwargs):
+        """
+        Sends a message in the channel of the message.
+        """
+        route = Route("POST", "/channels/{channel_id}/messages", channel_id=self.channel_id)
+        return await self.client.http.request(route, json=kwargs)
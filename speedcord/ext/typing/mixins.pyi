@@ -0,0 +1,9 @@
+from typing import Dict, Any, Union
+
+from aiohttp import ClientResponse
+
+
+class MessageMixin:
+    async def send(self, *, content: str = ..., nonce: Union[int, str] = ..., tts: bool = ...,
+                   embed: Dict[str, Any] = ..., allowed_mentions: Dict[str, Any] = ...) -> ClientResponse:
+        ...
@@ -0,0 +1,102 @@
+"""
+Created by Epic at 10/17/26
+
+Filters run before events are dispatched. A filter is called with the event name and data and returns a falsy value
+to drop the event. Register them with :meth:`Client.add_filter`.
+"""
+
+from .dispatcher import channel_key, get_guild_id, get_user
+
+__all__ = ("ignore_bots", "guild_allowlist", "ignore_channels", "compile_filters", "UNFILTERED_EVENTS")
+
+# Events the shards need to connect, filters never drop them
+UNFILTERED_EVENTS = frozenset(("READY", "RESUMED"))
+
+
+def ignore_bots():
+    """
+    Drops events sent by bots, such as their messages and reactions.
+
+    Returns
+    -------
+    Callable[[str, Dict[str, Any]], bool]
+        The filter.
+    """
+    def check(event_name, data):
+        user = get_user(data)
+        return user is None or not user.get("bot", False)
+    return check
+
+
+def guild_allowlist(guild_ids, *, allow_direct_messages=True):
+    """
+    Drops events from guilds that aren't allowed.
+
+    Parameters
+    ----------
+    guild_ids: Iterable[Union[int, str]]
+        The guilds to receive events from.
+    allow_direct_messages: bool
+        Keep events that don't belong to a guild, such as direct messages.
+
+    Returns
+    -------
+    Callable[[str, Dict[str, Any]], bool]
+        The filter.
+    """
+    allowed = frozenset(str(guild_id) for guild_id in guild_ids)
+
+    def check(event_name, data):
+        guild_id = get_guild_id(event_name, data)
+        if guild_id is None:
+            return allow_direct_messages
+        return str(guild_id) in allowed
+    return check
+
+
+def ignore_channels(channel_ids):
+    """
+    Drops events from channels.
+
+    Parameters
+    ----------
+    channel_ids: Iterable[Union[int, str]]
+        The channels to ignore.
+
+    Returns
+    -------
+    Callable[[str, Dict[str, Any]], bool]
+        The filter.
+    """
+    ignored = frozenset(str(channel_id) for channel_id in channel_ids)
+
+    def check(event_name, data):
+        channel_id = channel_key(event_name, data)
+        return channel_id is None or str(channel_id) not in ignored
+    return check
+
+
+def compile_filters(filters):
+    """
+    Combines filters into one function that short-circuits on the first filter dropping the event.
+
+    Parameters
+    ----------
+    filters: Sequence[Callable[[str, Dict[str, Any]], bool]]
+        The filters to combine.
+
+    Returns
+    -------
+    Optional[Callable[[str, Dict[str, Any]], bool]]
+        The combined filter, or None if there are no filters.
+    """
+    if not filters:
+        return None
+    if len(filters) == 1:
+        return filters[0]
+    namespace = {f"filter_{index}": event_filter for index, event_filter in enumerate(filters)}
+    # One boolean expression instead of a loop over the filters
+    source = "def check(event_name, data):\n    return " + \
+        " and ".join(f"{name}(event_name, data)" for name in namespace)
+    exec(source, namespace)
+    return namespace["check"]
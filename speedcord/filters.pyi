@@ -0,0 +1,21 @@
+from typing import Callable, Dict, Any, Iterable, Union, Optional, Sequence, FrozenSet
+
+EventFilter = Callable[[str, Dict[str, Any]], Any]
+
+UNFILTERED_EVENTS: FrozenSet[str]
+
+
+def ignore_bots() -> EventFilter:
+    ...
+
+
+def guild_allowlist(guild_ids: Iterable[Union[int, str]], *, allow_direct_messages: bool = True) -> EventFilter:
+    ...
+
+
+def ignore_channels(channel_ids: Iterable[Union[int, str]]) -> EventFilter:
+    ...
+
+
+def compile_filters(filters: Sequence[EventFilter]) -> Optional[EventFilter]:
+    ...
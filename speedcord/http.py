@@ -3,14 +3,16 @@ Created by Epic at 9/1/20
 Inspiration taken from discord.py
 """
 
-from aiohttp import ClientSession, __version__ as aiohttp_version, ClientWebSocketResponse
+from aiohttp import ClientSession, TCPConnector, __version__ as aiohttp_version, ClientWebSocketResponse
 import asyncio
 import logging
 from sys import version_info as python_version
+from time import monotonic, perf_counter
 from urllib.parse import quote as uriquote
 
 from .values import version as speedcord_version
 from .exceptions import Forbidden, NotFound, HTTPException, Unauthorized
+from .ratelimiter import Bucket, BucketStore, TimesPer
 
 __all__ = ("Route", "HttpClient")
 
@@ -30,42 +32,34 @@ class Route:
     """
     def __init__(self, method, route, **parameters):
         self.method = method
+        self.template = route
         self.path = route.format(**parameters)
 
         # Used for bucket cooldowns
         self.channel_id = parameters.get("channel_id")
         self.guild_id = parameters.get("guild_id")
+        self.webhook_id = parameters.get("webhook_id")
 
     @property
-    def bucket(self):
+    def endpoint(self):
         """
-        The Route's bucket identifier.
+        The method and unformatted route. Discord assigns rate-limit buckets per endpoint.
         """
-        return f"{self.channel_id}:{self.guild_id}:{self.path}"
-
+        return f"{self.method} {self.template}"
 
-class LockManager:
-    def __init__(self, lock: asyncio.Lock):
+    @property
+    def major_parameters(self):
         """
-        Used by HttpClient to handle rate limits. Locked when a Bucket's rate limit has been
-        hit, which prevents additional requests from being executed.
-        :param lock: An asyncio.Lock object. Usually something like asyncio.Lock(loop=some_loop)
+        The parameters Discord splits rate-limit buckets by.
         """
-        self.lock = lock
-        self.unlock = True
-
-    def __enter__(self):
-        return self
+        return f"{self.channel_id}:{self.guild_id}:{self.webhook_id}"
 
-    def defer(self):
+    @property
+    def bucket(self):
         """
-        Stops the lock from being automatically being unlocked when it ends
+        The Route's bucket identifier, used until Discord tells us which bucket the endpoint belongs to.
         """
-        self.unlock = False
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.unlock:
-            self.lock.release()
+        return f"{self.major_parameters}:{self.endpoint}"
 
 
 class HttpClient:
@@ -80,20 +74,52 @@ class HttpClient:
         Discord's API URI.
     **loop: AbstractEventLoop
         An event loop to use for callbacks.
+    **max_buckets: int
+        How many rate-limit buckets to keep before evicting the least recently used ones.
+    **bucket_idle_timeout: float
+        Seconds a rate-limit bucket can be unused before it is evicted.
+    **global_ratelimit: Optional[int]
+        How many requests to send per second at most. None to disable the global limiter.
+    **coalesce_requests: bool
+        Share one request and response between concurrent identical GET requests.
+    **cache: Optional[ResponseCache]
+        Cache for GET responses.
+    **metrics: Optional[Metrics]
+        Records request latency, rate-limit waits and responses per endpoint.
+    **tracer: Optional[Tracer]
+        Records a span for every request attempt, with a child span for the time spent waiting for rate-limits.
     """
-    def __init__(self, token, *, baseuri="https://discord.com/api/v8", loop=asyncio.get_event_loop()):
+    def __init__(self, token, *, baseuri="https://discord.com/api/v8", loop=asyncio.get_event_loop(),
+                 max_buckets=10000, bucket_idle_timeout=300, global_ratelimit=50, coalesce_requests=False,
+                 cache=None, metrics=None, tracer=None):
         self.baseuri = baseuri
         self.token = token
         self.loop = loop
         self.session = ClientSession()
+        self.ws_session = None  # Websockets stay open, so they don't share the connection limit of requests
         self.logger = logging.getLogger("speedcord.http")
 
-        self.ratelimit_locks = {}
-        self.global_lock = asyncio.Event(loop=self.loop)
+        self.ratelimit_buckets = BucketStore(max_size=max_buckets, idle_timeout=bucket_idle_timeout)
+        self.bucket_hashes = {}  # Route.endpoint: X-RateLimit-Bucket
+        self.global_lock = asyncio.Event()  # Set while we are not globally rate-limited
+        self.global_reset_at = 0
+        self.global_reset_handle = None
+        self.global_ratelimiter = TimesPer(global_ratelimit, 1) if global_ratelimit is not None else None
+        self.global_wait_time = 0  # Seconds spent waiting for the global rate-limit
+        self.global_waits = 0
 
         # Clear the global lock on start
         self.global_lock.set()
 
+        # Request coalescing
+        self.coalesce_requests = coalesce_requests
+        self.inflight_requests = {}
+        self.coalesced_requests = 0  # Requests that were served by another request
+
+        self.cache = cache
+        self.metrics = metrics
+        self.tracer = tracer
+
         self.default_headers = {
             "X-RateLimit-Precision": "millisecond",
             "Authorization": f"Bot {self.token}",
@@ -115,8 +141,8 @@ class HttpClient:
         compression: int
             Whether to enable compression.
         """
-        if self.session.closed:
-            self.session = ClientSession()
+        if self.ws_session is None or self.ws_session.closed:
+            self.ws_session = ClientSession(connector=TCPConnector(limit=0))
         options = {
             "max_msg_size": 0,
             "timeout": 60,
@@ -126,11 +152,170 @@ class HttpClient:
             },
             "compress": compression
         }
-        return await self.session.ws_connect(url, **options)
+        return await self.ws_session.ws_connect(url, **options)
+
+    def get_bucket(self, route):
+        """
+        Gets the key of the rate-limit bucket a route belongs to.
+
+        Parameters
+        ----------
+        route: Route
+            The route to get the bucket for.
+
+        Returns
+        -------
+        str
+            The bucket hash Discord sent for the endpoint combined with the major parameters, or
+            :attr:`Route.bucket` if the bucket hash is not known yet.
+        """
+        bucket_hash = self.bucket_hashes.get(route.endpoint)
+        if bucket_hash is None:
+            return route.bucket
+        return f"{bucket_hash}:{route.major_parameters}"
+
+    def update_bucket_hash(self, route, bucket_hash, ratelimit_bucket):
+        """
+        Stores the bucket hash Discord sent for a route's endpoint.
+
+        Parameters
+        ----------
+        route: Route
+            The route the response was for.
+        bucket_hash: Optional[str]
+            The X-RateLimit-Bucket header.
+        ratelimit_bucket: Bucket
+            The bucket used for the request. Moved to the new key so it keeps its rate-limit state.
+        """
+        if bucket_hash is None or self.bucket_hashes.get(route.endpoint) == bucket_hash:
+            return
+        self.bucket_hashes[route.endpoint] = bucket_hash
+        self.ratelimit_buckets.setdefault(self.get_bucket(route), ratelimit_bucket)
+
+    def set_global_ratelimit(self, retry_after):
+        """
+        Pauses all requests after hitting the global rate-limit.
+
+        Parameters
+        ----------
+        retry_after: float
+            Seconds until requests can be sent again.
+        """
+        reset_at = monotonic() + retry_after
+        if reset_at <= self.global_reset_at:
+            # Another request already paused for longer
+            return
+        self.global_reset_at = reset_at
+        self.global_lock.clear()
+        if self.global_reset_handle is not None:
+            self.global_reset_handle.cancel()
+        self.global_reset_handle = asyncio.get_running_loop().call_later(retry_after, self.global_lock.set)
+
+    async def wait_for_global_ratelimit(self):
+        """
+        Waits until a request can be sent without exceeding the global rate-limit.
+        """
+        started_at = monotonic()
+        if not self.global_lock.is_set():
+            self.logger.debug("Sleeping for global rate-limit")
+            await self.global_lock.wait()
+        if self.global_ratelimiter is not None:
+            await self.global_ratelimiter.trigger()
+        waited = monotonic() - started_at
+        if waited > 0.001:
+            self.global_waits += 1
+            self.global_wait_time += waited
 
     async def request(self, route: Route, **kwargs):
         """
         Sends a request to the Discord API.
+        If request coalescing is enabled, concurrent GET requests to the same path with the same query share
+        one request. If a cache is set, GET responses are served from it and requests with other methods
+        invalidate the cached responses for their path and its parent path. The response body of shared and cached
+        responses is read before it is returned.
+
+        Parameters
+        ----------
+        route: Route
+            The Discord API route to send a request to.
+        **kwargs: Dict[str, Any]
+            The parameters being passed to asyncio.ClientSession.request
+        """
+        if route.method != "GET" or not kwargs.keys() <= {"params"}:
+            r = await self.send_request(route, **kwargs)
+            if self.cache is not None and route.method != "GET":
+                self.cache.invalidate(route.path)
+                # The resource is also listed in its parent, for example a message in the channel's messages
+                self.cache.invalidate(route.path.rsplit("/", 1)[0])
+            return r
+        if self.cache is None and not self.coalesce_requests:
+            return await self.send_request(route, **kwargs)
+
+        params = kwargs.get("params") or ()
+        if hasattr(params, "items"):
+            params = params.items()
+        key = (route.path, tuple(sorted((str(name), str(value)) for name, value in params)))
+        if self.cache is not None:
+            r = self.cache.get(key)
+            if r is not None:
+                return r
+
+        if self.coalesce_requests:
+            request = self.inflight_requests.get(key)
+            if request is None:
+                request = asyncio.ensure_future(self.send_coalesced_request(key, route, **kwargs))
+                # Don't warn about unretrieved exceptions if every caller was cancelled
+                request.add_done_callback(lambda task: task.cancelled() or task.exception())
+                self.inflight_requests[key] = request
+            else:
+                self.coalesced_requests += 1
+            return await asyncio.shield(request)
+        return await self.send_cached_request(key, route, **kwargs)
+
+    async def send_coalesced_request(self, key, route, **kwargs):
+        try:
+            r = await self.send_cached_request(key, route, **kwargs)
+            # Read the body once so every caller can use it
+            await r.read()
+            return r
+        finally:
+            del self.inflight_requests[key]
+
+    async def send_cached_request(self, key, route, **kwargs):
+        if self.cache is None:
+            return await self.send_request(route, **kwargs)
+        # Invalidations while the request is sent make the response outdated
+        generation = self.cache.generation
+        r = await self.send_request(route, **kwargs)
+        await r.read()
+        self.cache.set(key, route.path, r, generation)
+        return r
+
+    def merge_headers(self, kwargs):
+        """
+        Merges the default headers with the headers of a request and formats the audit log reason.
+
+        Parameters
+        ----------
+        kwargs: Dict[str, Any]
+            The parameters of the request. ``headers`` is replaced with the merged headers and ``reason`` is removed.
+        """
+        # Merge default headers with the users headers, could probably use a if to check if is headers set?
+        # Not sure which is optimal for speed, see benchmarks/rest.py
+        kwargs["headers"] = {**self.default_headers, **kwargs.get("headers", {})}
+
+        # Format the reason
+        try:
+            reason = kwargs.pop("reason")
+        except KeyError:
+            pass
+        else:
+            if reason:
+                kwargs["headers"]["X-Audit-Log-Reason"] = uriquote(reason, safe="/ ")
+
+    async def send_request(self, route: Route, **kwargs):
+        """
+        Sends a request to the Discord API without coalescing it.
 
         Parameters
         ----------
@@ -141,53 +326,65 @@ class HttpClient:
         """
         if self.session.closed:
             self.session = ClientSession()
-        bucket = route.bucket
-
+        metrics = self.metrics
+        tracer = self.tracer
         for retry_count in range(self.retry_attempts):
-            if not self.global_lock.is_set():
-                self.logger.debug("Sleeping for global rate-limit")
-                await self.global_lock.wait()
-
-            ratelimit_lock: asyncio.Lock = self.ratelimit_locks.get(bucket, None)
-            if ratelimit_lock is None:
-                self.ratelimit_locks[bucket] = asyncio.Lock()
-                continue
-
-            await ratelimit_lock.acquire()
-            with LockManager(ratelimit_lock) as lockmanager:
-                # Merge default headers with the users headers, could probably use a if to check if is headers set?
-                # Not sure which is optimal for speed
-                kwargs["headers"] = {**self.default_headers, **kwargs.get("headers", {})}
-
-                # Format the reason
-                try:
-                    reason = kwargs.pop("reason")
-                except KeyError:
-                    pass
-                else:
-                    if reason:
-                        kwargs["headers"]["X-Audit-Log-Reason"] = uriquote(reason, safe="/ ")
+            if metrics is not None:
+                wait_started_at = perf_counter()
+            if tracer is not None:
+                span = tracer.start_span("http.request", {"method": route.method, "endpoint": route.endpoint,
+                                                          "attempt": retry_count})
+                wait_span = tracer.start_span("http.ratelimit_wait", parent=span)
+            bucket = self.get_bucket(route)
+            ratelimit_bucket: Bucket = self.ratelimit_buckets.get(bucket, None)
+            if ratelimit_bucket is None:
+                ratelimit_bucket = self.ratelimit_buckets[bucket] = Bucket()
+
+            await ratelimit_bucket.acquire()
+            try:
+                await self.wait_for_global_ratelimit()
+                self.merge_headers(kwargs)
+                if metrics is not None:
+                    request_started_at = perf_counter()
+                    metrics.ratelimit_wait_seconds.observe(request_started_at - wait_started_at, (route.endpoint,))
+                if tracer is not None:
+                    wait_span.finish()
                 r = await self.session.request(route.method, self.baseuri + route.path, **kwargs)
+                if tracer is not None:
+                    span.attributes["status"] = r.status
+                if metrics is not None:
+                    metrics.request_seconds.observe(perf_counter() - request_started_at, (route.endpoint,))
+                    metrics.responses.inc((route.endpoint, r.status))
                 headers = r.headers
+                self.update_bucket_hash(route, headers.get("X-RateLimit-Bucket"), ratelimit_bucket)
+
+                limit = headers.get("X-RateLimit-Limit")
+                if limit is not None:
+                    ratelimit_bucket.update(int(limit), int(headers.get("X-RateLimit-Remaining", 0)),
+                                            float(headers.get("X-RateLimit-Reset-After", 0)))
+                elif 200 <= r.status < 300:
+                    # Errors such as 5xx responses from a proxy don't have the headers even for limited routes
+                    ratelimit_bucket.unlimited = True
 
                 if r.status == 429:
                     data = await r.json()
                     retry_after = data["retry_after"]
-                    if "X-RateLimit-Global" in headers.keys():
+                    is_global = "X-RateLimit-Global" in headers.keys()
+                    if metrics is not None:
+                        metrics.ratelimited.inc((route.endpoint, "global" if is_global else "bucket"))
+                    if tracer is not None:
+                        span.attributes["ratelimited"] = "global" if is_global else "bucket"
+                    if is_global:
                         # Global rate-limited
-                        self.global_lock.set()
                         self.logger.warning(
                             "Global rate-limit reached! Please contact discord support to get this increased. "
                             "Trying again in %s Request attempt %s" % (retry_after, retry_count))
-                        await asyncio.sleep(retry_after)
-                        self.global_lock.clear()
-                        self.logger.debug("Trying request again. Request attempt: %s" % retry_count)
+                        self.set_global_ratelimit(retry_after)
                         continue
                     else:
                         self.logger.info("Ratelimit bucket hit! Bucket: %s. Retrying in %s. Request count %s" % (
                             bucket, retry_after, retry_count))
-                        await asyncio.sleep(retry_after)
-                        self.logger.debug("Trying request again. Request attempt: %s" % retry_count)
+                        ratelimit_bucket.exhaust(retry_after)
                         continue
                 elif r.status == 401:
                     raise Unauthorized(r)
@@ -198,15 +395,18 @@ class HttpClient:
                 elif r.status >= 300:
                     raise HTTPException(r, await r.text())
 
-                # Check if we are just on the limit but not passed it
-                remaining = r.headers.get('X-Ratelimit-Remaining')
-                if remaining == "0":
-                    retry_after = float(headers.get("X-RateLimit-Reset-After", "0"))
-                    self.logger.info("Rate-limit exceeded! Bucket: %s Retry after: %s" % (bucket, retry_after))
-                    lockmanager.defer()
-                    self.loop.call_later(retry_after, ratelimit_lock.release)
+                if ratelimit_bucket.remaining == 0:
+                    self.logger.info("Rate-limit exceeded! Bucket: %s Retry after: %s" % (
+                        bucket, headers.get("X-RateLimit-Reset-After")))
 
                 return r
+            finally:
+                ratelimit_bucket.release()
+                if tracer is not None:
+                    wait_span.finish()
+                    span.finish()
 
     async def close(self):
         await self.session.close()
+        if self.ws_session is not None:
+            await self.ws_session.close()
@@ -1,40 +1,36 @@
-from typing import Optional, Type, Dict, Any
-from types import TracebackType
-from asyncio import AbstractEventLoop, Lock, Event
+from typing import Optional, Dict, Any, Tuple
+from asyncio import AbstractEventLoop, Event, TimerHandle, Task
 from logging import Logger
 
 from aiohttp import ClientWebSocketResponse, ClientResponse, ClientSession
 
+from .ratelimiter import Bucket, BucketStore, TimesPer
+from .cache import ResponseCache
+from .metrics import Metrics
+from .tracing import Tracer
+
 
 class Route:
     method: str
+    template: str
     path: str
     channel_id: Optional[int]
     guild_id: Optional[int]
+    webhook_id: Optional[int]
 
     def __init__(self, method: str, route: str, **parameters: Any):
         ...
 
     @property
-    def bucket(self) -> str:
-        ...
-
-
-class LockManager:
-    lock: Lock
-    unlock: bool
-
-    def __init__(self, lock: Lock):
-        ...
-
-    def __enter__(self) -> 'LockManager':
+    def endpoint(self) -> str:
         ...
 
-    def defer(self):
+    @property
+    def major_parameters(self) -> str:
         ...
 
-    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException],
-                 exc_tb: Optional[TracebackType]):
+    @property
+    def bucket(self) -> str:
         ...
 
 
@@ -43,20 +39,62 @@ class HttpClient:
     token: str
     loop: AbstractEventLoop
     session: ClientSession
+    ws_session: Optional[ClientSession]
     logger: Logger
-    ratelimit_locks: Dict[str, Lock]
+    ratelimit_buckets: BucketStore
+    bucket_hashes: Dict[str, str]
     global_lock: Event
+    global_reset_at: float
+    global_reset_handle: Optional[TimerHandle]
+    global_ratelimiter: Optional[TimesPer]
+    global_wait_time: float
+    global_waits: int
+    coalesce_requests: bool
+    inflight_requests: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Task]
+    coalesced_requests: int
+    cache: Optional[ResponseCache]
+    metrics: Optional[Metrics]
+    tracer: Optional[Tracer]
     default_headers: Dict[str, str]
     retry_attempts: int
 
-    def __init__(self, token: str, *, baseuri: str = None, loop: AbstractEventLoop = None):
+    def __init__(self, token: str, *, baseuri: str = None, loop: AbstractEventLoop = None, max_buckets: int = 10000,
+                 bucket_idle_timeout: float = 300, global_ratelimit: Optional[int] = 50,
+                 coalesce_requests: bool = False, cache: Optional[ResponseCache] = None,
+                 metrics: Optional[Metrics] = None, tracer: Optional[Tracer] = None):
         ...
 
     async def create_ws(self, url: str, *, compression: int) -> ClientWebSocketResponse:
         ...
 
+    def get_bucket(self, route: Route) -> str:
+        ...
+
+    def update_bucket_hash(self, route: Route, bucket_hash: Optional[str], ratelimit_bucket: Bucket):
+        ...
+
+    def set_global_ratelimit(self, retry_after: float):
+        ...
+
+    async def wait_for_global_ratelimit(self):
+        ...
+
     async def request(self, route: Route, **kwargs: Any) -> ClientResponse:
         ...
 
+    async def send_coalesced_request(self, key: Tuple[str, Tuple[Tuple[str, str], ...]], route: Route,
+                                     **kwargs: Any) -> ClientResponse:
+        ...
+
+    async def send_cached_request(self, key: Tuple[str, Tuple[Tuple[str, str], ...]], route: Route,
+                                  **kwargs: Any) -> ClientResponse:
+        ...
+
+    def merge_headers(self, kwargs: Dict[str, Any]):
+        ...
+
+    async def send_request(self, route: Route, **kwargs: Any) -> ClientResponse:
+        ...
+
     async def close(self):
         ...
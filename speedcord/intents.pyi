@@ -0,0 +1,31 @@
+from typing import Dict, Iterable, List
+from enum import IntFlag
+
+
+class Intents(IntFlag):
+    GUILDS: int
+    GUILD_MEMBERS: int
+    GUILD_BANS: int
+    GUILD_EMOJIS: int
+    GUILD_INTEGRATIONS: int
+    GUILD_WEBHOOKS: int
+    GUILD_INVITES: int
+    GUILD_VOICE_STATES: int
+    GUILD_PRESENCES: int
+    GUILD_MESSAGES: int
+    GUILD_MESSAGE_REACTIONS: int
+    GUILD_MESSAGE_TYPING: int
+    DIRECT_MESSAGES: int
+    DIRECT_MESSAGE_REACTIONS: int
+    DIRECT_MESSAGE_TYPING: int
+
+
+EVENT_INTENTS: Dict[str, Intents]
+
+
+def compute_intents(event_names: Iterable[str]) -> Intents:
+    ...
+
+
+def unsatisfiable_events(event_names: Iterable[str], intents: int) -> List[str]:
+    ...
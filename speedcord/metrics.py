@@ -0,0 +1,351 @@
+"""
+Created by Epic at 10/17/26
+
+Counters, gauges and histograms for monitoring a client, exported in the Prometheus text format.
+https://prometheus.io/docs/instrumenting/exposition_formats/
+"""
+from bisect import bisect_left
+from functools import wraps
+from logging import getLogger
+from time import perf_counter
+
+from aiohttp import web
+
+__all__ = ("Counter", "Gauge", "Histogram", "Metrics")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DECODE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01, 0.1)
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra=None):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric:
+    """
+    Base class of all metrics.
+
+    Parameters
+    ----------
+    name: str
+        Name of the metric.
+    description: str
+        What the metric measures.
+    labels: Tuple[str, ...]
+        Names of the labels. Values are passed as a tuple in the same order.
+    function: Optional[Callable[[], Union[float, Dict[Tuple[str, ...], float]]]]
+        Called when the metric is collected instead of keeping values. Returns the value, or a dict of label
+        values and values.
+    """
+    type = "untyped"
+
+    def __init__(self, name, description, labels=(), *, function=None):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.function = function
+        self.values = {}  # label values: value
+
+    def get_values(self):
+        if self.function is None:
+            return self.values
+        values = self.function()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return values
+
+    def collect(self):
+        for label_values, value in self.get_values().items():
+            if value is not None:
+                yield f"{self.name}{format_labels(self.labels, label_values)} {value}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.collect())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """
+    A value that only goes up.
+    """
+    type = "counter"
+
+    def inc(self, label_values=(), amount=1):
+        values = self.values
+        values[label_values] = values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    A value that can go up and down.
+    """
+    type = "gauge"
+
+    def set(self, value, label_values=()):
+        self.values[label_values] = value
+
+
+class Histogram(Metric):
+    """
+    Counts observations in buckets.
+
+    Parameters
+    ----------
+    buckets: Sequence[float]
+        Upper bounds of the buckets.
+    """
+    type = "histogram"
+
+    def __init__(self, name, description, labels=(), *, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, label_values=()):
+        state = self.values.get(label_values)
+        if state is None:
+            # Counts per bucket with the last one being +Inf, and the sum
+            state = self.values[label_values] = [[0] * (len(self.buckets) + 1), 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def collect(self):
+        for label_values, (counts, total) in self.values.items():
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                labels = format_labels(self.labels, label_values, f'le="{upper_bound}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Metrics:
+    """
+    Registry of the metrics of a client. Pass it to :class:`Client` to enable metrics, the client's hot paths only
+    check that metrics are enabled when they aren't.
+
+    Parameters
+    ----------
+    prefix: str
+        Prefix of all metric names.
+    host: str
+        Interface to serve the metrics on.
+    port: Optional[int]
+        Port to serve the metrics on at ``/metrics``. The server is started with the client when this is set.
+    """
+    def __init__(self, *, prefix="speedcord", host="127.0.0.1", port=None):
+        self.prefix = prefix
+        self.host = host
+        self.port = port
+        self.logger = getLogger("speedcord.metrics")
+        self.metrics = {}
+        self.runner = None
+
+        # Gateway
+        self.events_received = self.counter("gateway_events_received_total", "Dispatch events received", ("event",))
+        self.decode_seconds = self.histogram("gateway_decode_seconds", "Time spent inflating and decoding payloads",
+                                             buckets=DECODE_BUCKETS)
+        self.heartbeat_seconds = self.histogram("gateway_heartbeat_rtt_seconds",
+                                                "Time between sending a heartbeat and receiving its ACK")
+
+        # Dispatch
+        self.handler_seconds = self.histogram("handler_seconds", "Time from calling a handler until it finished",
+                                              ("event", "handler"))
+        self.handler_errors = self.counter("handler_errors_total", "Exceptions raised by handlers",
+                                           ("event", "handler"))
+
+        # REST
+        self.request_seconds = self.histogram("http_request_seconds", "Time until Discord responded to a request",
+                                              ("endpoint",))
+        self.ratelimit_wait_seconds = self.histogram("http_ratelimit_wait_seconds",
+                                                     "Time requests waited for their bucket and the global limit",
+                                                     ("endpoint",))
+        self.responses = self.counter("http_responses_total", "Responses by status", ("endpoint", "status"))
+        self.ratelimited = self.counter("http_ratelimited_total", "429 responses", ("endpoint", "scope"))
+
+    def register(self, metric):
+        """
+        Adds a metric to the registry.
+
+        Parameters
+        ----------
+        metric: Metric
+            The metric to add. Its name is prefixed with the registry's prefix.
+
+        Returns
+        -------
+        Metric
+            The metric.
+
+        Raises
+        ------
+        TypeError
+            A metric with the same name already exists.
+        """
+        if self.prefix:
+            metric.name = f"{self.prefix}_{metric.name}"
+        if metric.name in self.metrics:
+            raise TypeError(f"Metric {metric.name} already exists!")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, description, labels=(), *, function=None):
+        return self.register(Counter(name, description, labels, function=function))
+
+    def gauge(self, name, description, labels=(), *, function=None):
+        return self.register(Gauge(name, description, labels, function=function))
+
+    def histogram(self, name, description, labels=(), *, buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, description, labels, buckets=buckets))
+
+    def render(self):
+        """
+        Renders all metrics in the Prometheus text format.
+
+        Returns
+        -------
+        str
+            The metrics.
+        """
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+    def time_handler(self, func, event_name, is_coroutine):
+        """
+        Wraps an event handler to record how long it takes and how often it fails.
+        """
+        label_values = (event_name, getattr(func, "__qualname__", repr(func)))
+        observe = self.handler_seconds.observe
+        count_error = self.handler_errors.inc
+
+        if is_coroutine:
+            @wraps(func)
+            async def timed(*args, **kwargs):
+                started_at = perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    count_error(label_values)
+                    raise
+                finally:
+                    observe(perf_counter() - started_at, label_values)
+        else:
+            @wraps(func)
+            def timed(*args, **kwargs):
+                started_at = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    count_error(label_values)
+                    raise
+                finally:
+                    observe(perf_counter() - started_at, label_values)
+        return timed
+
+    def collect_client(self, client):
+        """
+        Adds metrics read from the client when collected, such as queue depths and cache statistics.
+
+        Parameters
+        ----------
+        client: Client
+            The client to read from.
+        """
+        def shard_sum(attribute):
+            return lambda: sum(getattr(shard, attribute) for shard in client.shards)
+
+        def http_value(attribute):
+            return lambda: getattr(client.http, attribute) if client.http is not None else None
+
+        # Gateway
+        self.gauge("gateway_shards", "Shards that are connected",
+                   function=lambda: sum(shard.connected.is_set() for shard in client.shards))
+        self.gauge("gateway_latency_seconds", "Latest heartbeat round trip time", ("shard",),
+                   function=lambda: {(shard.id,): shard.latency for shard in client.shards})
+        self.counter("gateway_skipped_events_total", "Events skipped without decoding as nothing listens to them",
+                     function=shard_sum("skipped_events"))
+        self.counter("gateway_compressed_bytes_total", "Compressed bytes received",
+                     function=shard_sum("compressed_bytes"))
+        self.counter("gateway_decompressed_bytes_total", "Bytes received after decompressing",
+                     function=shard_sum("decompressed_bytes"))
+        self.gauge("startup_seconds", "Time it took to connect all shards", function=lambda: client.startup_time)
+
+        # Dispatch
+        dispatcher = client.event_dispatcher
+        self.gauge("dispatch_queue_depth", "Events waiting in handler pools", ("event",),
+                   function=lambda: {(event_name,): depth for event_name, depth in dispatcher.queue_depths().items()})
+        self.counter("dispatch_dropped_events_total", "Events dropped by full handler pools", ("event",),
+                     function=lambda: {(event_name,): sum(pool.dropped for pool in pools)
+                                       for event_name, pools in dispatcher.pools.items()})
+        self.gauge("dispatch_ordered_queues", "Keys with events waiting to be handled in order",
+                   function=lambda: len(dispatcher.ordered_queues))
+        self.gauge("dispatch_waiters", "Pending wait_for calls",
+                   function=lambda: sum(len(waiters) for indexes in dispatcher.waiters.values()
+                                        for index in indexes.values() for waiters in index.values()))
+
+        # REST
+        self.gauge("http_ratelimit_buckets", "Rate-limit buckets in memory",
+                   function=lambda: len(client.http.ratelimit_buckets) if client.http is not None else None)
+        self.counter("http_ratelimit_bucket_evictions_total", "Rate-limit buckets evicted",
+                     function=lambda: client.http.ratelimit_buckets.evictions if client.http is not None else None)
+        self.counter("http_global_waits_total", "Requests that waited for the global rate-limit",
+                     function=http_value("global_waits"))
+        self.counter("http_global_wait_seconds_total", "Time spent waiting for the global rate-limit",
+                     function=http_value("global_wait_time"))
+        self.counter("http_coalesced_requests_total", "Requests served by another identical request",
+                     function=http_value("coalesced_requests"))
+
+        # Caches
+        cache = client.response_cache
+        if cache is not None:
+            for statistic in ("hits", "misses", "evictions", "invalidations"):
+                self.counter(f"response_cache_{statistic}_total", f"Response cache {statistic}",
+                             function=lambda statistic=statistic: getattr(cache, statistic))
+            self.gauge("response_cache_size", "Cached responses", function=lambda: len(cache))
+        state = client.state_cache
+        if state is not None:
+            stores = {"guilds": state.guilds, "channels": state.channels, "roles": state.roles,
+                      "members": state.members}
+            self.gauge("state_cache_entities", "Cached entities", ("type",),
+                       function=lambda: {(name,): len(store) for name, store in stores.items() if store is not None})
+
+    async def handle_metrics(self, request):
+        return web.Response(body=self.render().encode("utf-8"),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    async def start_server(self, host=None, port=None):
+        """
+        Serves the metrics at ``/metrics``. Does nothing if the server is already running.
+
+        Parameters
+        ----------
+        host: Optional[str]
+            Interface to listen on. Defaults to the registry's host.
+        port: Optional[int]
+            Port to listen on. Defaults to the registry's port.
+        """
+        if self.runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        host = host or self.host
+        port = port or self.port
+        await web.TCPSite(self.runner, host, port).start()
+        self.logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    async def close(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
@@ -0,0 +1,123 @@
+from typing import Dict, Tuple, Optional, Callable, Union, Sequence, Iterator, Any, List
+from logging import Logger
+
+from aiohttp import web
+
+from .client import Client
+
+LabelValues = Tuple[Any, ...]
+MetricFunction = Callable[[], Union[Optional[float], Dict[LabelValues, Optional[float]]]]
+
+DEFAULT_BUCKETS: Tuple[float, ...]
+DECODE_BUCKETS: Tuple[float, ...]
+
+
+def escape(value: Any) -> str:
+    ...
+
+
+def format_labels(names: Sequence[str], values: LabelValues, extra: Optional[str] = None) -> str:
+    ...
+
+
+class Metric:
+    type: str
+    name: str
+    description: str
+    labels: Tuple[str, ...]
+    function: Optional[MetricFunction]
+    values: Dict[LabelValues, Any]
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (), *,
+                 function: Optional[MetricFunction] = None):
+        ...
+
+    def get_values(self) -> Dict[LabelValues, Any]:
+        ...
+
+    def collect(self) -> Iterator[str]:
+        ...
+
+    def render(self) -> str:
+        ...
+
+
+class Counter(Metric):
+    values: Dict[LabelValues, float]
+
+    def inc(self, label_values: LabelValues = (), amount: float = 1):
+        ...
+
+
+class Gauge(Metric):
+    values: Dict[LabelValues, float]
+
+    def set(self, value: float, label_values: LabelValues = ()):
+        ...
+
+
+class Histogram(Metric):
+    buckets: Tuple[float, ...]
+    values: Dict[LabelValues, List[Any]]
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (), *,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        ...
+
+    def observe(self, value: float, label_values: LabelValues = ()):
+        ...
+
+
+class Metrics:
+    prefix: str
+    host: str
+    port: Optional[int]
+    logger: Logger
+    metrics: Dict[str, Metric]
+    runner: Optional[web.AppRunner]
+
+    events_received: Counter
+    decode_seconds: Histogram
+    heartbeat_seconds: Histogram
+    handler_seconds: Histogram
+    handler_errors: Counter
+    request_seconds: Histogram
+    ratelimit_wait_seconds: Histogram
+    responses: Counter
+    ratelimited: Counter
+
+    def __init__(self, *, prefix: str = "speedcord", host: str = "127.0.0.1", port: Optional[int] = None):
+        ...
+
+    def register(self, metric: Metric) -> Metric:
+        ...
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = (), *,
+                function: Optional[MetricFunction] = None) -> Counter:
+        ...
+
+    def gauge(self, name: str, description: str, labels: Sequence[str] = (), *,
+              function: Optional[MetricFunction] = None) -> Gauge:
+        ...
+
+    def histogram(self, name: str, description: str, labels: Sequence[str] = (), *,
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        ...
+
+    def render(self) -> str:
+        ...
+
+    def time_handler(self, func: Callable[..., Any], event_name: str, is_coroutine: bool) -> Callable[..., Any]:
+        ...
+
+    def collect_client(self, client: Client):
+        ...
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        ...
+
+    async def start_server(self, host: Optional[str] = None, port: Optional[int] = None):
+        ...
+
+    async def close(self):
+        ...
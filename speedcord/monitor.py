@@ -0,0 +1,201 @@
+"""
+Created by Epic at 10/17/26
+
+Measures how late the event loop runs callbacks and finds the handlers blocking it.
+Shards share the loop with handlers, so a handler blocking it delays heartbeats until Discord drops the shards.
+"""
+from asyncio import get_event_loop, sleep
+from collections import deque
+from logging import getLogger
+from sys import _current_frames
+from threading import Thread, Event as ThreadEvent, get_ident
+from time import monotonic, time
+from traceback import format_stack
+
+from .metrics import Histogram
+
+__all__ = ("LoopMonitor", "Stall")
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Stall:
+    """
+    A time the event loop was blocked for longer than the monitor's threshold.
+
+    Parameters
+    ----------
+    lag: float
+        Seconds the loop was late.
+    event_name: Optional[str]
+        The event being handled when the watchdog saw the loop blocked, if a handler was running.
+    handler: Optional[str]
+        The name of the handler.
+    stack: Optional[str]
+        The stack of the loop's thread while it was blocked, if stacks are captured.
+    """
+    __slots__ = ("lag", "event_name", "handler", "stack", "timestamp")
+
+    def __init__(self, lag, event_name=None, handler=None, stack=None):
+        self.lag = lag
+        self.event_name = event_name
+        self.handler = handler
+        self.stack = stack
+        self.timestamp = time()
+
+    def __repr__(self):
+        return f"<Stall lag={self.lag:.3f} event_name={self.event_name!r} handler={self.handler!r}>"
+
+
+class LoopMonitor:
+    """
+    Measures event loop lag by checking how late a sleep wakes up. A watchdog thread looks at the stack of the loop's
+    thread while the loop is blocked to find the handler that is running. Handlers are only looked up in the stack,
+    so dispatching doesn't get slower.
+
+    Parameters
+    ----------
+    interval: float
+        Seconds between lag measurements.
+    threshold: float
+        Lag in seconds reported as a stall.
+    capture_stacks: bool
+        Keep the stack of the loop's thread with stalls.
+    max_stalls: int
+        How many of the latest stalls to keep.
+    metrics: Optional[Metrics]
+        Registry to add the lag histogram and stall counter to.
+    """
+    def __init__(self, *, interval=0.1, threshold=0.25, capture_stacks=False, max_stalls=100, metrics=None):
+        self.interval = interval
+        self.threshold = threshold
+        self.capture_stacks = capture_stacks
+        self.logger = getLogger("speedcord.monitor")
+        self.loop = None
+        self.task = None
+        self.thread = None
+        self.stopped = None
+        self.loop_thread_id = None
+        self.handler_codes = {}  # Code object: (event name, handler name)
+
+        self.last_tick = None  # monotonic() of the last time the loop ran the probe
+        self.sample = None  # (last tick, event name, handler name, stack) seen by the watchdog during a stall
+        self.max_lag = 0
+        self.stalls = deque(maxlen=max_stalls)
+        self.lag = Histogram("event_loop_lag_seconds", "How late the event loop ran the lag probe",
+                             buckets=LAG_BUCKETS)
+        self.stall_count = None
+        if metrics is not None:
+            metrics.register(self.lag)
+            metrics.gauge("event_loop_max_lag_seconds", "Highest event loop lag measured",
+                          function=lambda: self.max_lag)
+            self.stall_count = metrics.counter("event_loop_stalls_total", "Event loop stalls by the running handler",
+                                               ("event", "handler"))
+
+    def add_handler(self, func, event_name):
+        """
+        Makes stalls caused by a handler get attributed to it.
+
+        Parameters
+        ----------
+        func: Callable[..., Any]
+            The handler.
+        event_name: str
+            The event it handles.
+        """
+        # Metrics and tracing wrap handlers, the code that blocks is the innermost function
+        while hasattr(func, "__wrapped__"):
+            func = func.__wrapped__
+        code = getattr(func, "__code__", None)
+        if code is None:
+            # Callable objects
+            code = getattr(getattr(func, "__call__", None), "__code__", None)
+        if code is not None:
+            self.handler_codes[code] = (event_name, getattr(func, "__qualname__", repr(func)))
+
+    def start(self, loop=None):
+        """
+        Starts measuring lag. Has to be called from the thread running the loop.
+
+        Parameters
+        ----------
+        loop: Optional[AbstractEventLoop]
+            The loop to monitor. Defaults to the current loop.
+        """
+        if self.task is not None:
+            return
+        self.loop = loop or get_event_loop()
+        self.loop_thread_id = get_ident()
+        self.last_tick = monotonic()
+        self.stopped = ThreadEvent()
+        self.task = self.loop.create_task(self.probe())
+        self.thread = Thread(target=self.watch, args=(self.stopped,), name="speedcord-loop-monitor", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops measuring lag.
+        """
+        if self.task is None:
+            return
+        self.task.cancel()
+        self.task = None
+        self.stopped.set()
+        self.thread = None
+
+    async def probe(self):
+        interval = self.interval
+        while True:
+            expected = monotonic() + interval
+            await sleep(interval)
+            now = monotonic()
+            previous_tick = self.last_tick
+            self.last_tick = now
+            self.record(max(now - expected, 0), previous_tick)
+
+    def record(self, lag, previous_tick=None):
+        self.lag.observe(lag)
+        if lag > self.max_lag:
+            self.max_lag = lag
+        if lag < self.threshold:
+            return
+        sample = self.sample
+        if sample is not None and sample[0] == previous_tick:
+            _, event_name, handler, stack = sample
+        else:
+            event_name = handler = stack = None
+        stall = Stall(lag, event_name, handler, stack)
+        self.stalls.append(stall)
+        if self.stall_count is not None:
+            self.stall_count.inc((event_name, handler))
+        if handler is not None:
+            self.logger.warning(f"Event loop was blocked for {lag:.3f}s by {handler} handling {event_name}.")
+        else:
+            self.logger.warning(f"Event loop was blocked for {lag:.3f}s.")
+        if stack is not None:
+            self.logger.warning(f"Stack of the blocked event loop:\n{stack}")
+
+    def watch(self, stopped):
+        # Runs in its own thread as nothing on the loop runs while it is blocked
+        while not stopped.wait(self.threshold / 2):
+            last_tick = self.last_tick
+            if self.sample is not None and self.sample[0] == last_tick:
+                # Already sampled this stall
+                continue
+            if monotonic() - last_tick < self.interval + self.threshold:
+                continue
+            frame = _current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            event_name, handler = self.find_handler(frame)
+            stack = "".join(format_stack(frame)) if self.capture_stacks else None
+            self.sample = (last_tick, event_name, handler, stack)
+
+    def find_handler(self, frame):
+        handler_codes = self.handler_codes
+        while frame is not None:
+            handler = handler_codes.get(frame.f_code)
+            if handler is not None:
+                return handler
+            frame = frame.f_back
+        return None, None
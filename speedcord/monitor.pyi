@@ -0,0 +1,66 @@
+from typing import Dict, Tuple, Optional, Callable, Any, Deque
+from asyncio import AbstractEventLoop, Task
+from logging import Logger
+from threading import Thread, Event as ThreadEvent
+from types import CodeType, FrameType
+
+from .metrics import Counter, Histogram, Metrics
+
+LAG_BUCKETS: Tuple[float, ...]
+
+
+class Stall:
+    lag: float
+    event_name: Optional[str]
+    handler: Optional[str]
+    stack: Optional[str]
+    timestamp: float
+
+    def __init__(self, lag: float, event_name: Optional[str] = None, handler: Optional[str] = None,
+                 stack: Optional[str] = None):
+        ...
+
+
+class LoopMonitor:
+    interval: float
+    threshold: float
+    capture_stacks: bool
+    logger: Logger
+    loop: Optional[AbstractEventLoop]
+    task: Optional[Task]
+    thread: Optional[Thread]
+    stopped: Optional[ThreadEvent]
+    loop_thread_id: Optional[int]
+    handler_codes: Dict[CodeType, Tuple[str, str]]
+
+    last_tick: Optional[float]
+    sample: Optional[Tuple[float, Optional[str], Optional[str], Optional[str]]]
+    max_lag: float
+    stalls: Deque[Stall]
+    lag: Histogram
+    stall_count: Optional[Counter]
+
+    def __init__(self, *, interval: float = 0.1, threshold: float = 0.25, capture_stacks: bool = False,
+                 max_stalls: int = 100, metrics: Optional[Metrics] = None):
+        ...
+
+    def add_handler(self, func: Callable[..., Any], event_name: str):
+        ...
+
+    def start(self, loop: Optional[AbstractEventLoop] = None):
+        ...
+
+    def stop(self):
+        ...
+
+    async def probe(self):
+        ...
+
+    def record(self, lag: float, previous_tick: Optional[float] = None):
+        ...
+
+    def watch(self, stopped: ThreadEvent):
+        ...
+
+    def find_handler(self, frame: FrameType) -> Tuple[Optional[str], Optional[str]]:
+        ...
@@ -1,8 +1,9 @@
 """
 Created by Epic at 11/24/20
 """
-from asyncio import Lock, sleep
-from time import time
+from asyncio import Lock, sleep, get_event_loop
+from collections import OrderedDict, deque
+from time import time, monotonic
 from logging import getLogger
 
 logger = getLogger("speedcord.ratelimiter")
@@ -26,5 +27,182 @@ class TimesPer:
                 sleep_for = self.reset - current_time
                 logger.debug(f"Ratelimited! Sleeping for {sleep_for}s")
                 await sleep(self.reset - current_time)
+                self.reset = time() + self.per
                 self.left = self.times
             self.left -= 1
+
+
+class Bucket:
+    def __init__(self):
+        """
+        Tracks the limit, remaining requests and reset of a Discord rate-limit bucket.
+        Up to ``remaining`` requests can run at the same time, the rest wait for the bucket to reset.
+        Until the limits are known only one request is let through at a time.
+        """
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None  # Monotonic time, None when the current window is unknown
+        self.in_flight = 0
+        self.waiting = 0
+        self.release_waiters = deque()
+        self.unlimited = False  # Set when Discord didn't send rate-limit headers for the bucket
+
+    def locked(self):
+        """
+        If the bucket has requests in flight, requests waiting or is waiting for a reset.
+        """
+        if self.in_flight or self.waiting:
+            return True
+        return self.reset_at is not None and self.remaining == 0 and monotonic() < self.reset_at
+
+    async def acquire(self):
+        """
+        Waits until a request can be sent in this bucket.
+        """
+        while not self.unlimited:
+            now = monotonic()
+            if self.limit is None:
+                if self.in_flight == 0:
+                    break
+                await self.wait_for_release()
+                continue
+            if self.reset_at is not None and now >= self.reset_at:
+                # The window has reset, the next response will tell us when the new window resets
+                self.remaining = self.limit
+                self.reset_at = None
+            if self.remaining > 0:
+                self.remaining -= 1
+                break
+            if self.reset_at is None:
+                await self.wait_for_release()
+                continue
+            logger.debug(f"Bucket exhausted! Sleeping for {self.reset_at - now}s")
+            self.waiting += 1
+            try:
+                await sleep(self.reset_at - now)
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+
+    async def wait_for_release(self):
+        future = get_event_loop().create_future()
+        self.release_waiters.append(future)
+        self.waiting += 1
+        try:
+            await future
+        finally:
+            self.waiting -= 1
+
+    def release(self):
+        """
+        Marks a request as finished and wakes up requests waiting for it.
+        """
+        self.in_flight -= 1
+        if self.in_flight == 0 and self.reset_at is None and self.remaining == 0:
+            # The requests of this window failed before sending their headers, let one through to find the window
+            self.remaining = 1
+        while self.release_waiters:
+            future = self.release_waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+
+    def update(self, limit, remaining, reset_after):
+        """
+        Updates the bucket with the rate-limit headers of a response.
+        :param limit: The X-RateLimit-Limit header.
+        :param remaining: The X-RateLimit-Remaining header.
+        :param reset_after: The X-RateLimit-Reset-After header.
+        """
+        self.unlimited = False
+        now = monotonic()
+        if self.reset_at is None or now >= self.reset_at:
+            # New window, requests still in flight might not be counted by Discord yet
+            self.remaining = max(remaining - max(self.in_flight - 1, 0), 0)
+        else:
+            self.remaining = min(self.remaining, remaining)
+        self.limit = limit
+        self.reset_at = now + reset_after
+
+    def exhaust(self, retry_after):
+        """
+        Empties the bucket after hitting a 429.
+        :param retry_after: Seconds until the bucket can be used again.
+        """
+        if self.limit is None:
+            self.limit = 1
+        self.remaining = 0
+        self.reset_at = monotonic() + retry_after
+
+
+class BucketStore:
+    def __init__(self, *, max_size=10000, idle_timeout=300):
+        """
+        Stores rate-limit state per bucket. Buckets that have not been used for ``idle_timeout`` seconds are
+        evicted, and when more than ``max_size`` buckets are stored the least recently used ones are evicted.
+        Buckets are only evicted when they are not locked, so a bucket waiting for its reset is kept.
+        :param max_size: How many buckets to keep at most.
+        :param idle_timeout: Seconds a bucket can be unused before it is evicted.
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.buckets = OrderedDict()  # key: (bucket, last used)
+        self.evictions = 0
+        self.next_sweep = monotonic() + idle_timeout
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def __contains__(self, key):
+        return key in self.buckets
+
+    def get(self, key, default=None):
+        try:
+            bucket, _ = self.buckets[key]
+        except KeyError:
+            return default
+        self.buckets[key] = (bucket, monotonic())
+        self.buckets.move_to_end(key)
+        return bucket
+
+    def __getitem__(self, key):
+        bucket = self.get(key, self)
+        if bucket is self:
+            raise KeyError(key)
+        return bucket
+
+    def __setitem__(self, key, bucket):
+        now = monotonic()
+        self.buckets[key] = (bucket, now)
+        self.buckets.move_to_end(key)
+        if len(self.buckets) > self.max_size or now >= self.next_sweep:
+            self.evict(now)
+
+    def setdefault(self, key, bucket):
+        existing = self.get(key, self)
+        if existing is not self:
+            return existing
+        self[key] = bucket
+        return bucket
+
+    def evict(self, now=None):
+        """
+        Removes expired buckets and the least recently used buckets over the size limit.
+        :param now: The current monotonic time.
+        """
+        if now is None:
+            now = monotonic()
+        self.next_sweep = now + self.idle_timeout
+        expire_before = now - self.idle_timeout
+        evicted = []
+        size = len(self.buckets)
+        # Walk from least to most recently used
+        for key, (bucket, last_used) in self.buckets.items():
+            remaining = size - len(evicted)
+            if remaining <= 1 or (last_used > expire_before and remaining <= self.max_size):
+                break
+            if bucket.locked():
+                continue
+            evicted.append(key)
+        for key in evicted:
+            del self.buckets[key]
+        self.evictions += len(evicted)
@@ -0,0 +1,82 @@
+from typing import Any, Optional, Dict, Tuple, Deque
+from asyncio import Lock, Future
+from logging import Logger
+
+logger: Logger
+
+
+class TimesPer:
+    times: int
+    per: float
+    lock: Lock
+    left: int
+    reset: float
+
+    def __init__(self, times: int, per: float):
+        ...
+
+    async def trigger(self):
+        ...
+
+
+class Bucket:
+    limit: Optional[int]
+    remaining: Optional[int]
+    reset_at: Optional[float]
+    in_flight: int
+    waiting: int
+    release_waiters: Deque[Future]
+    unlimited: bool
+
+    def __init__(self):
+        ...
+
+    def locked(self) -> bool:
+        ...
+
+    async def acquire(self):
+        ...
+
+    async def wait_for_release(self):
+        ...
+
+    def release(self):
+        ...
+
+    def update(self, limit: int, remaining: int, reset_after: float):
+        ...
+
+    def exhaust(self, retry_after: float):
+        ...
+
+
+class BucketStore:
+    max_size: int
+    idle_timeout: float
+    buckets: Dict[str, Tuple[Any, float]]
+    evictions: int
+    next_sweep: float
+
+    def __init__(self, *, max_size: int = 10000, idle_timeout: float = 300):
+        ...
+
+    def __len__(self) -> int:
+        ...
+
+    def __contains__(self, key: str) -> bool:
+        ...
+
+    def get(self, key: str, default: Any = None) -> Any:
+        ...
+
+    def __getitem__(self, key: str) -> Any:
+        ...
+
+    def __setitem__(self, key: str, bucket: Any):
+        ...
+
+    def setdefault(self, key: str, bucket: Any) -> Any:
+        ...
+
+    def evict(self, now: Optional[float] = None):
+        ...
@@ -5,13 +5,24 @@ from .exceptions import GatewayUnavailable, GatewayNotAuthenticated, InvalidToke
     InvalidGatewayVersion, IntentNotWhitelisted, InvalidIntentNumber
 from .http import Route
 from .ratelimiter import TimesPer
+from .tracing import current_span
+from . import etf
 
 from asyncio import Event, AbstractEventLoop, sleep, TimeoutError
 from aiohttp.client_exceptions import ClientConnectorError
 from aiohttp import WSMessage, WSMsgType
-from logging import getLogger
+from logging import getLogger, DEBUG
+from re import compile as compile_regex
 from sys import platform
+from time import perf_counter
 from ujson import loads, dumps
+from urllib.parse import urlencode
+from zlib import decompressobj
+
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+# Discord puts the event name, sequence and opcode before the event data
+DISPATCH_HEADER = compile_regex(r'\{"t":"([A-Z0-9_]+)","s":(\d+|null),"op":0,')
+DISPATCH_HEADER_BYTES = compile_regex(DISPATCH_HEADER.pattern.encode())
 
 
 class DefaultShard:
@@ -31,12 +42,15 @@ class DefaultShard:
         self.ws = None
         self.gateway_url = None
         self.logger = getLogger(f"speedcord.shard.{self.id}")
-        self.connected = Event(loop=self.loop)  # Some bots might wanna know which shards is online at all times
+        self.connected = Event()  # Some bots might wanna know which shards is online at all times
 
         self.received_heartbeat_ack = True
         self.heartbeat_interval = None
         self.heartbeat_count = None
         self.failed_heartbeats = 0
+        self.is_blocked = False  # Not reading while handler queues are full, heartbeat ACKs wait unread
+        self.heartbeat_sent_at = None
+        self.latency = None  # Seconds between the last heartbeat and its ACK
         self.session_id = None
         self.last_event_id = None  # This gets modified by gateway.py
         self.is_closing = False
@@ -45,7 +59,22 @@ class DefaultShard:
 
         self.send_ratelimiter = TimesPer(120, 60)
 
-        self.is_ready = Event(loop=self.loop)
+        # Gateway encoding
+        if self.client.encoding == "etf":
+            self.decoder = etf.loads
+        else:
+            self.decoder = loads
+
+        # Transport compression
+        self.inflator = None
+        self.inflate_buffer = bytearray()
+        self.compressed_bytes = 0
+        self.decompressed_bytes = 0
+
+        # Events skipped before decoding as nothing listens to them
+        self.skipped_events = 0
+
+        self.is_ready = Event()
         self.active = False  # Will only handle core events
 
         # Default events
@@ -54,6 +83,7 @@ class DefaultShard:
         self.client.opcode_dispatcher.register(9, self.handle_invalid_session)
 
         self.client.event_dispatcher.register("READY", self.handle_ready)
+        self.client.event_dispatcher.register("RESUMED", self.handle_resumed)
 
     async def connect(self, gateway_url=None):
         """
@@ -67,8 +97,12 @@ class DefaultShard:
             data = await resp.json()
             gateway_url = data["url"]
         self.gateway_url = gateway_url
+        if self.client.compress == "zlib-stream":
+            # Each connection has its own zlib context
+            self.inflator = decompressobj()
+            self.inflate_buffer = bytearray()
         try:
-            self.ws = await self.client.http.create_ws(gateway_url, compression=0)
+            self.ws = await self.client.http.create_ws(self.format_gateway_url(gateway_url), compression=0)
         except ClientConnectorError:
             await self.client.close()
             raise GatewayUnavailable() from None
@@ -81,6 +115,9 @@ class DefaultShard:
         self.connected.set()
         if not self.is_initial_connect:
             if self.session_id is None:
+                if self.client.identify_coordinator is not None:
+                    await self.coordinated_identify()
+                    return
                 async with self.client.connection_lock:
                     self.client.remaining_connections -= 1
                     if self.client.remaining_connections <= 1:
@@ -95,8 +132,78 @@ class DefaultShard:
                     return
             else:
                 await self.resume()
+                return
+        self.is_initial_connect = False
+        if self.client.identify_coordinator is not None:
+            await self.coordinated_identify()
+            return
         await self.identify()
 
+    def format_gateway_url(self, gateway_url):
+        """
+        Adds the connection options to the gateway url.
+        :param gateway_url: The gateway url without any options.
+        """
+        params = {}
+        if self.client.encoding != "json":
+            params["encoding"] = self.client.encoding
+        if self.client.compress is not None:
+            params["compress"] = self.client.compress
+        if not params:
+            return gateway_url
+        return gateway_url + ("&" if "?" in gateway_url else "?") + urlencode(params)
+
+    @property
+    def compression_ratio(self):
+        """
+        How many times smaller the received data was compared to the decompressed payloads.
+        None if compression is disabled or nothing has been received yet.
+        """
+        if self.compressed_bytes == 0:
+            return None
+        return self.decompressed_bytes / self.compressed_bytes
+
+    def inflate(self, data):
+        """
+        Feeds a binary frame into the zlib stream.
+        :param data: The compressed frame.
+        :return: The decompressed payload, or None if the payload is split over multiple frames.
+        """
+        self.compressed_bytes += len(data)
+        self.inflate_buffer.extend(data)
+        # The suffix can be split over frames too
+        if self.inflate_buffer[-4:] != ZLIB_SUFFIX:
+            return None
+        payload = self.inflator.decompress(self.inflate_buffer)
+        self.inflate_buffer = bytearray()
+        self.decompressed_bytes += len(payload)
+        return payload
+
+    def skip_payload(self, payload):
+        """
+        Checks the start of a JSON payload and skips dispatches nobody listens to without decoding them.
+        :param payload: The raw JSON payload.
+        :return: True if the payload was skipped.
+        """
+        if isinstance(payload, str):
+            match = DISPATCH_HEADER.match(payload)
+        else:
+            match = DISPATCH_HEADER_BYTES.match(payload)
+        if match is None:
+            return False
+        event_name, sequence = match.groups()
+        if not isinstance(event_name, str):
+            event_name = event_name.decode()
+        if self.active:
+            if self.client.is_listening(event_name):
+                return False
+        elif hasattr(self, "handle_" + event_name.lower()):
+            return False
+        if sequence not in ("null", b"null"):
+            self.last_event_id = int(sequence)
+        self.skipped_events += 1
+        return True
+
     async def close(self):
         if self.ws is not None and not self.ws.closed:
             self.is_closing = True
@@ -110,21 +217,65 @@ class DefaultShard:
         Receives data from a gateway and sends it to a handler.
         """
         message: WSMessage  # Fix typehinting
+        metrics = self.client.metrics
+        tracer = self.client.tracer
         async for message in self.ws:
+            if metrics is not None or tracer is not None:
+                decode_started_at = perf_counter()
             if message.type == WSMsgType.TEXT:
-                data = message.json(loads=loads)
-                if "s" in data.keys() and data["s"] is not None:
-                    self.last_event_id = data["s"]
-                self.logger.debug(f"Data received ({('inactive', 'active')[self.active]} mode): " + str(data))
-                if self.active:
-                    self.client.opcode_dispatcher.dispatch(data["op"], data, self)
-                else:
-                    self.loop.create_task(self.handle_dispatch(data))
+                if self.skip_payload(message.data):
+                    continue
+                data = loads(message.data)
+            elif message.type == WSMsgType.BINARY:
+                payload = message.data
+                if self.inflator is not None:
+                    payload = self.inflate(payload)
+                    if payload is None:
+                        # Waiting for the rest of the payload
+                        continue
+                if self.decoder is loads and self.skip_payload(payload):
+                    continue
+                data = self.decoder(payload)
             elif message.type in [WSMsgType.CLOSE, WSMsgType.CLOSING, WSMsgType.CLOSED]:
                 self.logger.warning(
                     f"WebSocket is closing! Details: {message.json()}. Close code: {self.ws.close_code}")
+                continue
             else:
                 self.logger.warning("Unknown message type: " + str(type(message)))
+                continue
+            if metrics is not None:
+                metrics.decode_seconds.observe(perf_counter() - decode_started_at)
+                if data["op"] == 0:
+                    metrics.events_received.inc((data["t"],))
+            if "s" in data.keys() and data["s"] is not None:
+                self.last_event_id = data["s"]
+            if self.logger.isEnabledFor(DEBUG):
+                self.logger.debug(f"Data received ({('inactive', 'active')[self.active]} mode): {data}")
+            if tracer is not None and data["op"] == 0:
+                # Tasks created while dispatching inherit the span as their parent
+                span = tracer.start_span("gateway.event", {"event": data["t"], "shard": self.id, "sequence": data["s"],
+                                                           "decode": perf_counter() - decode_started_at},
+                                         started_at=decode_started_at)
+                token = current_span.set(span)
+            else:
+                span = None
+            if self.active:
+                self.client.opcode_dispatcher.dispatch(data["op"], data, self)
+                if span is not None:
+                    current_span.reset(token)
+                    span.finish()
+                if self.client.event_dispatcher.full_pools:
+                    # Backpressure from handler queues using the block overflow policy
+                    self.is_blocked = True
+                    try:
+                        await self.client.event_dispatcher.wait_for_capacity()
+                    finally:
+                        self.is_blocked = False
+            else:
+                self.loop.create_task(self.handle_dispatch(data))
+                if span is not None:
+                    current_span.reset(token)
+                    span.finish()
         await self.on_disconnect(self.ws.close_code)
 
     async def send(self, data: dict):
@@ -133,8 +284,12 @@ class DefaultShard:
         """
         self.logger.debug("Sending data...")
         await self.send_ratelimiter.trigger()
-        self.logger.debug("Data sent: " + str(data))
-        await self.ws.send_json(data, dumps=dumps)
+        if self.logger.isEnabledFor(DEBUG):
+            self.logger.debug(f"Data sent: {data}")
+        if self.client.encoding == "etf":
+            await self.ws.send_bytes(etf.dumps(data))
+        else:
+            await self.ws.send_json(data, dumps=dumps)
 
     async def rescale_shards(self):
         if self.client.shard_ids is not None:
@@ -167,7 +322,8 @@ class DefaultShard:
             4014: ("FATAL", IntentNotWhitelisted, False, False),
             None: ("WARN", f"Unknown close code received. Close code: {close_code}. ", True, True)
         }
-        if self.is_closing:
+        if self.is_closing or self.client.exit_event.is_set():
+            # Closed by us or the client is shutting down
             return
 
         handler = handlers.get(close_code, handlers[None])
@@ -220,6 +376,18 @@ class DefaultShard:
             }
         })
 
+    async def coordinated_identify(self):
+        """
+        Identifies once the identify coordinator of the client hands out a slot. Other processes of the cluster share
+        the identify limits. The slot is released once the IDENTIFY is sent.
+        """
+        coordinator = self.client.identify_coordinator
+        self.client.remaining_connections = await coordinator.acquire(self.id)
+        try:
+            await self.identify()
+        finally:
+            await coordinator.release(self.id)
+
     async def resume(self):
         """
         Sends a resume message to the gateway, which resumes any events stopped in
@@ -240,10 +408,15 @@ class DefaultShard:
         Sends a heartbeat_loop message to the gateway - used to keep the connection alive.
         https://discord.com/developers/docs/topics/gateway#heartbeat
         """
+        ws = self.ws
         await self.is_ready.wait()
         sess_id = self.session_id
-        while self.connected.is_set() and self.session_id == sess_id:
-            if not self.received_heartbeat_ack:
+        # Resumed sessions keep their ID, the loop started by the new connection's HELLO takes over
+        while self.connected.is_set() and self.session_id == sess_id and self.ws is ws:
+            if self.is_blocked:
+                # The ACK can't be read until the handler queues have room, that doesn't make the connection a zombie
+                self.failed_heartbeats = 0
+            elif not self.received_heartbeat_ack:
                 self.failed_heartbeats += 1
                 self.logger.info(
                     "WebSocket did not respond to a heartbeat! Failed attempts: " + str(self.failed_heartbeats))
@@ -253,6 +426,7 @@ class DefaultShard:
                     await self.connect()  # Don't cache gateway url here as the server is shutting down.
                     return
             self.received_heartbeat_ack = False
+            self.heartbeat_sent_at = perf_counter()
             await self.send({
                 "op": 1,
                 "d": self.heartbeat_count
@@ -295,6 +469,10 @@ class DefaultShard:
             return
         self.received_heartbeat_ack = True
         self.failed_heartbeats = 0
+        if self.heartbeat_sent_at is not None:
+            self.latency = perf_counter() - self.heartbeat_sent_at
+            if self.client.metrics is not None:
+                self.client.metrics.heartbeat_seconds.observe(self.latency)
         self.logger.debug("Received heartbeat successfully!")
 
     async def handle_ready(self, data, shard):
@@ -303,6 +481,11 @@ class DefaultShard:
         self.session_id = data["session_id"]
         self.is_ready.set()
 
+    async def handle_resumed(self, data, shard):
+        if shard.id != self.id:
+            return
+        self.is_ready.set()
+
     async def handle_invalid_session(self, data, shard):
         if shard.id != self.id:
             return
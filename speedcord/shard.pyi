@@ -1,6 +1,6 @@
 from .ratelimiter import TimesPer
 
-from typing import Optional
+from typing import Optional, Any, Callable, Union
 from speedcord import Client
 from asyncio import AbstractEventLoop, Lock, Event
 from logging import Logger
@@ -21,6 +21,9 @@ class DefaultShard:
     heartbeat_interval: Optional[int]
     heartbeat_count: Optional[int]
     failed_heartbeats: int
+    is_blocked: bool
+    heartbeat_sent_at: Optional[float]
+    latency: Optional[float]
     session_id: Optional[str]
     last_event_id: Optional[int]
     is_closing: bool
@@ -29,6 +32,15 @@ class DefaultShard:
 
     send_ratelimiter: TimesPer
 
+    decoder: Callable[[Union[bytes, str]], Any]
+
+    inflator: Optional[Any]
+    inflate_buffer: bytearray
+    compressed_bytes: int
+    decompressed_bytes: int
+
+    skipped_events: int
+
     is_ready: Event
 
     def __init__(self, shard_id: int, client: Client, loop: AbstractEventLoop):
@@ -37,6 +49,19 @@ class DefaultShard:
     async def connect(self, gateway_url: Optional[str] = ...):
         ...
 
+    def format_gateway_url(self, gateway_url: str) -> str:
+        ...
+
+    @property
+    def compression_ratio(self) -> Optional[float]:
+        ...
+
+    def inflate(self, data: bytes) -> Optional[bytes]:
+        ...
+
+    def skip_payload(self, payload: Union[str, bytes]) -> bool:
+        ...
+
     async def close(self):
         ...
 
@@ -55,6 +80,9 @@ class DefaultShard:
     async def identify(self):
         ...
 
+    async def coordinated_identify(self):
+        ...
+
     async def resume(self):
         ...
 
@@ -73,5 +101,8 @@ class DefaultShard:
     async def handle_ready(self, data: dict, shard: 'DefaultShard'):
         ...
 
+    async def handle_resumed(self, data: dict, shard: 'DefaultShard'):
+        ...
+
     async def handle_invalid_session(self, data: dict, shard: 'DefaultShard'):
         ...
@@ -0,0 +1,369 @@
+"""
+Created by Epic at 10/17/26
+
+Optional cache of guilds, channels, roles and members built from gateway events.
+"""
+from collections import OrderedDict
+
+__all__ = ("StateCache", "Guild", "Channel", "Role", "Member")
+
+
+def snowflake(value):
+    return int(value) if value is not None else None
+
+
+class Guild:
+    __slots__ = ("id", "name", "icon", "owner_id", "member_count", "unavailable")
+
+    def __init__(self, data):
+        self.id = int(data["id"])
+        self.member_count = None
+        self.update(data)
+
+    def update(self, data):
+        self.name = data.get("name")
+        self.icon = data.get("icon")
+        self.owner_id = snowflake(data.get("owner_id"))
+        self.member_count = data.get("member_count", self.member_count)
+        self.unavailable = data.get("unavailable", False)
+
+
+class Channel:
+    __slots__ = ("id", "guild_id", "type", "name", "position", "parent_id", "topic", "nsfw")
+
+    def __init__(self, data, guild_id=None):
+        self.id = int(data["id"])
+        self.guild_id = snowflake(data.get("guild_id", guild_id))
+        self.update(data)
+
+    def update(self, data):
+        self.type = data.get("type")
+        self.name = data.get("name")
+        self.position = data.get("position")
+        self.parent_id = snowflake(data.get("parent_id"))
+        self.topic = data.get("topic")
+        self.nsfw = data.get("nsfw", False)
+
+
+class Role:
+    __slots__ = ("id", "guild_id", "name", "color", "position", "permissions", "hoist", "managed", "mentionable")
+
+    def __init__(self, data, guild_id):
+        self.id = int(data["id"])
+        self.guild_id = int(guild_id)
+        self.update(data)
+
+    def update(self, data):
+        self.name = data.get("name")
+        self.color = data.get("color")
+        self.position = data.get("position")
+        self.permissions = int(data.get("permissions", 0))
+        self.hoist = data.get("hoist", False)
+        self.managed = data.get("managed", False)
+        self.mentionable = data.get("mentionable", False)
+
+
+class Member:
+    __slots__ = ("guild_id", "user_id", "username", "discriminator", "avatar", "bot", "nick", "roles",
+                 "joined_at")
+
+    def __init__(self, data, guild_id):
+        self.guild_id = int(guild_id)
+        self.user_id = int(data["user"]["id"])
+        self.update(data)
+
+    def update(self, data):
+        user = data["user"]
+        self.username = user.get("username")
+        self.discriminator = user.get("discriminator")
+        self.avatar = user.get("avatar")
+        self.bot = user.get("bot", False)
+        self.nick = data.get("nick")
+        self.roles = tuple(int(role_id) for role_id in data.get("roles", ()))
+        self.joined_at = data.get("joined_at")
+
+
+class EntityStore:
+    def __init__(self, max_size=None):
+        """
+        Stores cached entities by ID.
+        :param max_size: How many entities to keep before evicting the least recently used ones.
+            None to keep all entities.
+        """
+        self.max_size = max_size
+        self.entities = OrderedDict() if max_size is not None else {}
+        self.guild_index = {}
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __iter__(self):
+        return iter(list(self.entities.values()))
+
+    def get(self, key):
+        entity = self.entities.get(key)
+        if entity is not None and self.max_size is not None:
+            self.entities.move_to_end(key)
+        return entity
+
+    def add(self, key, entity):
+        old_entity = self.entities.get(key)
+        if old_entity is not None:
+            self.unindex(key, old_entity)
+        self.entities[key] = entity
+        self.index(key, entity)
+        if self.max_size is not None:
+            self.entities.move_to_end(key)
+            while len(self.entities) > self.max_size:
+                evicted_key, evicted_entity = self.entities.popitem(last=False)
+                self.unindex(evicted_key, evicted_entity)
+                self.evictions += 1
+
+    def remove(self, key):
+        entity = self.entities.pop(key, None)
+        if entity is not None:
+            self.unindex(key, entity)
+        return entity
+
+    def remove_guild(self, guild_id):
+        for key in self.guild_index.pop(guild_id, ()):
+            self.entities.pop(key, None)
+
+    def index(self, key, entity):
+        guild_id = getattr(entity, "guild_id", None)
+        if guild_id is not None:
+            self.guild_index.setdefault(guild_id, set()).add(key)
+
+    def unindex(self, key, entity):
+        guild_id = getattr(entity, "guild_id", None)
+        keys = self.guild_index.get(guild_id)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self.guild_index[guild_id]
+
+
+def create_store(option):
+    if option is False or option is None:
+        return None
+    if option is True:
+        return EntityStore()
+    return EntityStore(int(option))
+
+
+class StateCache:
+    """
+    Caches guilds, channels, roles and members from gateway events in compact records with integer snowflakes.
+    Each entity type can be turned off (``False``), bounded to a number of least recently used entities (an
+    ``int``) or kept in full (``True``).
+
+    Parameters
+    ----------
+    guilds: Union[bool, int]
+        How to cache guilds.
+    channels: Union[bool, int]
+        How to cache channels.
+    roles: Union[bool, int]
+        How to cache roles.
+    members: Union[bool, int]
+        How to cache members. Members are only sent for large guilds if the ``GUILD_MEMBERS`` intent is enabled.
+    """
+    def __init__(self, *, guilds=True, channels=True, roles=True, members=False):
+        self.guilds = create_store(guilds)
+        self.channels = create_store(channels)
+        self.roles = create_store(roles)
+        self.members = create_store(members)
+
+    def register(self, event_dispatcher):
+        """
+        Listens to the events needed to keep the enabled entity types up to date. The handlers are plain functions,
+        so the cache is updated inline before the listeners registered after it run.
+
+        Parameters
+        ----------
+        event_dispatcher: EventDispatcher
+            The dispatcher of the client.
+        """
+        if all(store is None for store in (self.guilds, self.channels, self.roles, self.members)):
+            return
+        handlers = {"GUILD_CREATE": self.handle_guild_create, "GUILD_DELETE": self.handle_guild_delete}
+        if self.guilds is not None:
+            handlers["GUILD_UPDATE"] = self.handle_guild_update
+        if self.channels is not None:
+            handlers["CHANNEL_CREATE"] = self.handle_channel_update
+            handlers["CHANNEL_UPDATE"] = self.handle_channel_update
+            handlers["CHANNEL_DELETE"] = self.handle_channel_delete
+        if self.roles is not None:
+            handlers["GUILD_UPDATE"] = self.handle_guild_update
+            handlers["GUILD_ROLE_CREATE"] = self.handle_role_update
+            handlers["GUILD_ROLE_UPDATE"] = self.handle_role_update
+            handlers["GUILD_ROLE_DELETE"] = self.handle_role_delete
+        if self.members is not None:
+            handlers["GUILD_MEMBER_ADD"] = self.handle_member_update
+            handlers["GUILD_MEMBER_UPDATE"] = self.handle_member_update
+            handlers["GUILD_MEMBER_REMOVE"] = self.handle_member_remove
+            handlers["GUILD_MEMBERS_CHUNK"] = self.handle_members_chunk
+        for event_name, handler in handlers.items():
+            event_dispatcher.register(event_name, handler)
+
+    # Lookups
+    def get_guild(self, guild_id):
+        """
+        Gets a cached guild.
+
+        Parameters
+        ----------
+        guild_id: Union[int, str]
+            The ID of the guild.
+
+        Returns
+        -------
+        Optional[Guild]
+            The guild, or None if it isn't cached.
+        """
+        if self.guilds is None:
+            return None
+        return self.guilds.get(int(guild_id))
+
+    def get_channel(self, channel_id):
+        """
+        Gets a cached channel.
+
+        Parameters
+        ----------
+        channel_id: Union[int, str]
+            The ID of the channel.
+
+        Returns
+        -------
+        Optional[Channel]
+            The channel, or None if it isn't cached.
+        """
+        if self.channels is None:
+            return None
+        return self.channels.get(int(channel_id))
+
+    def get_role(self, role_id):
+        """
+        Gets a cached role.
+
+        Parameters
+        ----------
+        role_id: Union[int, str]
+            The ID of the role.
+
+        Returns
+        -------
+        Optional[Role]
+            The role, or None if it isn't cached.
+        """
+        if self.roles is None:
+            return None
+        return self.roles.get(int(role_id))
+
+    def get_member(self, guild_id, user_id):
+        """
+        Gets a cached member.
+
+        Parameters
+        ----------
+        guild_id: Union[int, str]
+            The ID of the guild.
+        user_id: Union[int, str]
+            The ID of the user.
+
+        Returns
+        -------
+        Optional[Member]
+            The member, or None if it isn't cached.
+        """
+        if self.members is None:
+            return None
+        return self.members.get((int(guild_id), int(user_id)))
+
+    # Event handlers
+    def handle_guild_create(self, data, shard):
+        guild_id = int(data["id"])
+        if self.guilds is not None:
+            self.guilds.add(guild_id, Guild(data))
+        if self.channels is not None:
+            for channel_data in data.get("channels", ()):
+                self.channels.add(int(channel_data["id"]), Channel(channel_data, guild_id))
+        if self.roles is not None:
+            for role_data in data.get("roles", ()):
+                self.roles.add(int(role_data["id"]), Role(role_data, guild_id))
+        if self.members is not None:
+            for member_data in data.get("members", ()):
+                member = Member(member_data, guild_id)
+                self.members.add((guild_id, member.user_id), member)
+
+    def handle_guild_update(self, data, shard):
+        guild_id = int(data["id"])
+        if self.guilds is not None:
+            guild = self.guilds.get(guild_id)
+            if guild is None:
+                self.guilds.add(guild_id, Guild(data))
+            else:
+                guild.update(data)
+        if self.roles is not None and "roles" in data:
+            self.roles.remove_guild(guild_id)
+            for role_data in data["roles"]:
+                self.roles.add(int(role_data["id"]), Role(role_data, guild_id))
+
+    def handle_guild_delete(self, data, shard):
+        guild_id = int(data["id"])
+        if data.get("unavailable"):
+            # Outage, the guild will be sent again once it is available
+            guild = self.get_guild(guild_id)
+            if guild is not None:
+                guild.unavailable = True
+            return
+        for store in (self.guilds, self.channels, self.roles, self.members):
+            if store is None:
+                continue
+            if store is self.guilds:
+                store.remove(guild_id)
+            else:
+                store.remove_guild(guild_id)
+
+    def handle_channel_update(self, data, shard):
+        channel_id = int(data["id"])
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            self.channels.add(channel_id, Channel(data))
+        else:
+            channel.update(data)
+
+    def handle_channel_delete(self, data, shard):
+        self.channels.remove(int(data["id"]))
+
+    def handle_role_update(self, data, shard):
+        role_data = data["role"]
+        role_id = int(role_data["id"])
+        role = self.roles.get(role_id)
+        if role is None:
+            self.roles.add(role_id, Role(role_data, data["guild_id"]))
+        else:
+            role.update(role_data)
+
+    def handle_role_delete(self, data, shard):
+        self.roles.remove(int(data["role_id"]))
+
+    def handle_member_update(self, data, shard):
+        key = (int(data["guild_id"]), int(data["user"]["id"]))
+        member = self.members.get(key)
+        if member is None:
+            self.members.add(key, Member(data, data["guild_id"]))
+        else:
+            member.update(data)
+
+    def handle_member_remove(self, data, shard):
+        self.members.remove((int(data["guild_id"]), int(data["user"]["id"])))
+
+    def handle_members_chunk(self, data, shard):
+        guild_id = int(data["guild_id"])
+        for member_data in data.get("members", ()):
+            member = Member(member_data, guild_id)
+            self.members.add((guild_id, member.user_id), member)
@@ -0,0 +1,170 @@
+from typing import Optional, Union, Dict, Any, Tuple, Hashable, Iterator, Set
+
+from .dispatcher import EventDispatcher
+from .shard import DefaultShard
+
+
+def snowflake(value: Optional[Union[int, str]]) -> Optional[int]:
+    ...
+
+
+class Guild:
+    id: int
+    name: Optional[str]
+    icon: Optional[str]
+    owner_id: Optional[int]
+    member_count: Optional[int]
+    unavailable: bool
+
+    def __init__(self, data: Dict[str, Any]):
+        ...
+
+    def update(self, data: Dict[str, Any]):
+        ...
+
+
+class Channel:
+    id: int
+    guild_id: Optional[int]
+    type: int
+    name: Optional[str]
+    position: Optional[int]
+    parent_id: Optional[int]
+    topic: Optional[str]
+    nsfw: bool
+
+    def __init__(self, data: Dict[str, Any], guild_id: Optional[Union[int, str]] = None):
+        ...
+
+    def update(self, data: Dict[str, Any]):
+        ...
+
+
+class Role:
+    id: int
+    guild_id: int
+    name: str
+    color: int
+    position: int
+    permissions: int
+    hoist: bool
+    managed: bool
+    mentionable: bool
+
+    def __init__(self, data: Dict[str, Any], guild_id: Union[int, str]):
+        ...
+
+    def update(self, data: Dict[str, Any]):
+        ...
+
+
+class Member:
+    guild_id: int
+    user_id: int
+    username: str
+    discriminator: str
+    avatar: Optional[str]
+    bot: bool
+    nick: Optional[str]
+    roles: Tuple[int, ...]
+    joined_at: str
+
+    def __init__(self, data: Dict[str, Any], guild_id: Union[int, str]):
+        ...
+
+    def update(self, data: Dict[str, Any]):
+        ...
+
+
+class EntityStore:
+    max_size: Optional[int]
+    entities: Dict[Hashable, Any]
+    guild_index: Dict[int, Set[Hashable]]
+    evictions: int
+
+    def __init__(self, max_size: Optional[int] = None):
+        ...
+
+    def __len__(self) -> int:
+        ...
+
+    def __iter__(self) -> Iterator[Any]:
+        ...
+
+    def get(self, key: Hashable) -> Any:
+        ...
+
+    def add(self, key: Hashable, entity: Any):
+        ...
+
+    def remove(self, key: Hashable) -> Any:
+        ...
+
+    def remove_guild(self, guild_id: int):
+        ...
+
+    def index(self, key: Hashable, entity: Any):
+        ...
+
+    def unindex(self, key: Hashable, entity: Any):
+        ...
+
+
+def create_store(option: Union[bool, int, None]) -> Optional[EntityStore]:
+    ...
+
+
+class StateCache:
+    guilds: Optional[EntityStore]
+    channels: Optional[EntityStore]
+    roles: Optional[EntityStore]
+    members: Optional[EntityStore]
+
+    def __init__(self, *, guilds: Union[bool, int] = True, channels: Union[bool, int] = True,
+                 roles: Union[bool, int] = True, members: Union[bool, int] = False):
+        ...
+
+    def register(self, event_dispatcher: EventDispatcher):
+        ...
+
+    def get_guild(self, guild_id: Union[int, str]) -> Optional[Guild]:
+        ...
+
+    def get_channel(self, channel_id: Union[int, str]) -> Optional[Channel]:
+        ...
+
+    def get_role(self, role_id: Union[int, str]) -> Optional[Role]:
+        ...
+
+    def get_member(self, guild_id: Union[int, str], user_id: Union[int, str]) -> Optional[Member]:
+        ...
+
+    def handle_guild_create(self, data: Dict[str, Any], shard: DefaultShard):
+        ...
+
+    def handle_guild_update(self, data: Dict[str, Any], shard: DefaultShard):
+        ...
+
+    def handle_guild_delete(self, data: Dict[str, Any], shard: DefaultShard):
+        ...
+
+    def handle_channel_update(self, data: Dict[str, Any], shard: DefaultShard):
+        ...
+
+    def handle_channel_delete(self, data: Dict[str, Any], shard: DefaultShard):
+        ...
+
+    def handle_role_update(self, data: Dict[str, Any], shard: DefaultShard):
+        ...
+
+    def handle_role_delete(self, data: Dict[str, Any], shard: DefaultShard):
+        ...
+
+    def handle_member_update(self, data: Dict[str, Any], shard: DefaultShard):
+        ...
+
+    def handle_member_remove(self, data: Dict[str, Any], shard: DefaultShard):
+        ...
+
+    def handle_members_chunk(self, data: Dict[str, Any], shard: DefaultShard):
+        ...
@@ -0,0 +1,454 @@
+"""
+Created by Epic at 10/17/26
+
+An in-process fake of the Discord gateway and REST API for tests and load tests.
+Point a client at it with ``Client(..., baseuri=fake.baseuri)``, the gateway url is sent by ``/gateway/bot``.
+"""
+from asyncio import Lock, sleep, get_running_loop
+from hashlib import md5
+from itertools import count
+from logging import getLogger
+from time import monotonic, time
+from uuid import uuid4
+from zlib import compressobj, Z_SYNC_FLUSH
+
+from aiohttp import web, WSMsgType
+from ujson import dumps, loads
+
+from . import etf
+
+__all__ = ("FakeDiscord", "GatewayConnection", "message_create")
+
+# Parameters Discord splits rate-limit buckets by
+MAJOR_PARAMETERS = ("channels", "guilds", "webhooks")
+
+
+def message_create(shard_id, sequence):
+    """
+    The default event sent by :class:`FakeDiscord`.
+
+    Parameters
+    ----------
+    shard_id: int
+        The shard the event is sent to.
+    sequence: int
+        The sequence number of the event.
+
+    Returns
+    -------
+    Tuple[str, Dict[str, Any]]
+        The event name and data.
+    """
+    return "MESSAGE_CREATE", {
+        "id": str(800000000000000000 + sequence),
+        "type": 0,
+        "channel_id": str(700000000000000000 + shard_id),
+        "guild_id": str(600000000000000000 + shard_id),
+        "author": {"id": "500000000000000000", "username": "speedcord-user", "discriminator": "1337",
+                   "avatar": None, "bot": False},
+        "content": "!test hello world",
+        "timestamp": "2020-09-01T12:00:00.000000+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False
+    }
+
+
+def get_endpoint(method, path):
+    """
+    Works out the rate-limit bucket of a request like Discord does: per endpoint and major parameters.
+
+    Returns
+    -------
+    Tuple[str, Tuple[str, ...]]
+        The endpoint with IDs replaced and the values of the major parameters.
+    """
+    segments = path.strip("/").split("/")
+    major_parameters = []
+    for index, segment in enumerate(segments):
+        if not segment.isdigit():
+            continue
+        if index > 0 and segments[index - 1] in MAJOR_PARAMETERS:
+            major_parameters.append(segment)
+        segments[index] = "{id}"
+    return f"{method} /{'/'.join(segments)}", tuple(major_parameters)
+
+
+class GatewayConnection:
+    """
+    A shard connected to the fake gateway.
+
+    Parameters
+    ----------
+    server: FakeDiscord
+        The server the shard is connected to.
+    ws: aiohttp.web.WebSocketResponse
+        The websocket of the shard.
+    encoding: str
+        ``"json"`` or ``"etf"``.
+    compress: Optional[str]
+        ``"zlib-stream"`` to compress everything sent to the shard.
+    """
+    def __init__(self, server, ws, encoding="json", compress=None):
+        self.server = server
+        self.ws = ws
+        self.encoding = encoding
+        self.compressor = compressobj() if compress == "zlib-stream" else None
+        self.send_lock = Lock()  # Keeps compressed frames in order
+        self.session = None
+        self.shard_id = None
+        self.replay_task = None
+
+    async def send(self, payload):
+        if self.encoding == "etf":
+            data = etf.dumps(payload)
+        else:
+            data = dumps(payload)
+        async with self.send_lock:
+            if self.ws.closed:
+                return
+            if self.compressor is not None:
+                if isinstance(data, str):
+                    data = data.encode()
+                await self.ws.send_bytes(self.compressor.compress(data) + self.compressor.flush(Z_SYNC_FLUSH))
+            elif isinstance(data, str):
+                await self.ws.send_str(data)
+            else:
+                await self.ws.send_bytes(data)
+
+    async def dispatch(self, event_name, data):
+        """
+        Sends an event to the shard.
+
+        Parameters
+        ----------
+        event_name: str
+            The name of the event.
+        data: Any
+            The data of the event.
+        """
+        self.session["sequence"] += 1
+        self.server.events_sent += 1
+        await self.send({"op": 0, "t": event_name, "s": self.session["sequence"], "d": data})
+
+    async def run(self):
+        await self.send({"op": 10, "d": {"heartbeat_interval": self.server.heartbeat_interval}})
+        try:
+            async for message in self.ws:
+                if message.type == WSMsgType.TEXT:
+                    payload = loads(message.data)
+                elif message.type == WSMsgType.BINARY:
+                    payload = etf.loads(message.data)
+                else:
+                    break
+                await self.handle(payload)
+        finally:
+            if self.replay_task is not None:
+                self.replay_task.cancel()
+
+    async def handle(self, payload):
+        opcode = payload.get("op")
+        if opcode == 1:
+            self.server.heartbeats += 1
+            await self.send({"op": 11})
+        elif opcode == 2:
+            await self.handle_identify(payload["d"])
+        elif opcode == 6:
+            await self.handle_resume(payload["d"])
+
+    async def handle_identify(self, data):
+        server = self.server
+        if server.token is not None and data.get("token") != server.token:
+            await self.ws.close(code=4004, message=b"Authentication failed.")
+            return
+        if self.session is not None:
+            await self.ws.close(code=4005, message=b"Already authenticated.")
+            return
+        shard_id, shard_count = data.get("shard") or (0, 1)
+        server.identifies += 1
+        self.shard_id = shard_id
+        session_id = uuid4().hex
+        self.session = server.sessions[session_id] = {"shard": [shard_id, shard_count], "sequence": 0}
+        await self.dispatch("READY", {
+            "v": 8,
+            "user": server.user,
+            "guilds": [],
+            "session_id": session_id,
+            "shard": [shard_id, shard_count],
+            "application": {"id": server.user["id"], "flags": 0}
+        })
+        self.start_replay()
+
+    async def handle_resume(self, data):
+        server = self.server
+        session = server.sessions.get(data.get("session_id"))
+        if session is None or (server.token is not None and data.get("token") != server.token):
+            await self.send({"op": 9, "d": False})
+            return
+        server.resumes += 1
+        self.session = session
+        self.shard_id = session["shard"][0]
+        await self.dispatch("RESUMED", {})
+        self.start_replay()
+
+    def start_replay(self):
+        if self.server.event_rate and self.replay_task is None:
+            self.replay_task = self.server.loop.create_task(self.replay())
+
+    async def replay(self):
+        server = self.server
+        rate = server.event_rate
+        # Events are sent in batches above 100 per second, sleeping for less isn't accurate
+        interval = max(1 / rate, 0.01)
+        started_at = monotonic()
+        sent = 0
+        while not self.ws.closed:
+            await sleep(interval)
+            due = int((monotonic() - started_at) * rate) - sent
+            if due > rate:
+                # Fell more than a second behind, skip the backlog instead of sending it in a burst
+                sent += due - int(rate)
+                due = int(rate)
+            for _ in range(due):
+                event_name, data = server.event_factory(self.shard_id, self.session["sequence"] + 1)
+                await self.dispatch(event_name, data)
+            sent += due
+
+
+class FakeDiscord:
+    """
+    Serves ``/gateway/bot``, the gateway handshake (HELLO, IDENTIFY, READY, RESUME and heartbeats) and rate-limited
+    REST routes in the same process as the client.
+
+    Parameters
+    ----------
+    host: str
+        Interface to listen on.
+    port: int
+        Port to listen on. A free port is picked by default.
+    token: Optional[str]
+        Token clients have to use. Any token is accepted by default.
+    shards: int
+        Shard count recommended by ``/gateway/bot``.
+    max_concurrency: int
+        How many shards may identify at the same time.
+    identify_limit: int
+        How many identifies are allowed, reported in ``session_start_limit``.
+    heartbeat_interval: int
+        Milliseconds between heartbeats sent in HELLO.
+    event_rate: float
+        Events sent to every shard per second after it is ready. 0 sends none.
+    event_factory: Callable[[int, int], Tuple[str, Any]]
+        Called with the shard ID and sequence number and returns the event name and data to send.
+        Defaults to :func:`message_create`.
+    ratelimit: Optional[int]
+        Requests allowed per rate-limit bucket per ``ratelimit_per`` seconds. None disables bucket rate-limits.
+    ratelimit_per: float
+        Seconds until a bucket resets.
+    global_ratelimit: Optional[int]
+        Requests allowed per ``global_ratelimit_per`` seconds over all routes. None disables the global rate-limit.
+    global_ratelimit_per: float
+        Seconds until the global rate-limit resets.
+    """
+    def __init__(self, *, host="127.0.0.1", port=0, token=None, shards=1, max_concurrency=1, identify_limit=1000,
+                 heartbeat_interval=41250, event_rate=0, event_factory=message_create, ratelimit=5, ratelimit_per=1,
+                 global_ratelimit=50, global_ratelimit_per=1):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.shards = shards
+        self.max_concurrency = max_concurrency
+        self.identify_limit = identify_limit
+        self.heartbeat_interval = heartbeat_interval
+        self.event_rate = event_rate
+        self.event_factory = event_factory
+        self.ratelimit = ratelimit
+        self.ratelimit_per = ratelimit_per
+        self.global_ratelimit = global_ratelimit
+        self.global_ratelimit_per = global_ratelimit_per
+        self.logger = getLogger("speedcord.testing")
+        self.loop = None
+        self.runner = None
+        self.user = {"id": "400000000000000000", "username": "speedcord-bot", "discriminator": "0001",
+                     "avatar": None, "bot": True}
+
+        self.connections = set()
+        self.sessions = {}  # Session ID: {"shard": [shard id, shard count], "sequence": last sequence}
+        self.buckets = {}  # (bucket hash, major parameters): [remaining, reset at]
+        self.global_remaining = global_ratelimit
+        self.global_reset_at = 0
+        self.ids = count(900000000000000000)
+
+        # Statistics
+        self.identifies = 0
+        self.resumes = 0
+        self.heartbeats = 0
+        self.events_sent = 0
+        self.requests = 0
+        self.ratelimited_requests = 0
+
+    @property
+    def baseuri(self):
+        """
+        The URL of the fake API, to pass to :class:`Client` or :class:`HttpClient`.
+        """
+        return f"http://{self.host}:{self.port}/api/v8"
+
+    @property
+    def gateway_url(self):
+        return f"ws://{self.host}:{self.port}/gateway"
+
+    async def start(self):
+        """
+        Starts the server. :attr:`port` is set to the port it listens on.
+        """
+        self.loop = get_running_loop()
+        app = web.Application()
+        app.router.add_get("/api/v8/gateway/bot", self.handle_gateway_bot)
+        app.router.add_get("/api/v8/gateway", self.handle_gateway)
+        app.router.add_get("/gateway", self.handle_websocket)
+        app.router.add_route("*", "/api/v8/{path:.*}", self.handle_rest)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        self.port = self.runner.addresses[0][1]
+        self.logger.info(f"Fake Discord listening on {self.baseuri}")
+
+    async def close(self):
+        """
+        Disconnects all shards and stops the server.
+        """
+        for connection in list(self.connections):
+            await connection.ws.close()
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def dispatch(self, event_name, data, *, shard_ids=None):
+        """
+        Sends an event to connected shards.
+
+        Parameters
+        ----------
+        event_name: str
+            The name of the event.
+        data: Any
+            The data of the event.
+        shard_ids: Optional[Iterable[int]]
+            The shards to send it to. Defaults to all shards that are ready.
+        """
+        if shard_ids is not None:
+            shard_ids = set(shard_ids)
+        for connection in list(self.connections):
+            if connection.session is not None and (shard_ids is None or connection.shard_id in shard_ids):
+                await connection.dispatch(event_name, data)
+
+    async def disconnect(self, shard_id, code=4000):
+        """
+        Closes the connection of a shard, making it resume or reconnect depending on the close code.
+
+        Parameters
+        ----------
+        shard_id: int
+            The shard to disconnect.
+        code: int
+            The close code to send.
+        """
+        for connection in list(self.connections):
+            if connection.shard_id == shard_id:
+                await connection.ws.close(code=code)
+
+    def check_token(self, request):
+        return self.token is None or request.headers.get("Authorization") == f"Bot {self.token}"
+
+    async def handle_gateway(self, request):
+        return web.json_response({"url": self.gateway_url}, dumps=dumps)
+
+    async def handle_gateway_bot(self, request):
+        if not self.check_token(request):
+            return web.json_response({"message": "401: Unauthorized", "code": 0}, status=401, dumps=dumps)
+        return web.json_response({
+            "url": self.gateway_url,
+            "shards": self.shards,
+            "session_start_limit": {
+                "total": self.identify_limit,
+                "remaining": max(self.identify_limit - self.identifies, 0),
+                "reset_after": 86400000,
+                "max_concurrency": self.max_concurrency
+            }
+        }, dumps=dumps)
+
+    async def handle_websocket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        connection = GatewayConnection(self, ws, request.query.get("encoding", "json"), request.query.get("compress"))
+        self.connections.add(connection)
+        try:
+            await connection.run()
+        finally:
+            self.connections.discard(connection)
+        return ws
+
+    def ratelimited(self, retry_after, headers, is_global=False):
+        self.ratelimited_requests += 1
+        headers["Retry-After"] = str(int(retry_after) + 1)
+        if is_global:
+            headers["X-RateLimit-Global"] = "true"
+        return web.json_response({"message": "You are being rate limited.", "retry_after": retry_after,
+                                  "global": is_global}, status=429, headers=headers, dumps=dumps)
+
+    async def handle_rest(self, request):
+        self.requests += 1
+        if not self.check_token(request):
+            return web.json_response({"message": "401: Unauthorized", "code": 0}, status=401, dumps=dumps)
+        now = monotonic()
+
+        if self.global_ratelimit is not None:
+            if now >= self.global_reset_at:
+                self.global_remaining = self.global_ratelimit
+                self.global_reset_at = now + self.global_ratelimit_per
+            if self.global_remaining == 0:
+                return self.ratelimited(round(self.global_reset_at - now, 3), {}, is_global=True)
+            self.global_remaining -= 1
+
+        headers = {}
+        if self.ratelimit is not None:
+            endpoint, major_parameters = get_endpoint(request.method, request.path[len("/api/v8"):])
+            bucket_hash = md5(endpoint.encode()).hexdigest()
+            key = (bucket_hash, major_parameters)
+            bucket = self.buckets.get(key)
+            if bucket is None or now >= bucket[1]:
+                bucket = self.buckets[key] = [self.ratelimit, now + self.ratelimit_per]
+            reset_after = round(bucket[1] - now, 3)
+            headers = {
+                "X-RateLimit-Bucket": bucket_hash,
+                "X-RateLimit-Limit": str(self.ratelimit),
+                "X-RateLimit-Reset": str(time() + reset_after),
+                "X-RateLimit-Reset-After": str(reset_after)
+            }
+            if bucket[0] == 0:
+                headers["X-RateLimit-Remaining"] = "0"
+                return self.ratelimited(reset_after, headers)
+            bucket[0] -= 1
+            headers["X-RateLimit-Remaining"] = str(bucket[0])
+
+        if request.method == "DELETE":
+            return web.Response(status=204, headers=headers)
+        data = {"id": str(next(self.ids))}
+        if request.can_read_body and request.content_type == "application/json":
+            body = await request.json(loads=loads)
+            if isinstance(body, dict):
+                data = {**body, **data}
+        return web.json_response(data, headers=headers, dumps=dumps)
@@ -0,0 +1,140 @@
+from typing import Dict, Tuple, Optional, Callable, Any, Set, Iterable, Iterator, List
+from asyncio import AbstractEventLoop, Lock, Task
+from logging import Logger
+from zlib import _Compress
+
+from aiohttp import web
+
+MAJOR_PARAMETERS: Tuple[str, ...]
+EventFactory = Callable[[int, int], Tuple[str, Any]]
+
+
+def message_create(shard_id: int, sequence: int) -> Tuple[str, Dict[str, Any]]:
+    ...
+
+
+def get_endpoint(method: str, path: str) -> Tuple[str, Tuple[str, ...]]:
+    ...
+
+
+class GatewayConnection:
+    server: FakeDiscord
+    ws: web.WebSocketResponse
+    encoding: str
+    compressor: Optional[_Compress]
+    send_lock: Lock
+    session: Optional[Dict[str, Any]]
+    shard_id: Optional[int]
+    replay_task: Optional[Task]
+
+    def __init__(self, server: FakeDiscord, ws: web.WebSocketResponse, encoding: str = "json",
+                 compress: Optional[str] = None):
+        ...
+
+    async def send(self, payload: Dict[str, Any]):
+        ...
+
+    async def dispatch(self, event_name: str, data: Any):
+        ...
+
+    async def run(self):
+        ...
+
+    async def handle(self, payload: Dict[str, Any]):
+        ...
+
+    async def handle_identify(self, data: Dict[str, Any]):
+        ...
+
+    async def handle_resume(self, data: Dict[str, Any]):
+        ...
+
+    def start_replay(self):
+        ...
+
+    async def replay(self):
+        ...
+
+
+class FakeDiscord:
+    host: str
+    port: int
+    token: Optional[str]
+    shards: int
+    max_concurrency: int
+    identify_limit: int
+    heartbeat_interval: int
+    event_rate: float
+    event_factory: EventFactory
+    ratelimit: Optional[int]
+    ratelimit_per: float
+    global_ratelimit: Optional[int]
+    global_ratelimit_per: float
+    logger: Logger
+    loop: Optional[AbstractEventLoop]
+    runner: Optional[web.AppRunner]
+    user: Dict[str, Any]
+
+    connections: Set[GatewayConnection]
+    sessions: Dict[str, Dict[str, Any]]
+    buckets: Dict[Tuple[str, Tuple[str, ...]], List[float]]
+    global_remaining: Optional[int]
+    global_reset_at: float
+    ids: Iterator[int]
+
+    identifies: int
+    resumes: int
+    heartbeats: int
+    events_sent: int
+    requests: int
+    ratelimited_requests: int
+
+    def __init__(self, *, host: str = "127.0.0.1", port: int = 0, token: Optional[str] = None, shards: int = 1,
+                 max_concurrency: int = 1, identify_limit: int = 1000, heartbeat_interval: int = 41250,
+                 event_rate: float = 0, event_factory: EventFactory = message_create, ratelimit: Optional[int] = 5,
+                 ratelimit_per: float = 1, global_ratelimit: Optional[int] = 50, global_ratelimit_per: float = 1):
+        ...
+
+    @property
+    def baseuri(self) -> str:
+        ...
+
+    @property
+    def gateway_url(self) -> str:
+        ...
+
+    async def start(self):
+        ...
+
+    async def close(self):
+        ...
+
+    async def __aenter__(self) -> FakeDiscord:
+        ...
+
+    async def __aexit__(self, exc_type: Any, exc_value: Any, traceback: Any):
+        ...
+
+    async def dispatch(self, event_name: str, data: Any, *, shard_ids: Optional[Iterable[int]] = None):
+        ...
+
+    async def disconnect(self, shard_id: int, code: int = 4000):
+        ...
+
+    def check_token(self, request: web.Request) -> bool:
+        ...
+
+    async def handle_gateway(self, request: web.Request) -> web.Response:
+        ...
+
+    async def handle_gateway_bot(self, request: web.Request) -> web.Response:
+        ...
+
+    async def handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ...
+
+    def ratelimited(self, retry_after: float, headers: Dict[str, str], is_global: bool = False) -> web.Response:
+        ...
+
+    async def handle_rest(self, request: web.Request) -> web.Response:
+        ...
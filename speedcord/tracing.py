@@ -0,0 +1,191 @@
+"""
+Created by Epic at 10/17/26
+
+Traces following a gateway event through its handlers to the REST requests they send.
+The current span is kept in a context variable, so tasks created while a span is current inherit it as their parent.
+"""
+from contextvars import ContextVar
+from functools import wraps
+from random import getrandbits
+from time import time, perf_counter
+
+from ujson import dumps
+
+__all__ = ("Span", "Tracer", "JsonLinesSink", "MemorySink", "current_span")
+
+current_span = ContextVar("speedcord_current_span", default=None)
+
+
+class Span:
+    """
+    A timed operation in a trace.
+
+    Parameters
+    ----------
+    tracer: Tracer
+        The tracer exporting the span.
+    name: str
+        What the span measures.
+    parent: Optional[Span]
+        The span this span is part of. A new trace is started without one.
+    attributes: Optional[Dict[str, Any]]
+        Details about the operation.
+    started_at: Optional[float]
+        :func:`time.perf_counter` value the span started at. Defaults to now.
+    """
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "started_at", "timestamp", "duration",
+                 "attributes", "token")
+
+    def __init__(self, tracer, name, parent=None, attributes=None, started_at=None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else f"{getrandbits(128):032x}"
+        self.span_id = f"{getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        now = perf_counter()
+        self.started_at = started_at if started_at is not None else now
+        self.timestamp = time() - (now - self.started_at)
+        self.duration = None
+        self.attributes = attributes if attributes is not None else {}
+        self.token = None
+
+    def finish(self):
+        """
+        Ends the span and exports it.
+        """
+        if self.duration is not None:
+            return
+        self.duration = perf_counter() - self.started_at
+        self.tracer.export(self)
+
+    def __enter__(self):
+        self.token = current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        current_span.reset(self.token)
+        if exc_type is not None:
+            self.attributes["error"] = repr(exc_value)
+        self.finish()
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "timestamp": self.timestamp,
+            "duration": self.duration,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """
+    Creates spans and exports finished spans to sinks.
+
+    Parameters
+    ----------
+    *sinks: Any
+        Objects with an ``emit(span)`` method, called with every finished :class:`Span`.
+    """
+    def __init__(self, *sinks):
+        self.sinks = list(sinks)
+
+    def start_span(self, name, attributes=None, *, parent=None, started_at=None):
+        """
+        Starts a span. Use it as a context manager to make it the current span, or call :meth:`Span.finish`.
+
+        Parameters
+        ----------
+        name: str
+            What the span measures.
+        attributes: Optional[Dict[str, Any]]
+            Details about the operation.
+        parent: Optional[Span]
+            The parent of the span. Defaults to the current span.
+        started_at: Optional[float]
+            :func:`time.perf_counter` value the span started at. Defaults to now.
+
+        Returns
+        -------
+        Span
+            The span.
+        """
+        if parent is None:
+            parent = current_span.get()
+        return Span(self, name, parent, attributes, started_at)
+
+    def export(self, span):
+        for sink in self.sinks:
+            sink.emit(span)
+
+    def trace_handler(self, func, event_name, is_coroutine):
+        """
+        Wraps an event handler in a span recording how long the event waited before the handler started.
+        """
+        handler_name = getattr(func, "__qualname__", repr(func))
+
+        def start_span():
+            parent = current_span.get()
+            attributes = {"event": event_name, "handler": handler_name}
+            if parent is not None:
+                attributes["queued"] = perf_counter() - parent.started_at
+            return Span(self, "handler", parent, attributes)
+
+        if is_coroutine:
+            @wraps(func)
+            async def traced(*args, **kwargs):
+                with start_span():
+                    return await func(*args, **kwargs)
+        else:
+            @wraps(func)
+            def traced(*args, **kwargs):
+                with start_span():
+                    return func(*args, **kwargs)
+        return traced
+
+    def close(self):
+        for sink in self.sinks:
+            close = getattr(sink, "close", None)
+            if close is not None:
+                close()
+
+
+class JsonLinesSink:
+    """
+    Writes finished spans to a file, one JSON object per line.
+
+    Parameters
+    ----------
+    path: str
+        The file to append to.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+
+    def emit(self, span):
+        self.file.write(dumps(span.to_dict()) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class MemorySink:
+    """
+    Keeps the latest finished spans in memory.
+
+    Parameters
+    ----------
+    max_size: int
+        How many spans to keep.
+    """
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.spans = []
+
+    def emit(self, span):
+        self.spans.append(span)
+        if len(self.spans) > self.max_size:
+            del self.spans[:len(self.spans) - self.max_size]
@@ -0,0 +1,80 @@
+from typing import Dict, Any, Optional, List, Callable, TextIO, Type
+from contextvars import ContextVar, Token
+from types import TracebackType
+
+current_span: ContextVar[Optional[Span]]
+
+
+class Span:
+    tracer: Tracer
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    started_at: float
+    timestamp: float
+    duration: Optional[float]
+    attributes: Dict[str, Any]
+    token: Optional[Token]
+
+    def __init__(self, tracer: Tracer, name: str, parent: Optional[Span] = None,
+                 attributes: Optional[Dict[str, Any]] = None, started_at: Optional[float] = None):
+        ...
+
+    def finish(self):
+        ...
+
+    def __enter__(self) -> Span:
+        ...
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]):
+        ...
+
+    def to_dict(self) -> Dict[str, Any]:
+        ...
+
+
+class Tracer:
+    sinks: List[Any]
+
+    def __init__(self, *sinks: Any):
+        ...
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None, *, parent: Optional[Span] = None,
+                   started_at: Optional[float] = None) -> Span:
+        ...
+
+    def export(self, span: Span):
+        ...
+
+    def trace_handler(self, func: Callable[..., Any], event_name: str, is_coroutine: bool) -> Callable[..., Any]:
+        ...
+
+    def close(self):
+        ...
+
+
+class JsonLinesSink:
+    path: str
+    file: TextIO
+
+    def __init__(self, path: str):
+        ...
+
+    def emit(self, span: Span):
+        ...
+
+    def close(self):
+        ...
+
+
+class MemorySink:
+    max_size: int
+    spans: List[Span]
+
+    def __init__(self, max_size: int = 10000):
+        ...
+
+    def emit(self, span: Span):
+        ...
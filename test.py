@@ -11,3 +11,929 @@ def test_require_shard_count_shard_ids():
         pass
     else:
         raise Exception("Did not verify if shard_count was passed.")
+
+
+def test_zlib_stream_inflate():
+    from zlib import compressobj, decompressobj, Z_SYNC_FLUSH, error
+    from speedcord import Client
+    from speedcord.shard import DefaultShard
+
+    shard = DefaultShard(0, Client(512, "token", compress="zlib-stream"), None)
+    shard.inflator = decompressobj()
+    compressor = compressobj()
+    first = b'{"op":11,"d":null}'
+    second = b'{"t":"TYPING_START","s":2,"op":0,"d":{"channel_id":"1"}}'
+
+    message = compressor.compress(first) + compressor.flush(Z_SYNC_FLUSH)
+    assert shard.inflate(message) == first
+    compressed_bytes = len(message)
+    # A message split over frames is buffered until the suffix arrives
+    message = compressor.compress(second) + compressor.flush(Z_SYNC_FLUSH)
+    assert shard.inflate(message[:5]) is None
+    assert shard.inflate(message[5:-2]) is None
+    assert shard.inflate(message[-2:]) == second
+    assert shard.compressed_bytes == compressed_bytes + len(message)
+    assert shard.decompressed_bytes == len(first) + len(second)
+    # The second message only decompresses with the context of the first one
+    try:
+        decompressobj().decompress(message)
+    except error:
+        pass
+    else:
+        raise Exception("Messages were not compressed with a shared context.")
+
+
+def test_etf_round_trip():
+    from speedcord import etf
+    payload = {"op": 2, "d": {"shard": (0, 1), "id": 80351110224678912, "nick": None, "bot": True, "name": "héllo"}}
+    decoded = etf.loads(etf.dumps(payload))
+    assert decoded == {"op": 2, "d": {"shard": [0, 1], "id": "80351110224678912", "nick": None, "bot": True,
+                                      "name": "héllo"}}
+
+
+def test_etf_matches_json():
+    from ujson import loads
+    from speedcord import etf
+
+    json_payload = '{"op":0,"t":"READY","s":1,"d":{"v":8,"shard":[0,1],"user":{"id":"80351110224678912",' \
+                   '"bot":true},"session_id":"abc","heartbeat_at":1602939600000,"permissions":2147483648,"nonce":-3}}'
+    # Discord sends snowflakes as integers over ETF
+    data = {"v": 8, "shard": [0, 1], "user": {"id": 80351110224678912, "bot": True}, "session_id": "abc",
+            "heartbeat_at": 1602939600000, "permissions": 2147483648, "nonce": -3}
+    etf_payload = etf.dumps({"op": 0, "t": "READY", "s": 1, "d": data})
+    # The shard is sent as an Erlang string
+    assert bytes([etf.STRING_EXT, 0, 2, 0, 1]) in etf_payload
+    assert etf.loads(etf_payload) == loads(json_payload)
+
+
+def test_skip_payload():
+    from speedcord import Client
+    from speedcord.shard import DefaultShard
+
+    client = Client(512, "token")
+    shard = DefaultShard(0, client, client.loop)
+    shard.active = True
+
+    @client.listen("MESSAGE_CREATE")
+    def on_message(data, shard):
+        pass
+
+    assert shard.skip_payload('{"t":"TYPING_START","s":5,"op":0,"d":{"channel_id":"1"}}')
+    assert shard.skip_payload(b'{"t":"TYPING_START","s":6,"op":0,"d":{"channel_id":"1"}}')
+    # Skipped events still count for resuming
+    assert shard.last_event_id == 6
+    assert shard.skip_payload('{"t":"TYPING_START","s":null,"op":0,"d":{}}')
+    assert shard.last_event_id == 6 and shard.skipped_events == 3
+
+    # Events with listeners, other opcodes and unexpected key orders are decoded
+    assert not shard.skip_payload('{"t":"MESSAGE_CREATE","s":7,"op":0,"d":{}}')
+    assert not shard.skip_payload('{"t":null,"s":null,"op":11,"d":null}')
+    assert not shard.skip_payload('{"op":0,"s":8,"t":"TYPING_START","d":{}}')
+    assert shard.last_event_id == 6 and shard.skipped_events == 3
+
+    # Inactive shards only decode the events they handle themselves
+    shard.active = False
+    assert not shard.skip_payload('{"t":"READY","s":1,"op":0,"d":{}}')
+    assert shard.skip_payload('{"t":"MESSAGE_CREATE","s":9,"op":0,"d":{}}')
+
+
+def test_identify_waves():
+    from speedcord.client import get_identify_waves
+    waves = get_identify_waves(range(8), 4)
+    assert waves == [[0, 1, 2, 3], [4, 5, 6, 7]]
+    # Every wave has at most one shard per bucket
+    for wave in get_identify_waves([0, 2, 4, 5, 8, 9], 4):
+        assert len({shard_id % 4 for shard_id in wave}) == len(wave)
+
+
+def test_identify_coordinator_limits():
+    from asyncio import run
+    from speedcord.cluster import IdentifyCoordinator
+
+    async def identify_all():
+        coordinator = IdentifyCoordinator(2, 10, 1000, identify_interval=0)
+        remaining = []
+        for shard_id in range(4):
+            remaining.append(await coordinator.acquire(shard_id))
+            await coordinator.release(shard_id)
+        return remaining
+
+    assert run(identify_all()) == [9, 8, 7, 6]
+
+
+def test_identify_slot_held_until_released():
+    from asyncio import run, sleep, ensure_future, wait_for
+    from os.path import join
+    from tempfile import mkdtemp
+    from speedcord.cluster import IdentifyCoordinator, CoordinatorClient
+
+    async def identify():
+        path = join(mkdtemp(), "coordinator.sock")
+        coordinator = IdentifyCoordinator(2, 10, 1000, identify_interval=0)
+        await coordinator.start(path)
+        client = CoordinatorClient(path)
+        assert await client.acquire(0) == 9
+        # Shard 2 shares the bucket of shard 0, shard 1 doesn't
+        waiting = ensure_future(client.acquire(2))
+        assert await wait_for(client.acquire(1), 1) == 8
+        await sleep(0.05)
+        assert not waiting.done()
+        await client.release(0)
+        assert await wait_for(waiting, 1) == 7
+        await client.release(1)
+        await client.release(2)
+        await coordinator.close()
+
+    run(identify())
+
+
+def test_reconnect_identifies_through_coordinator():
+    from asyncio import run, sleep, wait_for
+    from speedcord import Client
+    from speedcord.cluster import IdentifyCoordinator
+    from speedcord.testing import FakeDiscord
+
+    acquired = []
+
+    class RecordingCoordinator(IdentifyCoordinator):
+        async def acquire(self, shard_id):
+            acquired.append(("acquire", shard_id))
+            return await super().acquire(shard_id)
+
+        async def release(self, shard_id):
+            acquired.append(("release", shard_id))
+            await super().release(shard_id)
+
+    async def reconnect():
+        async with FakeDiscord(token="token") as fake:
+            client = Client(512, "token", baseuri=fake.baseuri)
+            client.identify_coordinator = RecordingCoordinator(1, 10, 1000, identify_interval=0)
+            # Gateway info fetched by a cluster, the coordinator handles the used up session start limit
+            client.gateway = {"url": fake.gateway_url + "?from=cluster", "shards": 1,
+                              "session_start_limit": {"remaining": 0, "reset_after": 1000, "max_concurrency": 1}}
+            await client.connect()
+            shard, = client.shards
+            assert shard.gateway_url == fake.gateway_url + "?from=cluster"
+            await wait_for(shard.is_ready.wait(), 5)
+            # The session timed out, so the shard has to identify again
+            await fake.disconnect(0, 4009)
+            while fake.identifies < 2:
+                await sleep(0.01)
+            await client.close()
+            return fake.identifies
+
+    assert run(wait_for(reconnect(), 5)) == 2
+    assert acquired == [("acquire", 0), ("release", 0)] * 2
+
+
+def test_route_bucket_ignores_minor_parameters():
+    from speedcord.http import Route
+    route = "/channels/{channel_id}/messages/{message_id}"
+    assert Route("DELETE", route, channel_id=1, message_id=2).bucket == \
+        Route("DELETE", route, channel_id=1, message_id=3).bucket
+    assert Route("DELETE", route, channel_id=1, message_id=2).bucket != \
+        Route("DELETE", route, channel_id=2, message_id=2).bucket
+
+
+def test_bucket_store_evicts_unlocked_buckets():
+    from asyncio import run, ensure_future, sleep
+    from speedcord.ratelimiter import Bucket, BucketStore
+
+    async def fill():
+        store = BucketStore(max_size=3)
+        in_flight = Bucket()
+        await in_flight.acquire()
+        # Waiting for the first request of a window to find out the limits
+        waiting = Bucket()
+        await waiting.acquire()
+        waiter = ensure_future(waiting.acquire())
+        await sleep(0)
+        assert waiting.waiting == 1
+        store["in_flight"] = in_flight
+        store["waiting"] = waiting
+        for key in range(3):
+            store[key] = Bucket()
+        waiter.cancel()
+        return store
+
+    store = run(fill())
+    assert "in_flight" in store and "waiting" in store and 2 in store
+    assert len(store) == 3 and store.evictions == 2
+
+
+def test_bucket_allows_remaining_requests_concurrently():
+    from asyncio import run, wait_for, TimeoutError
+    from speedcord.ratelimiter import Bucket
+
+    async def use_bucket():
+        bucket = Bucket()
+        await bucket.acquire()
+        bucket.update(3, 2, 10)
+        # Both remaining requests can run while the first one is still in flight
+        await bucket.acquire()
+        await bucket.acquire()
+        assert bucket.in_flight == 3
+        try:
+            await wait_for(bucket.acquire(), 0.05)
+        except TimeoutError:
+            pass
+        else:
+            raise Exception("Bucket allowed more requests than the limit.")
+
+    run(use_bucket())
+
+
+def test_bucket_recovers_from_failed_first_request():
+    from asyncio import run, sleep, wait_for, ensure_future
+    from speedcord.ratelimiter import Bucket
+
+    async def use_bucket():
+        bucket = Bucket()
+        await bucket.acquire()
+        bucket.update(1, 0, 0.01)
+        bucket.release()
+        await sleep(0.02)
+        # The first request of the new window fails before its headers are read
+        await bucket.acquire()
+        waiter = ensure_future(bucket.acquire())
+        await sleep(0)
+        assert bucket.waiting == 1
+        bucket.release()
+        await wait_for(waiter, 1)
+        bucket.release()
+        await wait_for(bucket.acquire(), 1)
+        assert bucket.in_flight == 1 and not bucket.waiting
+
+    run(use_bucket())
+
+
+def test_error_without_headers_keeps_bucket_limited():
+    from asyncio import run
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    from speedcord.exceptions import HTTPException
+    from speedcord.http import HttpClient, Route
+
+    async def bad_gateway(request):
+        return web.Response(status=502)
+
+    async def guild(request):
+        return web.json_response({})
+
+    async def request():
+        app = web.Application()
+        app.router.add_get("/api/v8/guilds/1", bad_gateway)
+        app.router.add_get("/api/v8/guilds/2", guild)
+        async with TestServer(app) as server:
+            http = HttpClient("token", baseuri=str(server.make_url("/api/v8")))
+            try:
+                await http.request(Route("GET", "/guilds/{guild_id}", guild_id=1))
+            except HTTPException:
+                pass
+            await http.request(Route("GET", "/guilds/{guild_id}", guild_id=2))
+            await http.close()
+            return http.ratelimit_buckets
+
+    buckets = run(request())
+    assert [bucket.unlimited for bucket, last_used in buckets.buckets.values()] == [False, True]
+
+
+def test_global_ratelimit():
+    from asyncio import run, gather, sleep, ensure_future, wait_for
+    from time import monotonic
+    from speedcord.http import HttpClient, Route
+    from speedcord.ratelimiter import TimesPer
+    from speedcord.testing import FakeDiscord
+
+    async def request():
+        async with FakeDiscord(ratelimit=None, global_ratelimit=2, global_ratelimit_per=0.2) as fake:
+            http = HttpClient("token", baseuri=fake.baseuri, global_ratelimit=None)
+            await gather(*[http.request(Route("POST", "/channels/1/messages")) for _ in range(2)])
+            # Hits the global rate-limit, other routes have to wait for it too
+            limited = ensure_future(http.request(Route("POST", "/channels/2/messages")))
+            while http.global_lock.is_set():
+                await sleep(0.01)
+            paused_until = http.global_reset_at
+            r = await wait_for(http.request(Route("GET", "/guilds/3")), 1)
+            released_at = monotonic()
+            statuses = [r.status, (await limited).status]
+            await http.close()
+            return fake.ratelimited_requests, statuses, released_at - paused_until
+
+    ratelimited_requests, statuses, released_after = run(request())
+    assert ratelimited_requests == 1 and statuses == [200, 200]
+    assert 0 <= released_after < 0.2
+
+    async def trigger():
+        limiter = TimesPer(2, 0.05)
+        started_at = monotonic()
+        for _ in range(3):
+            await limiter.trigger()
+        return monotonic() - started_at
+
+    assert run(trigger()) >= 0.04
+
+
+def test_coalesced_requests():
+    from asyncio import run, gather
+    from speedcord.exceptions import Unauthorized
+    from speedcord.http import HttpClient, Route
+    from speedcord.testing import FakeDiscord
+
+    async def request():
+        async with FakeDiscord(token="token") as fake:
+            route = Route("GET", "/channels/{channel_id}", channel_id=1)
+            http = HttpClient("token", baseuri=fake.baseuri, coalesce_requests=True)
+            responses = await gather(*[http.request(route) for _ in range(3)])
+            await http.close()
+
+            # Every caller gets the error of the shared request
+            http = HttpClient("wrong", baseuri=fake.baseuri, coalesce_requests=True)
+            errors = await gather(*[http.request(route) for _ in range(3)], return_exceptions=True)
+            await http.close()
+            return fake.requests, responses, errors
+
+    requests, responses, errors = run(request())
+    assert requests == 2
+    assert responses[0] is responses[1] is responses[2]
+    assert all(isinstance(error, Unauthorized) for error in errors)
+
+
+def test_response_cache_invalidation():
+    from speedcord.cache import ResponseCache
+
+    cache = ResponseCache(max_size=10)
+    cache.set(("/channels/1", ()), "/channels/1", "channel")
+    assert cache.get(("/channels/1", ())) == "channel"
+    invalidator = cache.create_invalidator(("/channels/{id}", "/guilds/{guild_id}/channels"))
+    invalidator({"id": "1"}, None)
+    assert cache.get(("/channels/1", ())) is None
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_response_cache_message_invalidation_opt_in():
+    from asyncio import run
+    from speedcord import Client
+    from speedcord.cache import ResponseCache
+    from speedcord.intents import Intents
+
+    async def create_client(response_cache):
+        return Client(Intents.GUILDS | Intents.GUILD_MESSAGES | Intents.GUILD_MESSAGE_REACTIONS, "token",
+                      response_cache=response_cache)
+
+    client = run(create_client(ResponseCache()))
+    assert "MESSAGE_CREATE" not in client.event_dispatcher.event_handlers
+    assert client.minimize_intents() == Intents.GUILDS
+    client = run(create_client(ResponseCache(invalidate_messages=True)))
+    assert "MESSAGE_REACTION_ADD" in client.event_dispatcher.event_handlers
+    assert client.minimize_intents() == Intents.GUILDS | Intents.GUILD_MESSAGES | Intents.GUILD_MESSAGE_REACTIONS
+
+
+def test_response_cache_drops_outdated_responses():
+    from asyncio import run, sleep, ensure_future
+    from speedcord.cache import ResponseCache
+    from speedcord.http import HttpClient, Route
+    from speedcord.testing import FakeDiscord
+
+    async def request():
+        async with FakeDiscord() as fake:
+            cache = ResponseCache()
+            http = HttpClient("token", baseuri=fake.baseuri, cache=cache)
+            messages = Route("GET", "/channels/{channel_id}/messages", channel_id=1)
+            # A message is deleted while the messages are being fetched
+            request = ensure_future(http.request(messages))
+            await sleep(0)
+            cache.invalidate("/channels/1/messages")
+            await request
+            outdated = len(cache)
+
+            await http.request(messages)
+            cached = len(cache)
+            await http.request(Route("DELETE", "/channels/{channel_id}/messages/{message_id}", channel_id=1,
+                                     message_id=2))
+            await http.close()
+            return outdated, cached, len(cache)
+
+    assert run(request()) == (0, 1, 0)
+
+
+def test_state_cache_from_guild_create():
+    from speedcord.state import StateCache
+
+    state = StateCache(channels=2, members=True)
+    data = {
+        "id": "100", "name": "Speedcord",
+        "channels": [{"id": str(channel_id), "type": 0, "name": "general"} for channel_id in range(3)],
+        "roles": [{"id": "100", "name": "@everyone", "permissions": "104324673"}],
+        "members": [{"user": {"id": "5", "username": "Epic"}, "roles": ["100"], "nick": None}]
+    }
+    state.handle_guild_create(data, None)
+    assert state.get_guild(100).name == "Speedcord"
+    assert state.get_channel("0") is None and state.channels.evictions == 1
+    assert state.get_member(100, 5).roles == (100,) and state.get_role(100).permissions == 104324673
+    state.handle_guild_delete({"id": "100"}, None)
+    assert state.get_guild(100) is None and len(state.members) == 0
+    assert len(state.channels) == 0 and state.channels.guild_index == {} and state.members.guild_index == {}
+
+
+def test_state_cache_updated_before_listeners():
+    from asyncio import run, sleep
+    from speedcord import Client
+    from speedcord.state import StateCache
+
+    seen = []
+
+    async def dispatch():
+        client = Client(512, "token", state_cache=StateCache())
+
+        @client.listen("GUILD_CREATE")
+        def on_guild_create(data, shard):
+            seen.append(client.state_cache.get_guild(data["id"]).name)
+
+        @client.listen("CHANNEL_UPDATE")
+        async def on_channel_update(data, shard):
+            seen.append(client.state_cache.get_channel(data["id"]).name)
+
+        client.handle_dispatch({"t": "GUILD_CREATE", "d": {"id": "1", "name": "Speedcord",
+                                                           "channels": [{"id": "2", "name": "general"}]}}, None)
+        client.handle_dispatch({"t": "CHANNEL_UPDATE", "d": {"id": "2", "guild_id": "1", "name": "chat"}}, None)
+        await sleep(0)
+
+    run(dispatch())
+    assert seen == ["Speedcord", "chat"]
+
+
+def test_message_context_converts_lazily():
+    from speedcord.ext.typing.context import MessageContext, UserContext
+
+    data = {"id": "80351110224678912", "channel_id": "1", "content": "!test", "author": {"id": "5"},
+            "mentions": [{"id": "6"}], "new_field": True}
+    context = MessageContext(None, data)
+    assert context._converted is None
+    assert context.id == 80351110224678912 and context.guild_id is None
+    assert isinstance(context.author, UserContext) and context.author is context.author
+    assert [user.id for user in context.mentions] == [6]
+    assert context.new_field is True
+
+
+def test_typed_listeners_convert_once():
+    from asyncio import get_running_loop, run, sleep
+    from types import SimpleNamespace
+    from speedcord.dispatcher import EventDispatcher
+    from speedcord.ext.typing.generated import GuildRoleUpdateContext, RoleContext
+    from speedcord.ext.typing.listeners import TypedListeners
+
+    async def dispatch():
+        loop = get_running_loop()
+        client = SimpleNamespace(loop=loop, event_dispatcher=EventDispatcher(loop))
+        typed = TypedListeners(client)
+        received = []
+
+        @typed.listen("guild_role_create")
+        async def first(context, shard):
+            received.append(context)
+
+        typed.register("GUILD_ROLE_CREATE", first)
+        assert len(client.event_dispatcher.event_handlers["GUILD_ROLE_CREATE"]) == 1
+        client.event_dispatcher.dispatch("GUILD_ROLE_CREATE", {"guild_id": "1", "role": {"id": "2"}}, None)
+        await sleep(0)
+        await sleep(0)
+        return received
+
+    received = run(dispatch())
+    assert len(received) == 2 and received[0] is received[1]
+    assert isinstance(received[0], GuildRoleUpdateContext) and isinstance(received[0].role, RoleContext)
+    assert received[0].role.id == 2 and received[0].guild_id == 1
+
+
+def test_typed_listeners_ordered_dispatch():
+    from asyncio import get_running_loop, run, sleep
+    from types import SimpleNamespace
+    from speedcord.dispatcher import EventDispatcher
+    from speedcord.ext.typing.listeners import TypedListeners
+
+    async def dispatch():
+        loop = get_running_loop()
+        client = SimpleNamespace(loop=loop, event_dispatcher=EventDispatcher(loop, ordered_by="guild_id"))
+        typed = TypedListeners(client)
+        received = []
+
+        @typed.listen("GUILD_ROLE_CREATE")
+        async def slow(context, shard):
+            await sleep(0.01 if context.role.id == 1 else 0)
+            received.append(("slow", context.role.id))
+
+        @typed.listen("GUILD_ROLE_CREATE")
+        def fast(context, shard):
+            received.append(("fast", context.role.id))
+
+        for role_id in (1, 2):
+            client.event_dispatcher.dispatch("GUILD_ROLE_CREATE", {"guild_id": "1", "role": {"id": role_id}}, None)
+        await sleep(0.05)
+        return received
+
+    assert run(dispatch()) == [("slow", 1), ("fast", 1), ("slow", 2), ("fast", 2)]
+
+
+def test_eager_dispatch():
+    from asyncio import get_running_loop, run, sleep, all_tasks
+    from speedcord.dispatcher import EventDispatcher
+
+    async def dispatch():
+        dispatcher = EventDispatcher(get_running_loop(), eager=True)
+        received = []
+
+        async def instant(data, shard):
+            received.append("instant")
+
+        async def suspending(data, shard):
+            received.append("before")
+            await sleep(0)
+            received.append("after")
+
+        dispatcher.register("MESSAGE_CREATE", instant)
+        dispatcher.register("MESSAGE_CREATE", suspending)
+        dispatcher.register("MESSAGE_CREATE", lambda data, shard: received.append("inline"))
+        dispatcher.dispatch("MESSAGE_CREATE", {}, None)
+        assert received == ["instant", "before", "inline"]
+        assert len(all_tasks()) == 2
+        await sleep(0)
+        await sleep(0)
+        return received
+
+    assert run(dispatch())[-1] == "after"
+
+
+def test_handler_pool_overflow():
+    from asyncio import get_running_loop, run, sleep
+    from speedcord.dispatcher import EventDispatcher
+
+    async def dispatch():
+        dispatcher = EventDispatcher(get_running_loop())
+        handled = []
+        running = []
+
+        async def slow(data, shard):
+            running.append(data)
+            await sleep(0.01)
+            handled.append(data)
+            running.remove(data)
+            assert len(running) <= 2
+
+        dispatcher.register("GUILD_CREATE", slow, concurrency=2, max_queue=3, overflow="drop_oldest")
+        dispatcher.limit("TYPING_START", 1, max_queue=1)
+        dispatcher.register("TYPING_START", slow)
+        for event_id in range(10):
+            dispatcher.dispatch("GUILD_CREATE", event_id, None)
+        dispatcher.dispatch("TYPING_START", "a", None)
+        dispatcher.dispatch("TYPING_START", "b", None)
+        assert dispatcher.queue_depths() == {"GUILD_CREATE": 3, "TYPING_START": 2}
+        assert dispatcher.full_pools
+        await dispatcher.wait_for_capacity()
+        await sleep(0.05)
+        return handled, dispatcher.pools["GUILD_CREATE"][0]
+
+    handled, pool = run(dispatch())
+    assert sorted(handled, key=str) == [7, 8, 9, "a", "b"] and pool.dropped == 7 and pool.max_depth == 3
+
+
+def test_ordered_dispatch():
+    from asyncio import get_running_loop, run, sleep
+    from speedcord.dispatcher import EventDispatcher
+
+    async def dispatch():
+        dispatcher = EventDispatcher(get_running_loop(), ordered_by="guild_id")
+        handled = []
+
+        async def handler(data, shard):
+            await sleep(data["delay"])
+            handled.append(data["id"])
+
+        dispatcher.register("MESSAGE_CREATE", handler)
+        dispatcher.register("MESSAGE_UPDATE", handler)
+        dispatcher.dispatch("MESSAGE_CREATE", {"id": 1, "guild_id": "1", "delay": 0.02}, None)
+        dispatcher.dispatch("MESSAGE_UPDATE", {"id": 2, "guild_id": "1", "delay": 0}, None)
+        dispatcher.dispatch("MESSAGE_CREATE", {"id": 3, "guild_id": "2", "delay": 0.01}, None)
+        assert len(dispatcher.ordered_queues) == 2
+        await sleep(0.05)
+        return handled, dispatcher.ordered_queues
+
+    handled, queues = run(dispatch())
+    assert handled == [3, 1, 2] and queues == {}
+
+
+def test_wait_for_indexed_waiters():
+    from asyncio import get_running_loop, run, sleep, gather, TimeoutError
+    from speedcord.dispatcher import EventDispatcher
+
+    async def wait():
+        dispatcher = EventDispatcher(get_running_loop())
+
+        async def send_events():
+            await sleep(0)
+            assert dispatcher.has_handlers("MESSAGE_CREATE")
+            dispatcher.dispatch("MESSAGE_CREATE", {"id": "1", "channel_id": "5", "author": {"id": "6"}}, None)
+            dispatcher.dispatch("MESSAGE_CREATE", {"id": "2", "channel_id": "5", "author": {"id": "7"}}, None)
+
+        message, _ = await gather(dispatcher.wait_for("message_create", key={"channel_id": 5, "user_id": 7}),
+                                  send_events())
+        try:
+            await dispatcher.wait_for("MESSAGE_CREATE", check=lambda data: False, timeout=0.01)
+        except TimeoutError:
+            pass
+        else:
+            raise Exception("wait_for did not time out")
+        return message, dispatcher.waiters
+
+    message, waiters = run(wait())
+    assert message["id"] == "2" and waiters == {}
+
+
+def test_minimize_intents():
+    from asyncio import run, gather
+    from speedcord import Client
+    from speedcord.intents import Intents
+    from speedcord.testing import FakeDiscord
+
+    requested = Intents.GUILDS | Intents.GUILD_MESSAGES | Intents.GUILD_PRESENCES
+
+    async def connect():
+        async with FakeDiscord(token="token") as fake:
+            client = Client(requested, "token", auto_intents=True, baseuri=fake.baseuri)
+
+            async def handler(data, shard):
+                pass
+
+            for event_name in ("READY", "MESSAGE_CREATE", "GUILD_CREATE", "TYPING_START"):
+                client.listen(event_name)(handler)
+            await client.connect()
+            await gather(*[shard.is_ready.wait() for shard in client.shards])
+            await client.close()
+            return client
+
+    client = run(connect())
+    assert client.intents == Intents.GUILDS | Intents.GUILD_MESSAGES
+    assert client.requested_intents == requested
+
+
+def test_dispatch_filters():
+    from asyncio import run
+    from speedcord import Client
+    from speedcord.filters import ignore_bots, guild_allowlist, ignore_channels
+
+    dispatched = []
+
+    async def dispatch():
+        client = Client(512, "token")
+        client.add_filter(ignore_bots())
+        client.add_filter(guild_allowlist([1]))
+        client.add_filter(ignore_channels([5]), events=["message_create"])
+
+        def on_event(data, shard):
+            dispatched.append(data["id"])
+
+        client.listen("MESSAGE_CREATE")(on_event)
+        client.listen("TYPING_START")(on_event)
+
+        for data in ({"id": 1, "guild_id": "1", "channel_id": "4", "author": {"bot": True}},
+                     {"id": 2, "guild_id": "2", "channel_id": "4", "author": {}},
+                     {"id": 3, "guild_id": "1", "channel_id": "5", "author": {}},
+                     {"id": 4, "channel_id": "6", "author": {}}):
+            client.opcode_dispatcher.dispatch(0, {"op": 0, "t": "MESSAGE_CREATE", "d": data}, None)
+        client.opcode_dispatcher.dispatch(0, {"op": 0, "t": "TYPING_START",
+                                              "d": {"id": 5, "guild_id": "1", "channel_id": "5"}}, None)
+
+    run(dispatch())
+    assert dispatched == [4, 5]
+
+
+def test_metrics_render():
+    from asyncio import get_running_loop, run
+    from speedcord.dispatcher import EventDispatcher
+    from speedcord.metrics import Metrics
+
+    metrics = Metrics()
+
+    async def dispatch():
+        dispatcher = EventDispatcher(get_running_loop(), metrics=metrics)
+
+        async def on_message(data, shard):
+            pass
+
+        dispatcher.register("MESSAGE_CREATE", on_message)
+        dispatcher.dispatch("MESSAGE_CREATE", {}, None)
+        await on_message(None, None)
+
+    run(dispatch())
+    metrics.events_received.inc(("MESSAGE_CREATE",))
+    metrics.decode_seconds.observe(0.00003)
+    metrics.gauge("shards", "Shards", function=lambda: 2)
+    text = metrics.render()
+    assert 'speedcord_gateway_events_received_total{event="MESSAGE_CREATE"} 1' in text
+    assert 'speedcord_gateway_decode_seconds_bucket{le="2.5e-05"} 0' in text
+    assert 'speedcord_gateway_decode_seconds_bucket{le="5e-05"} 1' in text
+    assert "speedcord_shards 2" in text
+    assert 'speedcord_handler_seconds_count{event="MESSAGE_CREATE",handler="test_metrics_render.<locals>.dispatch.' \
+           '<locals>.on_message"} 1' in text
+
+
+def test_metrics_server_started_by_connect():
+    from asyncio import run
+    from socket import socket
+    from speedcord import Client
+    from speedcord.metrics import Metrics
+    from speedcord.testing import FakeDiscord
+
+    with socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def connect():
+        async with FakeDiscord(token="token") as fake:
+            client = Client(512, "token", baseuri=fake.baseuri, metrics=Metrics(port=port))
+            await client.connect()
+            r = await client.http.session.get(f"http://127.0.0.1:{port}/metrics")
+            text = await r.text()
+            await client.metrics.start_server()  # Already running
+            await client.close()
+            return r.status, text
+
+    status, text = run(connect())
+    assert status == 200 and "speedcord_gateway_events_received_total" in text
+
+
+def test_tracing():
+    from asyncio import get_running_loop, run, sleep
+    from speedcord.dispatcher import EventDispatcher
+    from speedcord.tracing import Tracer, MemorySink
+
+    sink = MemorySink()
+    tracer = Tracer(sink)
+
+    async def dispatch():
+        dispatcher = EventDispatcher(get_running_loop(), eager=True, tracer=tracer)
+
+        async def on_message(data, shard):
+            await sleep(0)
+            with tracer.start_span("http.request"):
+                pass
+
+        dispatcher.register("MESSAGE_CREATE", on_message)
+        dispatcher.register("MESSAGE_CREATE", on_message, concurrency=1)
+        with tracer.start_span("gateway.event") as event_span:
+            dispatcher.dispatch("MESSAGE_CREATE", {}, None)
+        await sleep(0.01)
+        return event_span
+
+    event_span = run(dispatch())
+    spans = {span.span_id: span for span in sink.spans}
+    requests = [span for span in sink.spans if span.name == "http.request"]
+    assert len(requests) == 2
+    for request in requests:
+        handler = spans[request.parent_id]
+        assert handler.name == "handler" and handler.parent_id == event_span.span_id
+        assert handler.attributes["queued"] >= 0
+        assert request.trace_id == event_span.trace_id
+
+
+def test_loop_monitor():
+    from asyncio import get_running_loop, run, sleep
+    from time import sleep as block
+    from speedcord.dispatcher import EventDispatcher
+    from speedcord.monitor import LoopMonitor
+
+    monitor = LoopMonitor(interval=0.01, threshold=0.1, capture_stacks=True)
+
+    async def dispatch():
+        dispatcher = EventDispatcher(get_running_loop(), monitor=monitor)
+
+        async def on_message(data, shard):
+            block(0.3)
+
+        dispatcher.register("MESSAGE_CREATE", on_message)
+        monitor.start()
+        await sleep(0.05)
+        dispatcher.dispatch("MESSAGE_CREATE", {}, None)
+        await sleep(0.05)
+        monitor.stop()
+
+    run(dispatch())
+    stall, = monitor.stalls
+    assert stall.lag >= 0.2 and monitor.max_lag == stall.lag
+    assert stall.event_name == "MESSAGE_CREATE" and stall.handler.endswith("on_message")
+    assert "block(0.3)" in stall.stack
+
+
+def test_resume_after_disconnect():
+    from asyncio import run, sleep, wait_for
+    from speedcord import Client
+    from speedcord.testing import FakeDiscord
+
+    async def reconnect():
+        async with FakeDiscord(token="token") as fake:
+            client = Client(512, "token", baseuri=fake.baseuri)
+            await client.connect()
+            shard, = client.shards
+            await wait_for(shard.is_ready.wait(), 5)
+            session_id = shard.session_id
+            # Closing with 4000 keeps the session
+            await fake.disconnect(0, 4000)
+            while fake.resumes < 1:
+                await sleep(0.01)
+            await wait_for(shard.is_ready.wait(), 5)
+            await sleep(0.05)
+            resumed = shard.session_id == session_id
+            await client.close()
+            return fake.identifies, resumed
+
+    assert run(wait_for(reconnect(), 5)) == (1, True)
+
+
+def test_blocked_shard_keeps_connection():
+    from asyncio import run, sleep, wait_for, Event
+    from speedcord import Client
+    from speedcord.testing import FakeDiscord
+
+    async def block():
+        async with FakeDiscord(token="token", heartbeat_interval=20) as fake:
+            client = Client(512, "token", baseuri=fake.baseuri)
+            unblocked = Event()
+            received = []
+
+            async def slow(data, shard):
+                await unblocked.wait()
+                received.append(data["content"])
+
+            client.listen("MESSAGE_CREATE", concurrency=1, max_queue=1)(slow)
+            await client.connect()
+            shard, = client.shards
+            await wait_for(shard.is_ready.wait(), 5)
+            ws = shard.ws
+            for content in range(3):
+                await fake.dispatch("MESSAGE_CREATE", {"content": content})
+            # Several heartbeats are sent without their ACKs being read
+            await sleep(0.2)
+            assert shard.is_blocked
+            unblocked.set()
+            await sleep(0.05)
+            await client.close()
+            return fake.identifies, shard.ws is ws, received
+
+    assert run(wait_for(block(), 5)) == (1, True, [0, 1, 2])
+
+
+def test_fake_discord():
+    from asyncio import run, sleep, gather
+    from speedcord import Client
+    from speedcord.http import Route
+    from speedcord.testing import FakeDiscord
+
+    async def connect():
+        async with FakeDiscord(token="token", shards=2, max_concurrency=2, ratelimit=1, ratelimit_per=0.1) as fake:
+            client = Client(512, "token", baseuri=fake.baseuri)
+            received = []
+
+            @client.listen("MESSAGE_CREATE")
+            def on_message(data, shard):
+                received.append((shard.id, data["content"]))
+
+            await client.connect()
+            await gather(*[shard.is_ready.wait() for shard in client.shards])
+            await fake.dispatch("MESSAGE_CREATE", {"content": "hello"}, shard_ids=[1])
+            await sleep(0.05)
+
+            route = Route("POST", "/channels/{channel_id}/messages", channel_id=1)
+            responses = await gather(*[client.http.request(route, json={"content": "hi"}) for _ in range(3)])
+            await sleep(0.1)
+            raw = [await client.http.session.post(fake.baseuri + route.path, headers=client.http.default_headers)
+                   for _ in range(2)]
+            await client.close()
+            return fake, received, responses, raw
+
+    fake, received, responses, raw = run(connect())
+    assert received == [(1, "hello")]
+    assert fake.identifies == 2
+    assert [r.status for r in responses] == [200, 200, 200]
+    assert [r.status for r in raw] == [200, 429] and raw[1].headers["X-RateLimit-Remaining"] == "0"
+
+
+def test_filtered_client_becomes_ready():
+    from asyncio import run, wait_for
+    from speedcord import Client
+    from speedcord.filters import ignore_bots, guild_allowlist
+    from speedcord.testing import FakeDiscord
+
+    async def connect():
+        async with FakeDiscord(token="token") as fake:
+            client = Client(512, "token", baseuri=fake.baseuri)
+            # READY is sent by a bot and has no guild, both filters would drop it
+            client.add_filter(ignore_bots())
+            client.add_filter(guild_allowlist([1], allow_direct_messages=False))
+            await client.connect()
+            shard, = client.shards
+            await wait_for(shard.is_ready.wait(), 5)
+            session_id = shard.session_id
+            await client.close()
+            return session_id
+
+    assert run(connect()) is not None